@@ -1,12 +1,17 @@
 import sys
-import time
+import argparse
 
 from PyQt5.QtWidgets import QApplication
 
 from PyObjCTools.AppHelper import callLater
 
-from source.window import TransparentWindow
-from source import desktop, settings, signal
+from source.window import TransparentWindow, StatusBarApp
+from source.overlay import PetSwarm
+from source import settings
+from source.profiler import PROFILER
+from source.control import ControlServer
+from source.mainloop import MainLoop
+from source.windowsource import QuartzWindowSource, TraceRecorder, ReplaySource
 
 
 # ============================================ #
@@ -14,32 +19,71 @@ from source import desktop, settings, signal
 
 # Main application
 if __name__ == "__main__":
-    # create signal handler
-    signal_handler = signal.SignalHandler()
+    # command line -- everything else is passed on to qt
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--record", help="record the window list to a trace file")
+    parser.add_argument("--replay", help="replay a recorded trace file")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed")
+    parser.add_argument(
+        "--pets", type=int, default=0, help="run many pets in one overlay per screen"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="record per phase frame timings"
+    )
+    parser.add_argument(
+        "--control",
+        nargs="?",
+        const=settings.CONTROL_SOCKET,
+        help="accept scripted commands on a unix socket",
+    )
+    parser.add_argument("--seed", type=int, help="seed the pets' random choices")
+    parser.add_argument(
+        "--virtual-time",
+        action="store_true",
+        help="run timers and animations on frame time, not the wall clock",
+    )
+    args, qt_args = parser.parse_known_args()
 
     # initialize settings
     settings.init()
-    app = QApplication(sys.argv)
+    if args.seed != None:
+        settings.SEED = args.seed
+    settings.VIRTUAL_TIME = args.virtual_time or settings.VIRTUAL_TIME
+    PROFILER.enabled = args.profile or settings.DEBUG
+    app = QApplication(sys.argv[:1] + qt_args)
+
+    # pick the window source
+    if args.replay:
+        try:
+            source = ReplaySource(args.replay, speed=args.speed)
+        except ValueError as error:
+            parser.error(str(error))
+    else:
+        source = QuartzWindowSource()
+    if args.record:
+        source = TraceRecorder(source, args.record)
 
     # Create and show the transparent window
     # this also creates status bar app
-    window = TransparentWindow()
+    if args.pets:
+        status_bar = StatusBarApp()
+        window = PetSwarm(source, args.pets)
+    else:
+        window = TransparentWindow(source)
     window.show()
 
-    start_time = time.time() - settings.DELTA
+    # scripted commands, run from the main loop
+    control = None
+    if args.control:
+        control = ControlServer(window, args.control)
+        control.start()
 
     # use pyobc `callLater1 to periodically update PyQt
-    def run_pyqt():
-        global start_time
-        settings.DELTA = time.time() - start_time
-
-        app.processEvents()
-        signal_handler.iterate_signals()
-        window.update_state()
+    # frames are paced against absolute deadlines, slower while nothing happens
+    loop = MainLoop(window, app, control)
 
-        start_time = time.time()
-        callLater(1.0 / settings.FPS, run_pyqt)
-        # print("running pyqt" + str(time.time() - settings.START_TIME))
+    def run_pyqt():
+        callLater(loop.frame(), run_pyqt)
 
     run_pyqt()
 
@@ -0,0 +1,397 @@
+import time
+import bisect
+import weakref
+
+from collections import OrderedDict, deque
+
+
+# ---------------------------- #
+# constants
+
+# delay used for frames that don't specify one (ms)
+DEFAULT_DELAY = 100
+
+# ---------------------------- #
+# decoded animation
+
+
+class Animation:
+    """
+    All frames of one animation file, decoded.
+
+    `frames` are images (or anything with a size), `delays` the time in ms
+    each frame is shown. `nbytes` is the decoded size kept in memory and
+    `atlas` the buffer the frames point into, if they don't own their pixels.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        frames: list,
+        delays: [int],
+        nbytes: int,
+        atlas: "np.ndarray" = None,
+    ):
+        self.filename = filename
+        self.frames = frames
+        self.delays = delays
+        self.nbytes = nbytes
+        self.atlas = atlas
+
+        # derived frames, by (frame, flipped, scale)
+        self.variants = {}
+
+        # frame start times, for finding the frame at a time
+        self.starts = []
+        total = 0
+        for delay in delays:
+            self.starts.append(total)
+            total += delay
+        self.duration = total
+
+    def frame_at(self, elapsed: float) -> int:
+        """Index of the frame shown `elapsed` ms after the start (looping)"""
+        if not self.frames or self.duration <= 0:
+            return 0
+        return bisect.bisect_right(self.starts, elapsed % self.duration) - 1
+
+    def __len__(self):
+        return len(self.frames)
+
+
+def transform_frame(image, flipped: bool, scale: float) -> (object, int):
+    """Mirrored and/or scaled copy of a `QImage`, with its size in bytes"""
+    from PyQt5.QtCore import Qt
+
+    if scale != 1.0:
+        image = image.scaled(
+            max(1, round(image.width() * scale)),
+            max(1, round(image.height() * scale)),
+            Qt.IgnoreAspectRatio,
+            Qt.SmoothTransformation,
+        )
+    if flipped:
+        image = image.mirrored(True, False)
+    return image, image.bytesPerLine() * image.height()
+
+
+def decode_animation(filename: str) -> "Animation":
+    """Decode every frame of an image file with Qt"""
+    from PyQt5.QtGui import QImageReader
+
+    reader = QImageReader(filename)
+    frames = []
+    delays = []
+    nbytes = 0
+    while reader.canRead():
+        image = reader.read()
+        if image.isNull():
+            break
+        delay = reader.nextImageDelay()
+        frames.append(image)
+        delays.append(delay if delay > 0 else DEFAULT_DELAY)
+        nbytes += image.bytesPerLine() * image.height()
+    if not frames:
+        print(f"Could not decode animation: {filename}")
+    return Animation(filename, frames, delays, nbytes)
+
+
+def _gif_blocks(data: bytes, i: int) -> int:
+    """Skip a chain of gif data sub-blocks starting at `i`"""
+    while data[i]:
+        i += data[i] + 1
+    return i + 1
+
+
+def read_gif_timing(filename: str) -> ((int, int), [int]):
+    """Size and frame delays (ms) of a gif, read from its blocks without decoding"""
+    with open(filename, "rb") as file:
+        data = file.read()
+    if data[:3] != b"GIF":
+        raise ValueError(f"not a gif: {filename}")
+    size = (data[6] | data[7] << 8, data[8] | data[9] << 8)
+    i = 13
+    if data[10] & 0x80:
+        i += 3 << ((data[10] & 7) + 1)
+
+    delays = []
+    delay = 0
+    while i < len(data) and data[i] != 0x3B:
+        if data[i] == 0x21:
+            # extension, the graphic control one has the delay of the next frame
+            if data[i + 1] == 0xF9:
+                delay = (data[i + 4] | data[i + 5] << 8) * 10
+            i = _gif_blocks(data, i + 2)
+        elif data[i] == 0x2C:
+            packed = data[i + 9]
+            i += 10
+            if packed & 0x80:
+                i += 3 << ((packed & 7) + 1)
+            i = _gif_blocks(data, i + 1)
+            delays.append(delay if delay > 0 else DEFAULT_DELAY)
+            delay = 0
+        else:
+            raise ValueError(f"broken gif: {filename}")
+    return size, delays
+
+
+def timing_animation(filename: str) -> "Animation":
+    """
+    An animation with the frame timing of `filename` but no pixels.
+
+    The frames are `(w, h)` tuples, enough to play it without Qt (e.g. in
+    a headless simulation).
+    """
+    try:
+        size, delays = read_gif_timing(filename)
+    except (OSError, ValueError, IndexError):
+        print(f"Could not read animation: {filename}")
+        return Animation(filename, [], [], 0)
+    return Animation(filename, [size] * len(delays), delays, 0)
+
+
+# ---------------------------- #
+# cache
+
+
+class AnimationCache:
+    """
+    Decoded animations, loaded on first use and kept in LRU order.
+
+    When the decoded size of all cached animations goes over `budget`
+    bytes, the least recently used ones are dropped (they are decoded again
+    when needed). Files handed to `prefetch` are decoded a few at a time by
+    `warm`, which the owner calls once per frame.
+
+    Mirrored and scaled frames are made once by `transform` and stored with
+    their animation, they count towards the budget like the frames.
+
+    The budget only covers the cached animations. One that is dropped while
+    a player still holds it stays in memory until the player lets go, its
+    bytes are counted by `retained` and `get` takes it back instead of
+    decoding it again.
+    """
+
+    def __init__(
+        self,
+        budget: int,
+        loader: "function" = decode_animation,
+        transform: "function" = transform_frame,
+    ):
+        self.budget = budget
+        self.loader = loader
+        self.transform = transform
+        self._cache = OrderedDict()
+        self._pending = deque()
+        # dropped animations, until the last player lets go of them
+        self._evicted = weakref.WeakValueDictionary()
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.prefetched = 0
+        self.variants = 0
+        self.revived = 0
+        self.resident = 0
+
+    def get(self, filename: str) -> "Animation":
+        animation = self._cache.get(filename)
+        if animation != None:
+            self.hits += 1
+            self._cache.move_to_end(filename)
+            return animation
+        self.misses += 1
+        return self._load(filename)
+
+    def _load(self, filename: str) -> "Animation":
+        # still held by a player -- take it back instead of decoding it
+        animation = self._evicted.pop(filename, None)
+        if animation != None:
+            self.revived += 1
+        else:
+            animation = self.loader(filename)
+        self._cache[filename] = animation
+        self.resident += animation.nbytes
+        self._evict()
+        return animation
+
+    def _evict(self):
+        # always keep the most recent animation, even if it alone is too big
+        while self.resident > self.budget and len(self._cache) > 1:
+            filename, animation = self._cache.popitem(last=False)
+            self._evicted[filename] = animation
+            self.resident -= animation.nbytes
+            self.evictions += 1
+
+    def frame(
+        self,
+        animation: "Animation",
+        index: int,
+        flipped: bool = False,
+        scale: float = 1.0,
+    ):
+        """Frame `index` of `animation`, mirrored and scaled as asked"""
+        if not flipped and scale == 1.0:
+            return animation.frames[index]
+        key = (index, flipped, scale)
+        variant = animation.variants.get(key)
+        if variant == None:
+            variant, nbytes = self.transform(animation.frames[index], flipped, scale)
+            animation.variants[key] = variant
+            animation.nbytes += nbytes
+            self.variants += 1
+
+            # only count it if the animation is still cached
+            if self._cache.get(animation.filename) is animation:
+                self.resident += nbytes
+                self._evict()
+        return variant
+
+    def __contains__(self, filename: str) -> bool:
+        return filename in self._cache
+
+    # ---------------------------- #
+    # prefetching
+
+    def prefetch(self, filenames: [str]):
+        """Hint that `filenames` will be needed soon"""
+        for filename in filenames:
+            if filename not in self._cache and filename not in self._pending:
+                self._pending.append(filename)
+
+    def warm(self, limit: int = 1) -> int:
+        """Decode up to `limit` prefetched files, returns how many were loaded"""
+        loaded = 0
+        while self._pending and loaded < limit:
+            filename = self._pending.popleft()
+            if filename in self._cache:
+                continue
+            self._load(filename)
+            self.prefetched += 1
+            loaded += 1
+        return loaded
+
+    # ---------------------------- #
+    # stats
+
+    def retained(self) -> int:
+        """Bytes of the dropped animations that players still hold"""
+        return sum(animation.nbytes for animation in self._evicted.values())
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "animations": len(self._cache),
+            "resident": self.resident,
+            "retained": self.retained(),
+            "budget": self.budget,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate(),
+            "evictions": self.evictions,
+            "prefetched": self.prefetched,
+            "variants": self.variants,
+            "revived": self.revived,
+        }
+
+    def __str__(self):
+        return (
+            f"AnimationCache: {len(self._cache)} animations | "
+            f"{self.resident / (1 << 20):.1f}/{self.budget / (1 << 20):.1f} MB | "
+            f"hit rate: {self.hit_rate() * 100:.1f}% | evictions: {self.evictions}"
+        )
+
+
+# ---------------------------- #
+# clock
+
+
+class AnimationClock:
+    """
+    One time source for many players.
+
+    The owner calls `tick` once per frame; every player reading the clock
+    in that frame then sees the same time, so all frame advances of all pets
+    are driven by a single clock read instead of a timer per movie.
+    """
+
+    def __init__(self, clock: "function" = time.monotonic):
+        self.clock = clock
+        self.now = clock()
+
+    def tick(self) -> float:
+        self.now = self.clock()
+        return self.now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+# ---------------------------- #
+# player
+
+
+class AnimationPlayer:
+    """
+    Plays one animation file from an `AnimationCache`.
+
+    Has the parts of the `QMovie` interface the pet uses, with frames
+    returned as `QImage` by `currentImage`. The frames are
+    only fetched from the cache when the player is started, and the shown
+    frame follows the clock instead of a timer per movie.
+    """
+
+    def __init__(
+        self, cache: "AnimationCache", filename: str, clock: "function" = time.monotonic
+    ):
+        self.cache = cache
+        self.filename = filename
+        self.clock = clock
+
+        self._animation = None
+        self._start = 0.0
+
+    def fileName(self) -> str:
+        return self.filename
+
+    def start(self):
+        self._animation = self.cache.get(self.filename)
+        self._start = self.clock()
+
+    def stop(self):
+        # drop the reference, the cache decides whether the frames stay
+        self._animation = None
+
+    def frameCount(self) -> int:
+        return len(self._animation) if self._animation != None else 0
+
+    def currentFrameNumber(self) -> int:
+        if self._animation == None:
+            return 0
+        return self._animation.frame_at((self.clock() - self._start) * 1000.0)
+
+    def currentSize(self) -> (int, int):
+        """Size of the current frame, also for frames without pixels"""
+        if self._animation == None:
+            self.start()
+        if not len(self._animation):
+            return (0, 0)
+        frame = self._animation.frames[self.currentFrameNumber()]
+        if isinstance(frame, tuple):
+            return frame
+        return (frame.width(), frame.height())
+
+    def currentImage(self, flipped: bool = False, scale: float = 1.0):
+        if self._animation == None:
+            self.start()
+        if not len(self._animation):
+            from PyQt5.QtGui import QImage
+
+            return QImage()
+        return self.cache.frame(
+            self._animation, self.currentFrameNumber(), flipped, scale
+        )
@@ -0,0 +1,215 @@
+import os
+import sys
+import json
+import hashlib
+
+import numpy as np
+
+from source import settings
+from source.animation import Animation, decode_animation
+
+
+# ---------------------------- #
+# constants
+
+# bump when the on disk layout changes
+ATLAS_VERSION = 1
+
+# bytes per pixel (premultiplied RGBA)
+CHANNELS = 4
+
+# ---------------------------- #
+# files
+
+
+def file_hash(filename: str) -> str:
+    """Hash of the contents of `filename` (+ the atlas version)"""
+    digest = hashlib.sha1(str(ATLAS_VERSION).encode())
+    with open(filename, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def atlas_paths(cache_dir: str, key: str) -> (str, str):
+    """Pixel + metadata file of the atlas `key`"""
+    base = os.path.join(cache_dir, key)
+    return base + ".rgba", base + ".json"
+
+
+def write_atlas(
+    cache_dir: str, key: str, frames: ["np.ndarray"], delays: [int], source: str = ""
+):
+    """
+    Store `frames` (h x w x 4 uint8 arrays) as one atlas.
+
+    Files are written under a temporary name and renamed, so a reader never
+    sees a half written atlas.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    pixels_path, meta_path = atlas_paths(cache_dir, key)
+
+    width = max((f.shape[1] for f in frames), default=0)
+    height = sum(f.shape[0] for f in frames)
+    atlas = np.zeros((height, width, CHANNELS), dtype=np.uint8)
+    layout = []
+    y = 0
+    for frame, delay in zip(frames, delays):
+        h, w = frame.shape[:2]
+        atlas[y : y + h, :w] = frame
+        layout.append([y, w, h, int(delay)])
+        y += h
+
+    metadata = {
+        "version": ATLAS_VERSION,
+        "source": source,
+        "width": width,
+        "height": height,
+        "frames": layout,
+    }
+    atlas.tofile(pixels_path + ".tmp")
+    with open(meta_path + ".tmp", "w") as file:
+        json.dump(metadata, file)
+    os.replace(pixels_path + ".tmp", pixels_path)
+    os.replace(meta_path + ".tmp", meta_path)
+
+
+def read_atlas(cache_dir: str, key: str) -> ("np.memmap", dict):
+    """Map the atlas `key`, None if it isn't cached (or is unreadable)"""
+    pixels_path, meta_path = atlas_paths(cache_dir, key)
+    try:
+        with open(meta_path, "r") as file:
+            metadata = json.load(file)
+        if metadata["version"] != ATLAS_VERSION:
+            return None
+        shape = (metadata["height"], metadata["width"], CHANNELS)
+        if os.path.getsize(pixels_path) != shape[0] * shape[1] * shape[2]:
+            return None
+        if not shape[0] * shape[1]:
+            return np.zeros(shape, dtype=np.uint8), metadata
+        return np.memmap(pixels_path, dtype=np.uint8, mode="r", shape=shape), metadata
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def atlas_frames(atlas: "np.ndarray", metadata: dict) -> ["np.ndarray"]:
+    """Views of the frames inside `atlas`, nothing is copied"""
+    return [atlas[y : y + h, :w] for y, w, h, _ in metadata["frames"]]
+
+
+# ---------------------------- #
+# qt
+
+
+def frame_image(frame: "np.ndarray"):
+    """`QImage` over the pixels of an atlas frame (no copy)"""
+    from PyQt5 import sip
+    from PyQt5.QtGui import QImage
+
+    h, w = frame.shape[:2]
+    return QImage(
+        sip.voidptr(frame.ctypes.data),
+        w,
+        h,
+        frame.strides[0],
+        QImage.Format_RGBA8888_Premultiplied,
+    )
+
+
+def image_pixels(image) -> "np.ndarray":
+    """Copy of a `QImage` as h x w x 4 premultiplied RGBA"""
+    from PyQt5.QtGui import QImage
+
+    image = image.convertToFormat(QImage.Format_RGBA8888_Premultiplied)
+    h, w = image.height(), image.width()
+    pointer = image.constBits()
+    pointer.setsize(image.bytesPerLine() * h)
+    rows = np.frombuffer(pointer, dtype=np.uint8).reshape(h, image.bytesPerLine())
+    return rows[:, : w * CHANNELS].reshape(h, w, CHANNELS).copy()
+
+
+class AtlasLoader:
+    """
+    `AnimationCache` loader backed by the atlas cache.
+
+    Every animation file is stored as one RGBA atlas (frames stacked
+    vertically) plus a json with the frame layout and timing, named after
+    the hash of the source file. A cached atlas is mapped and wrapped
+    without decoding the source file, otherwise the file is decoded once and
+    compiled into the cache.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+        # stats
+        self.mapped = 0
+        self.compiled = 0
+
+    def compile(self, filename: str, key: str = None) -> str:
+        """Decode `filename` into the cache, returns the atlas key"""
+        key = key or file_hash(filename)
+        decoded = decode_animation(filename)
+        frames = [image_pixels(image) for image in decoded.frames]
+        write_atlas(self.cache_dir, key, frames, decoded.delays, filename)
+        self.compiled += 1
+        return key
+
+    def __call__(self, filename: str) -> "Animation":
+        try:
+            key = file_hash(filename)
+        except OSError:
+            print(f"Could not read animation: {filename}")
+            return Animation(filename, [], [], 0)
+
+        mapped = read_atlas(self.cache_dir, key)
+        if mapped == None:
+            self.compile(filename, key)
+            mapped = read_atlas(self.cache_dir, key)
+        if mapped == None:
+            # the cache isn't writable -- decode every time
+            return decode_animation(filename)
+        self.mapped += 1
+
+        atlas, metadata = mapped
+        frames = [frame_image(f) for f in atlas_frames(atlas, metadata)]
+        delays = [delay for _, _, _, delay in metadata["frames"]]
+        # the images point into the mapping, keep it open as long as they live
+        return Animation(filename, frames, delays, atlas.nbytes, atlas)
+
+
+# ---------------------------- #
+# asset compiler
+
+
+def compile_pet(filename: str, cache_dir: str) -> int:
+    """
+    Compile every animation listed in a pet file, returns the count.
+
+    Run ahead of time with `python -m source.atlas assets/pet.json`.
+    """
+    with open(filename, "r") as file:
+        metadata = json.load(file)
+    parent_folder = os.path.join(os.getcwd(), metadata["parent_folder"])
+
+    loader = AtlasLoader(cache_dir)
+    count = 0
+    for key, files in metadata[settings.ANIMATION_KEY].items():
+        for name in files:
+            path = os.path.join(parent_folder, name)
+            if not os.path.exists(path):
+                print(f"missing: {key} -> {path}")
+                continue
+            atlas_key = file_hash(path)
+            if read_atlas(cache_dir, atlas_key) == None:
+                loader.compile(path, atlas_key)
+                print(f"compiled: {key} -> {name} ({atlas_key})")
+            count += 1
+    return count
+
+
+if __name__ == "__main__":
+    settings.init()
+    for pet_file in sys.argv[1:] or ["assets/pet.json"]:
+        count = compile_pet(pet_file, settings.ATLAS_CACHE_DIR)
+        print(f"{pet_file}: {count} animations cached in {settings.ATLAS_CACHE_DIR}")
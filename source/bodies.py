@@ -0,0 +1,245 @@
+import math
+
+import numpy as np
+
+from source import settings
+
+
+# ---------------------------- #
+# constants
+
+# contact flag columns
+SIDES = ("top", "right", "bottom", "left")
+BOTTOM = SIDES.index("bottom")
+
+# ---------------------------- #
+# table
+
+
+def pixels(value: "np.ndarray") -> "np.ndarray":
+    """Round positions to pixels like a pygame `Rect` does (half away from 0)"""
+    return (np.sign(value) * np.floor(np.abs(value) + 0.5)).astype(np.int64)
+
+
+class BodyTable:
+    """
+    Physics state of every pet, one NumPy array per quantity.
+
+    A body is a row: position `x, y` (top left), the position before the
+    last step `px, py`, velocity `vx, vy`, walking speed `drive`, size
+    `w, h` and the contact flags of the last step. `step` integrates all
+    bodies marked `moving` in one vectorized pass; pets read and write
+    their row through `BodyVector` / `BodyContacts` views.
+    """
+
+    COLUMNS = ("x", "y", "px", "py", "vx", "vy", "drive")
+
+    def __init__(self, capacity: int = 16):
+        self.capacity = 0
+        self.count = 0
+        self._free = []
+        for name in self.COLUMNS:
+            setattr(self, name, np.zeros(0, dtype=np.float64))
+        self.w = np.zeros(0, dtype=np.int64)
+        self.h = np.zeros(0, dtype=np.int64)
+        self.alive = np.zeros(0, dtype=bool)
+        self.moving = np.zeros(0, dtype=bool)
+        self.contact = np.zeros((0, len(SIDES)), dtype=bool)
+        self._grow(capacity)
+
+        # stats
+        self.steps = 0
+        self.body_steps = 0
+
+    def _grow(self, capacity: int):
+        """Reallocate every column to `capacity` rows"""
+        for name in ("w", "h", "alive", "moving", "contact", *self.COLUMNS):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[: len(old)] = old
+            setattr(self, name, new)
+        self.capacity = capacity
+
+    # ---------------------------- #
+    # bodies
+
+    def add(self, x: float, y: float, w: int, h: int) -> int:
+        """New body at rest, returns its row"""
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self.count >= self.capacity:
+                self._grow(max(16, self.capacity * 2))
+            index = self.count
+            self.count += 1
+
+        for name in self.COLUMNS:
+            getattr(self, name)[index] = 0.0
+        self.x[index] = self.px[index] = x
+        self.y[index] = self.py[index] = y
+        self.w[index] = w
+        self.h[index] = h
+        self.alive[index] = True
+        self.moving[index] = False
+        self.contact[index] = False
+        return index
+
+    def remove(self, index: int):
+        self.alive[index] = False
+        self.moving[index] = False
+        self._free.append(index)
+
+    def __len__(self):
+        return self.count - len(self._free)
+
+    # ---------------------------- #
+    # integration
+
+    def step(self, edges: "EdgeIndex", dt: float, floor: int) -> "np.ndarray":
+        """
+        Advance every moving body by one fixed step, like `step_body`.
+
+        Gravity and drag are per second, the vertical move is swept against
+        the window edges (edges only stop falling bodies). Returns the rows
+        that were stepped; their contacts are in `contact`.
+        """
+        rows = np.flatnonzero(self.moving[: self.count] & self.alive[: self.count])
+        if not len(rows):
+            return rows
+        self.steps += 1
+        self.body_steps += len(rows)
+
+        x = self.x[rows]
+        y = self.y[rows]
+        vx = self.vx[rows]
+        vy = self.vy[rows]
+        w = self.w[rows]
+        h = self.h[rows]
+        self.px[rows] = x
+        self.py[rows] = y
+
+        # walking overrides the horizontal velocity every step
+        drive = self.drive[rows]
+        vx = np.where(drive != 0, drive, vx)
+        vy = vy + settings.GRAVITY * dt
+
+        # x-axis -- positions are rounded to pixels, like a pygame rect
+        x = x + vx * dt
+        left = pixels(x)
+
+        # y-axis -- the body stands on an edge when its last row is on it
+        start_row = pixels(y) + h - 1
+        y = y + vy * dt
+        end_row = pixels(y) + h - 1
+
+        # falling -- land on the first edge crossed by the bottom row
+        hit = np.zeros(len(rows), dtype=bool)
+        falling = np.flatnonzero(vy > 0)
+        if len(falling) and len(edges):
+            lo = np.searchsorted(edges.y, start_row[falling], side="left")
+            hi = np.searchsorted(edges.y, end_row[falling], side="right")
+            counts = np.maximum(hi - lo, 0)
+
+            # every (body, candidate edge) pair, edges sorted by y per body
+            body = np.repeat(falling, counts)
+            offset = np.arange(counts.sum()) - np.repeat(
+                np.cumsum(counts) - counts, counts
+            )
+            edge = np.repeat(lo, counts) + offset
+            overlap = (edges.x0[edge] < left[body] + w[body]) & (
+                edges.x1[edge] > left[body]
+            )
+
+            # the first overlapping edge of each body is the one it lands on
+            body = body[overlap]
+            edge = edge[overlap]
+            landed, first = np.unique(body, return_index=True)
+            hit[landed] = True
+            vy[landed] = 0.0
+            y[landed] = edges.y[edge[first]] - h[landed] + 1
+
+        # restriction #1 - cannot fall out of bottom of screen
+        below = pixels(y) + h >= floor
+        hit |= below
+        vy[below] = 0.0
+        y[below] = floor - 1 - h[below]
+
+        # drag
+        drag = math.exp(-settings.DRAG * dt)
+        self.x[rows] = x
+        self.y[rows] = y
+        self.vx[rows] = vx * drag
+        self.vy[rows] = vy * drag
+        self.contact[rows] = False
+        self.contact[rows, BOTTOM] = hit
+        return rows
+
+
+# ---------------------------- #
+# per body views
+
+
+class BodyVector:
+    """`Vector2`-like view of two columns of one body"""
+
+    __slots__ = ("table", "index", "names")
+
+    def __init__(self, table: "BodyTable", index: int, names: (str, str)):
+        self.table = table
+        self.index = index
+        self.names = names
+
+    @property
+    def x(self) -> float:
+        return float(getattr(self.table, self.names[0])[self.index])
+
+    @x.setter
+    def x(self, value: float):
+        getattr(self.table, self.names[0])[self.index] = value
+
+    @property
+    def y(self) -> float:
+        return float(getattr(self.table, self.names[1])[self.index])
+
+    @y.setter
+    def y(self, value: float):
+        getattr(self.table, self.names[1])[self.index] = value
+
+    @property
+    def xy(self) -> (float, float):
+        return (self.x, self.y)
+
+    @xy.setter
+    def xy(self, value: (float, float)):
+        self.x, self.y = value
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, i: int) -> float:
+        return self.xy[i]
+
+    def __iter__(self):
+        return iter(self.xy)
+
+    def __repr__(self):
+        return f"BodyVector({self.x}, {self.y})"
+
+
+class BodyContacts:
+    """Dict-like view of the contact flags of one body"""
+
+    __slots__ = ("table", "index")
+
+    def __init__(self, table: "BodyTable", index: int):
+        self.table = table
+        self.index = index
+
+    def __getitem__(self, side: str) -> bool:
+        return bool(self.table.contact[self.index, SIDES.index(side)])
+
+    def __setitem__(self, side: str, value: bool):
+        self.table.contact[self.index, SIDES.index(side)] = value
+
+    def __repr__(self):
+        return repr({side: self[side] for side in SIDES})
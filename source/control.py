@@ -0,0 +1,309 @@
+import os
+import json
+import time
+import asyncio
+import threading
+import collections
+
+from pygame import Rect
+from pygame.math import Vector2
+
+from source import settings
+from source.bodies import BOTTOM
+
+
+# ---------------------------- #
+# helpers
+
+
+def _resolve(done: [("asyncio.Future", dict)]):
+    for future, result in done:
+        # the client may be gone already
+        if not future.done():
+            future.set_result(result)
+
+
+def parse_line(line: bytes) -> [dict]:
+    """Commands of one request line: a command object or a list of them"""
+    try:
+        found = json.loads(line)
+    except ValueError as error:
+        return [{"error": f"invalid json: {error}"}]
+    if isinstance(found, dict):
+        return [found]
+    if isinstance(found, list) and all(isinstance(c, dict) for c in found):
+        return found
+    return [{"error": "expected a command object or a list of them"}]
+
+
+async def read_line(reader: "StreamReader") -> bytes:
+    """
+    The next request line, b"" once the client is gone. A line over the
+    reader's limit is skipped up to its newline and returned as None.
+    """
+    overrun = False
+    while True:
+        try:
+            line = await reader.readuntil(b"\n")
+        except asyncio.IncompleteReadError as error:
+            # closed without a final newline
+            line = error.partial
+        except asyncio.LimitOverrunError as error:
+            # drop what was read so far, the rest follows on the next read
+            await reader.readexactly(error.consumed)
+            overrun = True
+            continue
+        return None if overrun and line else line
+
+
+# ---------------------------- #
+# server
+
+
+class ControlServer:
+    """
+    Unix domain socket to script the pets.
+
+    Clients write newline separated JSON, each line one command or a list
+    of them (a batch), e.g. `{"id": 1, "cmd": "query", "pets": [0, 2]}`.
+    Lines longer than `limit` bytes are answered with an error.
+    Every command gets one response line, in the order the commands were
+    sent, as soon as it ran -- clients can pipeline as many as they like.
+
+    The socket is served by an asyncio loop on its own thread. The
+    commands themselves run on the main thread: `process` is called once
+    per frame from the main loop and works through the queued commands
+    within a time budget.
+    """
+
+    def __init__(self, host, path: str = None, limit: int = None):
+        self.host = host
+        self.path = path if path != None else settings.CONTROL_SOCKET
+        self.limit = limit if limit != None else settings.CONTROL_LINE_LIMIT
+
+        # (command, future) from the socket thread, run by `process`
+        self._inbox = collections.deque()
+        self._loop: "asyncio.AbstractEventLoop" = None
+        self._thread: "threading.Thread" = None
+        self._ready = threading.Event()
+
+        self.handlers = {
+            "spawn": self.spawn,
+            "reset": self.reset,
+            "trigger": self.trigger,
+            "move_to": self.move_to,
+            "query": self.query,
+        }
+
+        # stats
+        self.clients = 0
+        self.received = 0
+        self.processed = 0
+        self.errors = 0
+
+    # ---------------------------- #
+    # socket thread
+
+    def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._thread = threading.Thread(target=self._run, name="control", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self):
+        if self._loop != None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        server = loop.run_until_complete(
+            asyncio.start_unix_server(self._client, path=self.path, limit=self.limit)
+        )
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            server.close()
+            loop.run_until_complete(server.wait_closed())
+            loop.close()
+
+    async def _client(self, reader: "StreamReader", writer: "StreamWriter"):
+        self.clients += 1
+        responses = asyncio.Queue()
+        sender = asyncio.ensure_future(self._send(responses, writer))
+        try:
+            while True:
+                line = await read_line(reader)
+                if line == None:
+                    commands = [{"error": f"request over {self.limit} bytes"}]
+                elif not line:
+                    break
+                else:
+                    commands = parse_line(line)
+                for command in commands:
+                    future = self._loop.create_future()
+                    if "error" in command:
+                        future.set_result(command)
+                    else:
+                        self._inbox.append((command, future))
+                    self.received += 1
+                    await responses.put(future)
+        finally:
+            await responses.put(None)
+            await sender
+            writer.close()
+
+    async def _send(self, responses: "asyncio.Queue", writer: "StreamWriter"):
+        """Write the responses back in order, flushing whenever caught up"""
+        while True:
+            future = await responses.get()
+            if future == None:
+                break
+            writer.write((json.dumps(await future) + "\n").encode())
+            if responses.empty():
+                await writer.drain()
+
+    # ---------------------------- #
+    # main thread
+
+    def process(self, budget: float = None) -> int:
+        """Run queued commands until `budget` seconds are used up"""
+        started = time.perf_counter()
+        done = []
+        inbox = self._inbox
+        while inbox:
+            if budget != None and done:
+                if time.perf_counter() - started >= budget:
+                    break
+            command, future = inbox.popleft()
+            done.append((future, self.run(command)))
+        if done:
+            # one wakeup of the socket thread for the whole frame
+            try:
+                self._loop.call_soon_threadsafe(_resolve, done)
+            except RuntimeError:
+                # shut down in the meantime
+                pass
+        self.processed += len(done)
+        return len(done)
+
+    def run(self, command: dict) -> dict:
+        """Run one command, returns its response"""
+        response = {"id": command["id"]} if "id" in command else {}
+        handler = self.handlers.get(command.get("cmd"))
+        if handler == None:
+            response["error"] = f"unknown command: {command.get('cmd')}"
+        else:
+            try:
+                response.update(handler(command))
+            except (KeyError, IndexError, TypeError, ValueError) as error:
+                response["error"] = f"{type(error).__name__}: {error}"
+        if "error" in response:
+            self.errors += 1
+        return response
+
+    # ---------------------------- #
+    # commands
+
+    def _pets(self, command: dict) -> [(int, "Pet")]:
+        """The pets a command is for, all of them by default"""
+        pets = self.host.pets
+        indices = command.get("pets")
+        if indices == None:
+            return list(enumerate(pets))
+        for i in indices:
+            # python would count these from the end
+            if i < 0:
+                raise IndexError(f"pet index out of range: {i}")
+        return [(i, pets[i]) for i in indices]
+
+    def spawn(self, command: dict) -> dict:
+        spawn = getattr(self.host, "spawn", None)
+        if spawn == None:
+            return {"error": "this host runs a single pet"}
+        return {"pets": spawn(int(command.get("count", 1)))}
+
+    def reset(self, command: dict) -> dict:
+        pets = self._pets(command)
+        for _, pet in pets:
+            pet.receive_reset_event(None)
+        return {"pets": [i for i, _ in pets]}
+
+    def trigger(self, command: dict) -> dict:
+        """Fire a behavior event, e.g. `custom`"""
+        pets = self._pets(command)
+        for _, pet in pets:
+            machine = pet.statemachine
+            machine.fire(machine.graph.event(command["event"]))
+        return {"pets": [i for i, _ in pets]}
+
+    def move_to(self, command: dict) -> dict:
+        """Walk idle pets to `x` on the surface at height `y`"""
+        x, y = int(command["x"]), int(command["y"])
+        navigation = self.host.world.navigation
+
+        # find every pet's target first, so a bad one moves no pet at all
+        targets = []
+        for i, pet in self._pets(command):
+            machine = pet.statemachine
+            if machine.get_current_index() != machine.graph.state("idle"):
+                continue
+            w, h = pet._rect.size
+            platform = navigation.locate(Rect(x, y - h + 1, w, h))
+            if platform == None:
+                return {"error": f"no surface at {x}, {y}"}
+            targets.append((i, pet, platform))
+
+        moving = []
+        for i, pet, platform in targets:
+            h = pet._rect.h
+            path = navigation.plan(pet._rect, platform, x, pet.MS)
+            if path == None:
+                continue
+            pet._target_location = {
+                "window": self.host.world.get_window(platform.wid),
+                "pos": Vector2(x, platform.y - h + 1),
+                "path": path,
+            }
+            machine = pet.statemachine
+            machine.fire(machine.wander_event)
+            moving.append(i)
+        return {"pets": moving}
+
+    def query(self, command: dict) -> dict:
+        pets = self._pets(command)
+        if not pets:
+            return {"pets": []}
+
+        # one gather per column instead of a NumPy scalar per field
+        table = pets[0][1]._pos.table
+        rows = [pet.body for _, pet in pets]
+        columns = zip(
+            table.x[rows].tolist(),
+            table.y[rows].tolist(),
+            table.vx[rows].tolist(),
+            table.vy[rows].tolist(),
+            table.contact[rows, BOTTOM].tolist(),
+        )
+        names = pets[0][1].statemachine.graph.names
+        return {
+            "pets": [
+                {
+                    "pet": i,
+                    "state": names[pet.statemachine.get_current_index()],
+                    "x": x,
+                    "y": y,
+                    "vx": vx,
+                    "vy": vy,
+                    "grounded": grounded,
+                }
+                for (i, pet), (x, y, vx, vy, grounded) in zip(pets, columns)
+            ]
+        }
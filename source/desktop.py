@@ -1,131 +1,172 @@
-import Quartz
 import time
 
-from PyQt5.QtCore import QTimer
+import numpy as np
 
 from pygame import Rect
 from source import settings, utils
+from source.spatial import EdgeIndex
+from source.physics import PhysicsClock
+from source.bodies import BodyTable
+from source.interaction import PetInteractions
+from source.profiler import PROFILER
+from source.navigation import Navigator
+from source.occlusion import exposed_edges
+from source.windowtable import (
+    WindowTable,
+    FLAG_ONSCREEN,
+    FLAG_MANDATORY,
+    FLAG_GLOBAL,
+)
+from source.snapshot import WorldDiff, EMPTY_SNAPSHOT, diff_windows
+from source.poller import WindowPoller
+from source.windowsource import WindowSource, QuartzWindowSource
+
+
+def valid_window_mask(table: "WindowTable") -> "np.ndarray":
+    """
+    Check which windows of a table are valid.
+    """
+    data = table.data
+    return (
+        # not behind background or minimized
+        (data["layer"] >= 0)
+        & (table.names != settings.APPLICATION_NAME)
+        # not too small
+        & (data["w"] >= settings.MINIMUM_WINDOW_WIDTH)
+        & (data["h"] >= settings.MINIMUM_WINDOW_HEIGHT)
+        # visible
+        & table.has_flag(FLAG_ONSCREEN)
+        # not part of illegal names
+        & ~np.isin(table.owners, settings.ILLEGAL_WINDOW_NAMES)
+    )
 
 
-def is_valid_window(window: dict) -> bool:
+def mandatory_window_mask(table: "WindowTable") -> "np.ndarray":
     """
-    Check if a window is valid.
+    Check which windows of a table are mandatory (dock or etc).
     """
-    # if behind background or minimized
-    if window.get("kCGWindowLayer") < 0:
-        return False
+    return np.isin(table.owners, settings.MANDATORY_WINDOW_NAMES)
 
-    if window.get("kCGWindowName") == settings.APPLICATION_NAME:
-        return False
 
-    # if window too small
-    area = window.get("kCGWindowBounds")
-    if (
-        area["Width"] < settings.MINIMUM_WINDOW_WIDTH
-        or area["Height"] < settings.MINIMUM_WINDOW_HEIGHT
-    ):
-        return False
+def get_active_windows(source: "WindowSource") -> "WindowTable":
+    """
+    Get a table of active windows from a window source.
+    """
+    # Get the list of all windows -- may run on the poller thread
+    table = WindowTable.from_raw(source.get_windows())
 
-    # or not visible
-    if not window.get("kCGWindowIsOnscreen", False):
-        return False
+    # filter + tag mandatory windows, all columnar
+    table = table.select(valid_window_mask(table))
+    return table.with_flags(mandatory_window_mask(table), FLAG_MANDATORY)
 
-    # or if part of illegal names
-    if window.get("kCGWindowOwnerName", "Unknown") in settings.ILLEGAL_WINDOW_NAMES:
-        return False
 
-    return True
+# ============================================================================== #
+# window
 
 
-def is_mandatory_window(window: dict) -> bool:
-    """
-    Check if a window is mandatory (dock or etc).
+class Window:
     """
-    return (
-        window.get("kCGWindowOwnerName", "Unknown") in settings.MANDATORY_WINDOW_NAMES
-    )
-
+    View of one row of the world's window table.
 
-def get_active_windows(filters: int = Quartz.kCGWindowListOptionOnScreenOnly) -> list:
+    Views are kept alive by `wid` between snapshots and rebound to the new
+    table, the world only rebuilds `area` when the window actually moved.
     """
-    Get a list of active windows on the system.
-    """
-    # Options for listing windows (visible, on-screen, etc.)
-    options = filters
 
-    # Get the list of all windows
-    window_list = Quartz.CGWindowListCopyWindowInfo(options, Quartz.kCGNullWindowID)
+    def __init__(self, wid: int, table: "WindowTable", row: int):
+        self.wid = wid
+        self.bind(table, row)
+        self.area = Rect(table.data[["x", "y", "w", "h"]][row].tolist())
 
-    # Parse and return useful information
-    windows = []
-    for wid, window in enumerate(window_list):
-        if not is_valid_window(window):
-            continue
+        self.active = False
+        self.on_screen = False
 
-        area = window.get("kCGWindowBounds")  # Bounds (position and size)
-        rect = Rect(area["X"], area["Y"], area["Width"], area["Height"])
+        # visible (x0, x1) parts of the top and bottom edge
+        self.top_segments = []
+        self.bottom_segments = []
 
-        window_info = {
-            "name": window.get("kCGWindowName", "Unknown"),  # Window title
-            "owner": window.get("kCGWindowOwnerName", "Unknown"),  # App name
-            "pid": window.get("kCGWindowOwnerPID"),  # Process ID
-            "area": rect,  # Area
-            "wid": wid,  # Layer (z-order)
-            "layer": window.get("kCGWindowLayer", 0),  # Layer (z-order)
-            "global": False,  # Global window
-            "mandatory": is_mandatory_window(window),  # Mandatory window
-        }
-        windows.append(window_info)
+    def bind(self, table: "WindowTable", row: int):
+        """Point the view at a row of a (new) table"""
+        self._table = table
+        self._row = row
 
-    return windows
+    # ---------------------------- #
+    # columns
 
+    @property
+    def pid(self) -> int:
+        return int(self._table.data["pid"][self._row])
 
-# ============================================================================== #
-# window
+    @property
+    def name(self) -> str:
+        return self._table.names[self._row]
 
+    @property
+    def owner(self) -> str:
+        return self._table.owners[self._row]
 
-class Window:
-    def __init__(
-        self,
-        area: "rect",
-        pid: str,
-        name: str,
-        owner: str,
-        layer: int,
-        is_global: bool,
-        is_mandatory: bool,
-    ):
-        self.pid = pid
-        self.area = area
-        self.name = name
-        self.owner = owner
-        self.layer = layer
+    @property
+    def layer(self) -> int:
+        return 1000 - int(self._table.data["order"][self._row])
 
-        self.active = False
-        self.on_screen = False
+    @property
+    def is_global(self) -> bool:
+        return bool(self._table.data["flags"][self._row] & FLAG_GLOBAL)
 
-        self.is_global = is_global
-        self.is_mandatory = is_mandatory
+    @property
+    def is_mandatory(self) -> bool:
+        return bool(self._table.data["flags"][self._row] & FLAG_MANDATORY)
 
     def __str__(self):
-        return f"Window: {self.owner:20} {self.name:20} | PID: {self.pid:5} | Active: {self.active:2} | Layer: {self.layer:5} | Rect: {str(self.area):25} | Mandatory: {self.is_mandatory:5}"
+        return f"Window: {self.wid:6} {self.owner:20} {self.name:20} | PID: {self.pid:5} | Active: {self.active:2} | Layer: {self.layer:5} | Rect: {str(self.area):25} | Mandatory: {self.is_mandatory:5}"
 
 
 # world
 class World:
-    def __init__(self):
+    def __init__(self, source: "WindowSource" = None, threaded: bool = True):
         self.windows: ["Window"] = []
+        self.edges = EdgeIndex()
 
-        # create a timer to update valid windows
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update)
-        self.timer.start(1000 // settings.FPS)
-        self.update()
+        # window objects are kept alive between snapshots
+        self._windows_by_id: {int: "Window"} = {}
+        self._snapshot: "Snapshot" = EMPTY_SNAPSHOT
+        self.last_diff = WorldDiff()
+        self.generation = 0
+
+        # fixed timestep physics, independent of the frame rate
+        self.clock = PhysicsClock(settings.PHYSICS_RATE)
+        self.bodies = BodyTable()
+
+        # pets by body row, they push each other apart after every step
+        self.pets: {int: "Pet"} = {}
+        self.interactions = PetInteractions()
+
+        # path planning over the window edges
+        self.navigation = Navigator(self)
+        self.dirty: ["Rect"] = []
+
+        # columns of the current table + per row activity
+        self.table = EMPTY_SNAPSHOT.windows
+        self.active = np.zeros(0, dtype=bool)
+
+        # where the window list comes from (live desktop, replayed trace, ...)
+        self.source = source if source != None else QuartzWindowSource()
 
         # desktop screen dimensions
-        self.screen = Quartz.CGMainDisplayID()
-        self.screen_width = Quartz.CGDisplayPixelsWide(self.screen)
-        self.screen_height = Quartz.CGDisplayPixelsHigh(self.screen)
+        self.screen_width, self.screen_height = self.source.get_screen_size()
+        self.bounds = Rect(0, 0, self.screen_width, self.screen_height)
+
+        # poll the window list on a background thread
+        # fast while windows move, back off to `WORLD_DELTA` when stable
+        # without a thread, `poller.poll()` has to be called by the owner
+        self.poller = WindowPoller(
+            lambda: get_active_windows(self.source),
+            1.0 / settings.FPS,
+            settings.WORLD_DELTA,
+        )
+        self.poller.poll()
+        if threaded:
+            self.poller.start()
+        self.update()
 
     def iter_active_windows(self):
         for window in self.windows:
@@ -135,127 +176,153 @@ class World:
     def get_active_windows(self):
         return [x for x in self.windows if x.active]
 
-    def update(self):
-        # grab all windows + update valid windows
-        all_windows = get_active_windows()
-
-        # reset all available windows
+    def update(self) -> "WorldDiff":
+        # grab the latest snapshot from the poller, never blocks
+        snapshot = self.poller.latest()
+
+        # nothing moved -- keep everything as is
+        if snapshot is self._snapshot:
+            self.last_diff = WorldDiff()
+            return self.last_diff
+
+        table = snapshot.windows
+        previous = self._snapshot.windows
+        diff = diff_windows(previous, table)
+        self._snapshot = snapshot
+        self.last_diff = diff
+
+        # reuse the window objects that survived, layer changes alone still
+        # show up in the views
+        self.table = table
+        for wid in diff.removed:
+            item = self._windows_by_id.pop(wid, None)
+            if item != None:
+                item.active = False
+                item.on_screen = False
+        moved = set(diff.moved)
+        geometry = table.data[["x", "y", "w", "h"]].tolist()
         self.windows = []
-        for window in all_windows:
-            item = Window(
-                window["area"],
-                window["pid"],
-                window["name"],
-                window["owner"],
-                1000 - window["wid"],
-                window["global"],
-                window["mandatory"],
-            )
-            item.on_screen = True
-            self.windows.append(item)
-        self.windows.sort(key=lambda x: -x.layer)
-
-        # =============================== #
-        # print(f"TIME: {time.time()-settings.START_TIME} | updating the world")
-
-        # for w in get_active_windows():
-        #     print(w["name"], w["owner"], w["pid"], w["layer"], w["wid"])
-
-        # print out all active window layers and owners
-        win_array = [x for x in self.windows if x.on_screen]
-        # for w in win_array:
-        #     print(w)
-
-        # for each window, check if its behind another window (determine validity)
-        # first is lowest -- forward checkc
-        for i in range(len(win_array)):
-            victim = win_array[i]
-
-            victim_rect = Rect(
-                max(victim.area.x, 0) + 1,
-                max(victim.area.y, 0) + 1,
-                victim.area.w + min(0, victim.area.x) - 2,
-                victim.area.h + min(0, victim.area.y) - 2,
-            )
-
-            # check if behind another window
-            for j in range(i):
-                container = win_array[j]
-                if container.is_mandatory:
-                    continue
-
-                container_rect = Rect(
-                    max(container.area.x, 0),
-                    max(container.area.y, 0),
-                    container.area.w + min(0, container.area.x),
-                    container.area.h + min(0, container.area.y),
-                )
-                # check
-                if (
-                    container_rect.contains(victim_rect)
-                    and container.layer > victim.layer
-                ):
-                    victim.active = False
-                    break
+        for row, wid in enumerate(table.data["wid"].tolist()):
+            item = self._windows_by_id.get(wid)
+            if item == None:
+                item = Window(wid, table, row)
+                item.on_screen = True
+                self._windows_by_id[wid] = item
             else:
-                # print(f"activated: {victim.owner}")
-                victim.active = True
-        # end
-
-        # print active windows
-        # print("ACTIVE WINDOWS")
-        # for w in self.iter_active_windows():
-        #     print(w)
-
-    def move_pet(self, pet: "PetObject"):
-        """Move the pet object"""
-        hit = {"top": False, "right": False, "bottom": False, "left": False}
-        pet._vel.y += pet.MS
-
-        blocks = [window.area for window in self.iter_active_windows()]
-
-        # Separating Axis Theorem
-        # x-axis
-        pet._pos.x += pet._vel.x * settings.DELTA
-        pet._rect.x = pet._pos.x
-
-        # y-axis
-        pet._pos.y += pet._vel.y * settings.DELTA
-        pet._rect.y = pet._pos.y
-
-        for rect in blocks:
-            # check if collide with top line or bottom line
-            top = Rect(rect.x, rect.y, rect.w, 1)
-            bottom = Rect(rect.x, rect.y + rect.h, rect.w, 1)
-            # top line
-            if pet._rect.colliderect(top):
-                if pet._vel.y > 0:
-                    hit["bottom"] = True
-                    pet._vel.y = 0
-                    pet._pos.y = top.top - pet._rect.h + 1
-                else:
-                    hit["top"] = True
-                    pet._vel.y = 0
-                    pet._pos.y = top.bottom - 1
-            # bottom line
-            if pet._rect.colliderect(bottom):
-                if pet._vel.y > 0:
-                    hit["bottom"] = True
-                    pet._vel.y = 0
-                    pet._pos.y = bottom.top - pet._rect.h + 1
-                else:
-                    hit["top"] = True
-                    pet._vel.y = 0
-                    pet._pos.y = bottom.bottom - 1
-        # restriction #1 - cannot fall out of bottom of screen
-        if pet._rect.bottom >= self.screen_height:
-            hit["bottom"] = True
-            pet._vel.y = 0
-            pet._rect.bottom = self.screen_height - 1
-
-        # lerp
-        pet._vel.xy *= 0.7
-
-        print(pet._pos, pet._vel, time.time() - settings.START_TIME)
-
-        return hit
+                item.bind(table, row)
+                if wid in moved:
+                    item.area = Rect(geometry[row])
+            self.windows.append(item)
+
+        # the stacking and geometry are unchanged -- keep the edges
+        if not diff:
+            return diff
+
+        # screen areas touched by the diff (before and after)
+        changed = list(diff.changed())
+        self.dirty = [
+            Rect(x)
+            for t in (previous, table)
+            for x in t.data[np.isin(t.data["wid"], changed)][
+                ["x", "y", "w", "h"]
+            ].tolist()
+        ]
+        self.generation += 1
+
+        # find the visible parts of each window's top and bottom edge
+        # mandatory windows (dock, etc) never cover other windows
+        started = PROFILER.enabled and PROFILER.start()
+        owner, slot, x0, x1 = exposed_edges(
+            table.left,
+            table.right,
+            table.top,
+            table.bottom,
+            ~table.has_flag(FLAG_MANDATORY),
+            self.bounds,
+        )
+        if started:
+            PROFILER.stop("occlusion", started)
+        self.active = np.zeros(len(table), dtype=bool)
+        self.active[owner] = True
+
+        # hand the segments to the window views
+        for window in self.windows:
+            window.top_segments = []
+            window.bottom_segments = []
+        for i, s, a, b in zip(owner.tolist(), slot.tolist(), x0.tolist(), x1.tolist()):
+            window = self.windows[i]
+            (window.bottom_segments if s else window.top_segments).append((a, b))
+        for window, active in zip(self.windows, self.active.tolist()):
+            window.active = active
+
+        # rebuild collision edges once per snapshot
+        self.edges.rebuild(
+            x0,
+            x1,
+            np.where(slot, table.bottom[owner], table.top[owner]),
+            table.data["wid"][owner],
+            slot,
+        )
+
+        # cached paths through the changed windows are no longer valid
+        self.navigation.invalidate(self.dirty)
+
+        return diff
+
+    def get_window(self, wid: int) -> "Window":
+        return self._windows_by_id.get(wid)
+
+    def find_window(self, rect: "Rect") -> "Window":
+        """Front most active window overlapping `rect`"""
+        table = self.table
+        mask = (
+            self.active
+            & (table.left < rect.right)
+            & (table.right > rect.left)
+            & (table.top < rect.bottom)
+            & (table.bottom > rect.top)
+        )
+        found = np.flatnonzero(mask)
+        return self.windows[found[0]] if len(found) else None
+
+    def tick(self, delta: float) -> "WorldDiff":
+        """Swap in the latest snapshot and advance the physics clock"""
+        self.clock.advance(delta)
+        started = PROFILER.enabled and PROFILER.start()
+        diff = self.update()
+        if started:
+            PROFILER.stop("world", started)
+        return diff
+
+    def move_pet(self, pet: "Pet"):
+        """
+        Let physics move the pet this frame, returns its contacts.
+
+        All pets are moved together by `step_bodies` once the frame's states
+        ran, so the contacts are the ones of the last step.
+        """
+        self.bodies.moving[pet.body] = True
+        return pet._hit
+
+    def step_bodies(self):
+        """Run this frame's physics steps for every pet that asked to move"""
+        started = PROFILER.enabled and PROFILER.start()
+        # no step due this frame -- keep the last contacts
+        for _ in range(self.clock.steps):
+            self.bodies.step(self.edges, self.clock.step, self.screen_height)
+            if len(self.pets) > 1:
+                self.interactions.resolve(self.bodies)
+        self.bodies.moving[:] = False
+        if started:
+            PROFILER.stop("physics", started)
+
+    def nearby_pets(self, pet: "Pet", radius: float) -> ["Pet"]:
+        """Other pets at most `radius` px away from `pet`"""
+        if len(self.pets) < 2:
+            return []
+        rows = self.interactions.nearby(self.bodies, pet.body, radius)
+        return [self.pets[row] for row in rows.tolist() if row in self.pets]
+
+    def render_position(self, pet: "Pet") -> "Vector2":
+        """Pet position interpolated between the last two physics steps"""
+        return utils.lerp_vec(pet._prev_pos, pet._pos, self.clock.alpha)
@@ -0,0 +1,114 @@
+from source import pet, desktop, settings
+from source.animation import AnimationCache, AnimationClock, timing_animation
+from source.lifecycle import Lifecycle, PausableClock, VirtualClock
+from source.mainloop import MainLoop
+from source.pacing import FramePacer
+from source.profiler import PROFILER
+from source.scheduler import Scheduler
+
+
+# ---------------------------- #
+# host
+
+
+class HeadlessHost:
+    """
+    Pets and their world without a window, Qt or Quartz.
+
+    The desktop comes from any window source (`StaticWindowSource`,
+    `ReplaySource`, ...) and animations are played from their frame timing
+    only. `frame` runs the app's per frame work through a `MainLoop`,
+    which advances the host's `VirtualClock` by the delay the pacer asks
+    for, so simulated time does not depend on how long the frames took to
+    compute. With a `seed` (and a deterministic source, e.g. a
+    `ReplaySource` on the same clock) every run follows the same path.
+    """
+
+    def __init__(
+        self,
+        source: "WindowSource",
+        count: int = 1,
+        pet_data: str = "assets/pet.json",
+        clock: "VirtualClock" = None,
+        seed: int = None,
+    ):
+        self.virtual = clock if clock != None else VirtualClock()
+        self.seed = seed
+
+        # the window list is polled by `frame`, not by a thread
+        self.world = desktop.World(source, threaded=False)
+        self._next_poll = self.virtual()
+
+        # the same clocks, timers and pacing as a window host
+        self.time = PausableClock(self.virtual)
+        self.lifecycle = Lifecycle(self.time, self.world)
+        self.scheduler = Scheduler(self.time)
+        self.pacer = FramePacer(
+            settings.FPS, settings.IDLE_FPS, settings.IDLE_AFTER, self.time
+        )
+        self.clock = AnimationClock(self.time)
+        self.cache = AnimationCache(settings.ANIMATION_CACHE_MB << 20, timing_animation)
+
+        self.pet_data = pet_data
+        self.pets = []
+        self.spawn(count)
+
+        self.loop = MainLoop(self)
+
+    # ============================================ #
+
+    def spawn(self, count: int) -> [int]:
+        """Add `count` pets, returns their indices in `pets`"""
+        first = len(self.pets)
+        for _ in range(count):
+            self.pets.append(
+                pet.Pet(self, self.pet_data, self.cache, self.clock, self.seed)
+            )
+        return list(range(first, len(self.pets)))
+
+    def pet_resized(self, pet: "Pet"):
+        pass
+
+    def is_resting(self) -> bool:
+        """Nothing changed this frame and every pet stays idle"""
+        return not self.world.last_diff and all(p.is_resting() for p in self.pets)
+
+    def is_offscreen(self) -> bool:
+        return not any(self.world.bounds.colliderect(p._rect) for p in self.pets)
+
+    def update_state(self):
+        """Advance every pet by a frame"""
+        self.clock.tick()
+        self.world.tick(settings.DELTA)
+
+        started = PROFILER.enabled and PROFILER.start()
+        for p in self.pets:
+            p.update_state()
+        if started:
+            PROFILER.stop("statemachine", started)
+        self.world.step_bodies()
+
+    # ============================================ #
+
+    def frame(self) -> float:
+        """Run one frame, returns the seconds until the next one is due"""
+        poller = self.world.poller
+        now = self.virtual()
+        if now >= self._next_poll and not poller.paused:
+            started = PROFILER.enabled and PROFILER.start()
+            poller.poll()
+            if started:
+                PROFILER.stop("poll", started)
+            self._next_poll = now + poller.interval
+        return self.loop.frame()
+
+    def run(self, seconds: float = None, frames: int = None) -> int:
+        """Simulate `seconds` of virtual time or `frames` frames, returns the frames"""
+        end = self.virtual() + seconds if seconds != None else None
+        count = 0
+        while (end == None or self.virtual() < end) and (
+            frames == None or count < frames
+        ):
+            self.frame()
+            count += 1
+        return count
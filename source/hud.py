@@ -0,0 +1,190 @@
+import time
+
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QColor, QPainter, QPicture, QPolygonF
+from PyQt5.QtWidgets import QWidget
+
+from source import settings
+from source.profiler import PROFILER
+
+
+# ---------------------------- #
+# constants
+
+# panel re-recordings per second
+HUD_RATE = 4
+
+# phases with a bar, `poll` comes from the poller thread
+HUD_PHASES = ("poll", "occlusion", "physics", "statemachine", "paint")
+
+GRAPH_FRAMES = 120
+MARGIN = 6
+LINE = 13
+PANEL_WIDTH = 2 * MARGIN + 2 * GRAPH_FRAMES
+GRAPH_HEIGHT = 40
+BAR_LABEL = 80
+
+# ---------------------------- #
+# hud
+
+
+class ProfilerHud:
+    """
+    Debug overlay: active window outlines and a live profiler panel.
+
+    Both are recorded into `QPicture`s -- the outlines whenever the world
+    snapshot changes, the panel `rate` times a second -- and a paint event
+    only replays them. `update` is meant to be timed on its own so the
+    HUD doesn't show up in the phases it displays.
+    """
+
+    def __init__(self, world: "World", rate: float = HUD_RATE, clock=time.monotonic):
+        self.world = world
+        self.rate = rate
+        self.clock = clock
+
+        self.geometry = QPicture()
+        self.panel = QPicture()
+        self._generation = None
+        self._recorded = None
+
+        # bumped on every re-recording, part of the host's repaint key
+        self.version = 0
+
+    def update(self, rates: {str: float}, lines: [str] = ()) -> bool:
+        """Re-record what is out of date, returns True when it changed"""
+        changed = False
+        if self.world.generation != self._generation:
+            self._generation = self.world.generation
+            self.geometry = self._record_geometry()
+            changed = True
+
+        now = self.clock()
+        if self._recorded == None or now - self._recorded >= 1.0 / self.rate:
+            self._recorded = now
+            self.panel = self._record_panel(rates, lines)
+            changed = True
+
+        if changed:
+            self.version += 1
+        return changed
+
+    def paint(self, painter: "QPainter"):
+        """Replay both pictures, `painter` draws in global screen coordinates"""
+        painter.drawPicture(0, 0, self.geometry)
+        painter.drawPicture(0, 0, self.panel)
+
+    # ---------------------------- #
+    # recording
+
+    def _record_geometry(self) -> "QPicture":
+        picture = QPicture()
+        painter = QPainter(picture)
+
+        # draw rectangles around all active windows within the desktop
+        painter.setPen(QColor(255, 255, 255, 255))
+        painter.setBrush(QColor(0, 0, 0, 0))
+        for window in self.world.iter_active_windows():
+            area = window.area
+            painter.drawRect(area.x, area.y, area.w, area.h)
+        painter.end()
+        return picture
+
+    def _record_panel(self, rates: {str: float}, lines: [str]) -> "QPicture":
+        picture = QPicture()
+        painter = QPainter(picture)
+        budget = 1.0 / settings.FPS
+        bars_top = MARGIN + GRAPH_HEIGHT + MARGIN
+        text_top = bars_top + len(HUD_PHASES) * LINE + MARGIN
+        height = text_top + (2 + len(lines)) * LINE + MARGIN
+
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 160))
+        painter.drawRect(0, 0, PANEL_WIDTH, height)
+
+        # frame times, up to twice the frame budget (the dim line)
+        scale = GRAPH_HEIGHT / (2 * budget)
+        bottom = MARGIN + GRAPH_HEIGHT
+        line = int(bottom - budget * scale)
+        painter.setPen(QColor(255, 255, 255, 80))
+        painter.drawLine(MARGIN, line, PANEL_WIDTH - MARGIN, line)
+        frames = PROFILER.frames.values()[-GRAPH_FRAMES:].tolist()
+        painter.setPen(QColor(120, 255, 120))
+        painter.drawPolyline(
+            QPolygonF(
+                [
+                    QPointF(MARGIN + 2 * i, bottom - min(value, 2 * budget) * scale)
+                    for i, value in enumerate(frames)
+                ]
+            )
+        )
+
+        # median time per frame of each phase, bars relative to the budget
+        for row, phase in enumerate(HUD_PHASES):
+            if phase == "poll":
+                buffer = self.world.poller.durations
+            else:
+                buffer = PROFILER.phases.get(phase)
+            value = buffer.percentiles((50,))[50] if buffer != None else 0.0
+
+            y = bars_top + row * LINE
+            width = int(min(value / budget, 1.0) * (PANEL_WIDTH - BAR_LABEL - MARGIN))
+            painter.fillRect(BAR_LABEL, y + 3, width, LINE - 4, QColor(255, 180, 60))
+            painter.setPen(QColor(255, 255, 255))
+            painter.drawText(MARGIN, y + LINE - 2, f"{phase} {value * 1000:.2f}")
+
+        # counters
+        active = int(self.world.active.sum())
+        text = [
+            f"windows: {active} | poll: {self.world.poller.get_poll_rate():.1f}/s",
+            " | ".join(f"{name}: {rate * 100:.0f}%" for name, rate in rates.items()),
+            *lines,
+        ]
+        for row, line in enumerate(text):
+            painter.drawText(MARGIN, text_top + (row + 1) * LINE - 2, line)
+
+        painter.end()
+        return picture
+
+
+class HudOverlay(QWidget):
+    """
+    Transparent, click through window covering one screen that shows a
+    `ProfilerHud`.
+
+    The pet's own window is only as big as the pet, so the HUD gets a
+    window of its own. `geometry` is the screen in global coordinates; the
+    painter is moved by its top left so the outlines land on the windows
+    they belong to.
+    """
+
+    def __init__(self, hud: "ProfilerHud", geometry: "QRect"):
+        super().__init__()
+        self.hud = hud
+
+        self.setWindowTitle(settings.APPLICATION_NAME)
+        self.setWindowFlags(
+            Qt.FramelessWindowHint
+            | Qt.WindowStaysOnTopHint
+            | Qt.WindowTransparentForInput
+            | Qt.Tool
+        )
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setGeometry(geometry)
+
+    def paintEvent(self, event):
+        started = PROFILER.enabled and PROFILER.start()
+        painter = QPainter(self)
+
+        # clear surface
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(self.rect(), Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        # window outlines + profiler panel
+        painter.translate(-self.x(), -self.y())
+        self.hud.paint(painter)
+        painter.end()
+        if started:
+            PROFILER.stop("hud", started)
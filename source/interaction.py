@@ -0,0 +1,177 @@
+import numpy as np
+
+from source.bodies import SIDES
+
+
+# ---------------------------- #
+# constants
+
+TOP = SIDES.index("top")
+BOTTOM = SIDES.index("bottom")
+
+# ---------------------------- #
+# broadphase
+
+
+class SweepAndPrune:
+    """
+    Bodies sorted by their left side.
+
+    `update` re-sorts starting from the previous frame's order, which is
+    almost sorted already, so the (stable, adaptive) sort is close to
+    linear. Pairs overlapping along x are then found with one binary search
+    per body instead of testing every pair.
+    """
+
+    def __init__(self):
+        self.order = np.zeros(0, dtype=np.int64)
+        self.left = np.zeros(0, dtype=np.float64)
+        self.right = np.zeros(0, dtype=np.float64)
+
+    def update(self, left: "np.ndarray", right: "np.ndarray"):
+        """Sort rows `0..len(left)` by `left`; rows at `inf` are ignored"""
+        count = len(left)
+        order = self.order[self.order < count]
+        if len(order) < count:
+            # new rows are always appended
+            order = np.concatenate([order, np.arange(len(order), count)])
+        order = order[np.argsort(left[order], kind="stable")]
+
+        self.order = order
+        self.left = left[order]
+        self.right = right[order]
+
+    def pairs(self) -> ("np.ndarray", "np.ndarray"):
+        """Rows `(a, b)` of every pair overlapping along x"""
+        count = len(self.order)
+        if count < 2:
+            empty = np.zeros(0, dtype=np.int64)
+            return empty, empty
+
+        # every later body starting before this one ends overlaps it
+        end = np.searchsorted(self.left, self.right, side="left")
+        start = np.arange(1, count + 1)
+        counts = np.maximum(end - start, 0)
+        first = np.repeat(np.arange(count), counts)
+        offset = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        second = np.repeat(start, counts) + offset
+        return self.order[first], self.order[second]
+
+    def within(self, low: float, high: float) -> "np.ndarray":
+        """Rows with their left side in `[low, high]`"""
+        lo = np.searchsorted(self.left, low, side="left")
+        hi = np.searchsorted(self.left, high, side="right")
+        return self.order[lo:hi]
+
+
+# ---------------------------- #
+# interactions
+
+
+class PetInteractions:
+    """
+    Pet to pet contacts on top of a `BodyTable`.
+
+    After every physics step `resolve` pushes overlapping pets apart: a pet
+    coming down on another one stands on it (stacking), pets overlapping
+    side by side are pushed apart horizontally (bumping). Only bodies that
+    moved this step are pushed, the others are obstacles. `nearby` answers
+    neighbour queries from the same sorted order.
+    """
+
+    def __init__(self):
+        self.broadphase = SweepAndPrune()
+        self._left = None
+        self._max_width = 0
+
+        # stats
+        self.candidates = 0
+        self.contacts = 0
+
+    def _left_sides(self, bodies: "BodyTable") -> "np.ndarray":
+        count = bodies.count
+        return np.where(bodies.alive[:count], bodies.x[:count], np.inf)
+
+    def _sort(self, bodies: "BodyTable"):
+        count = bodies.count
+        alive = bodies.alive[:count]
+        left = self._left_sides(bodies)
+        right = left + bodies.w[:count]
+        self.broadphase.update(left, right)
+        self._left = left
+        self._max_width = int(bodies.w[:count][alive].max()) if alive.any() else 0
+
+    def resolve(self, bodies: "BodyTable"):
+        """Separate every overlapping pair that involves a moving body"""
+        self._sort(bodies)
+        a, b = self.broadphase.pairs()
+        self.candidates += len(a)
+
+        # narrow phase -- overlapping on y as well, one of them moving
+        x, y, w, h = bodies.x, bodies.y, bodies.w, bodies.h
+        moving = bodies.moving
+        keep = (y[a] < y[b] + h[b]) & (y[b] < y[a] + h[a]) & (moving[a] | moving[b])
+        a = a[keep]
+        b = b[keep]
+        self.contacts += len(a)
+        if not len(a):
+            return
+
+        overlap_x = np.minimum(x[a] + w[a], x[b] + w[b]) - np.maximum(x[a], x[b])
+        overlap_y = np.minimum(y[a] + h[a], y[b] + h[b]) - np.maximum(y[a], y[b])
+
+        # stacking -- resolve along the smaller overlap, the upper one stands
+        vertical = overlap_y <= overlap_x
+        a_upper = y[a] + h[a] * 0.5 < y[b] + h[b] * 0.5
+        upper = np.where(a_upper, a, b)[vertical]
+        lower = np.where(a_upper, b, a)[vertical]
+        lift_by = overlap_y[vertical]
+        stands = moving[upper]
+        lift = np.zeros(bodies.count, dtype=np.float64)
+        np.maximum.at(lift, upper[stands], lift_by[stands])
+        bodies.y[: bodies.count] -= lift
+        landed = upper[stands]
+        bodies.vy[landed] = np.minimum(bodies.vy[landed], 0.0)
+        bodies.contact[landed, BOTTOM] = True
+        lower = lower[stands]
+        bodies.contact[lower[moving[lower]], TOP] = True
+
+        # bumping -- push apart along x, split between the moving ones
+        side = ~vertical
+        a_left = (x[a] + w[a] * 0.5 <= x[b] + w[b] * 0.5)[side]
+        first = a[side]
+        second = b[side]
+        push = overlap_x[side]
+        both = moving[first] & moving[second]
+        share_first = np.where(both, 0.5, moving[first].astype(np.float64))
+        share_second = np.where(both, 0.5, moving[second].astype(np.float64))
+        direction = np.where(a_left, -1.0, 1.0)
+        shift = np.zeros(bodies.count, dtype=np.float64)
+        np.add.at(shift, first, direction * push * share_first)
+        np.add.at(shift, second, -direction * push * share_second)
+        bodies.x[: bodies.count] += shift
+        self._left = None
+
+    # ---------------------------- #
+    # queries
+
+    def nearby(self, bodies: "BodyTable", row: int, radius: float) -> "np.ndarray":
+        """Rows of the bodies at most `radius` px away from body `row`"""
+        # many queries per frame share one sort, as long as nothing moved
+        left = self._left_sides(bodies)
+        if self._left is None or not np.array_equal(left, self._left):
+            self._sort(bodies)
+        x, y, w, h = bodies.x, bodies.y, bodies.w, bodies.h
+        found = self.broadphase.within(
+            x[row] - radius - self._max_width, x[row] + w[row] + radius
+        )
+        found = found[found != row]
+
+        # gap between the two rects along each axis (0 when overlapping)
+        gap_x = np.maximum(
+            np.maximum(x[found] - (x[row] + w[row]), x[row] - (x[found] + w[found])), 0
+        )
+        gap_y = np.maximum(
+            np.maximum(y[found] - (y[row] + h[row]), y[row] - (y[found] + h[found])), 0
+        )
+        return found[np.hypot(gap_x, gap_y) <= radius]
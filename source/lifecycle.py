@@ -0,0 +1,98 @@
+import time
+
+
+# ---------------------------- #
+# clocks
+
+
+class VirtualClock:
+    """Time that only moves when `advance` is called"""
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class PausableClock:
+    """
+    `time.monotonic` that stands still while paused.
+
+    Everything that measures simulated time (state timers, animations,
+    frame pacing) reads the host's clock, so pausing it freezes them all at
+    once and resuming carries on from exactly where they were.
+    """
+
+    def __init__(self, clock: "function" = time.monotonic):
+        self.clock = clock
+        self._offset = 0.0
+        self._paused: float = None
+
+    def pause(self):
+        if self._paused == None:
+            self._paused = self.clock()
+
+    def resume(self):
+        if self._paused != None:
+            self._offset += self.clock() - self._paused
+            self._paused = None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused != None
+
+    def __call__(self) -> float:
+        now = self._paused if self._paused != None else self.clock()
+        return now - self._offset
+
+
+# ---------------------------- #
+# suspend / resume
+
+
+class Lifecycle:
+    """
+    Suspend / resume of a host.
+
+    A host is suspended while there is any reason for it ("hidden",
+    "locked", "offscreen", ...) and resumes once the last one is lifted.
+    Suspending pauses the host clock and parks the world's window poller;
+    the main loop then only dispatches signals, at `SUSPENDED_DELTA`.
+    """
+
+    def __init__(self, clock: "PausableClock", world: "World"):
+        self.clock = clock
+        self.world = world
+        self.reasons = set()
+
+        # stats
+        self.suspends = 0
+
+    @property
+    def suspended(self) -> bool:
+        return bool(self.reasons)
+
+    def suspend(self, reason: str) -> bool:
+        """Add a reason, returns True if this suspended the host"""
+        first = not self.reasons
+        self.reasons.add(reason)
+        if first:
+            self.clock.pause()
+            self.world.poller.pause()
+            self.suspends += 1
+        return first
+
+    def resume(self, reason: str) -> bool:
+        """Lift a reason, returns True if this resumed the host"""
+        if reason not in self.reasons:
+            return False
+        self.reasons.discard(reason)
+        if self.reasons:
+            return False
+        self.world.poller.resume()
+        self.clock.resume()
+        return True
@@ -0,0 +1,98 @@
+from source import settings, signal
+from source.profiler import PROFILER
+
+
+# ---------------------------- #
+# loop
+
+
+class MainLoop:
+    """
+    The per frame work of the application.
+
+    `frame` runs one frame of `host` (a `TransparentWindow` or `PetSwarm`)
+    and returns the seconds until the next one is due; `main.py` hands that
+    to `callLater`. `app` is the `QApplication` whose events are processed
+    every frame, `control` an optional `ControlServer`.
+
+    While the host is suspended a frame only dispatches signals (one of
+    them resumes it), every `SUSPENDED_DELTA` seconds.
+
+    A host with a `virtual` clock runs on frame time: the clock moves by
+    exactly the delay of every frame, and signals and commands are not cut
+    off by a wall clock budget.
+    """
+
+    def __init__(self, host, app=None, control: "ControlServer" = None):
+        self.host = host
+        self.app = app
+        self.control = control
+
+        # stats
+        self.frames = 0
+        self.parked = 0
+
+    def frame(self) -> float:
+        delay = self._frame()
+        if self.host.virtual != None:
+            self.host.virtual.advance(delay)
+        return delay
+
+    def _budget(self, ms: float) -> float:
+        return None if self.host.virtual != None else ms / 1000
+
+    def _frame(self) -> float:
+        host = self.host
+        if host.lifecycle.suspended:
+            return self._parked()
+
+        pacer = host.pacer
+        settings.DELTA = pacer.begin()
+        self.frames += 1
+
+        if self.app != None:
+            started = PROFILER.enabled and PROFILER.start()
+            self.app.processEvents()
+            if started:
+                PROFILER.stop("events", started)
+
+        started = PROFILER.enabled and PROFILER.start()
+        busy = signal.BUS.dispatch(self._budget(settings.SIGNAL_BUDGET_MS)) > 0
+        if started:
+            PROFILER.stop("signals", started)
+
+        # hidden by one of the signals
+        if host.lifecycle.suspended:
+            return settings.SUSPENDED_DELTA
+
+        if self.control != None:
+            started = PROFILER.enabled and PROFILER.start()
+            busy = (
+                self.control.process(self._budget(settings.CONTROL_BUDGET_MS)) > 0
+                or busy
+            )
+            if started:
+                PROFILER.stop("control", started)
+
+        # every state timer of every pet fires from here, once per frame
+        started = PROFILER.enabled and PROFILER.start()
+        host.scheduler.run()
+        if started:
+            PROFILER.stop("timers", started)
+        host.update_state()
+        PROFILER.frame()
+
+        if settings.SUSPEND_OFFSCREEN and host.is_offscreen():
+            host.lifecycle.suspend("offscreen")
+            return settings.SUSPENDED_DELTA
+
+        return pacer.end(busy or not host.is_resting())
+
+    def _parked(self) -> float:
+        """Wait for the signal that resumes the host"""
+        self.parked += 1
+        signal.BUS.dispatch(self._budget(settings.SIGNAL_BUDGET_MS))
+        if self.host.lifecycle.suspended:
+            return settings.SUSPENDED_DELTA
+        # resumed -- the next frame right away
+        return 0.0
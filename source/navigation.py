@@ -0,0 +1,460 @@
+import heapq
+
+import numpy as np
+
+from pygame import Rect
+from source import settings
+from source.physics import jump_height
+
+
+# ---------------------------- #
+# constants
+
+WALK = "walk"
+FALL = "fall"
+JUMP = "jump"
+GOAL = "goal"
+
+# extra height a jump aims above its target platform
+JUMP_MARGIN = 12
+
+# seconds a jump takes, used as its cost
+JUMP_COST = 1.0
+
+# ---------------------------- #
+# graph
+
+
+class Platform:
+    """
+    A walkable surface: a visible window edge or the screen floor.
+
+    `y` is the row the pet's bottom row rests on, `x0`/`x1` the surface.
+    """
+
+    __slots__ = ("index", "wid", "slot", "y", "x0", "x1")
+
+    def __init__(self, index: int, wid: int, slot: int, y: int, x0: int, x1: int):
+        self.index = index
+        self.wid = wid
+        self.slot = slot
+        self.y = y
+        self.x0 = x0
+        self.x1 = x1
+
+    def key(self) -> tuple:
+        """Identity of the surface, stable as long as it doesn't change"""
+        return (self.wid, self.slot, self.y, self.x0, self.x1)
+
+    def standing_range(self, width: int) -> (int, int):
+        """Pet left positions that keep the whole pet on the surface"""
+        if self.x1 - self.x0 >= width:
+            return (self.x0, self.x1 - width)
+        middle = (self.x0 + self.x1 - width) // 2
+        return (middle, middle)
+
+    def __str__(self):
+        return f"Platform: {self.index:4} | wid: {self.wid} | y: {self.y:5} | x: {self.x0:5} - {self.x1:5}"
+
+
+class Link:
+    """Move from one platform to another, starting at pet left position `launch`"""
+
+    __slots__ = ("kind", "source", "target", "launch", "land", "cost")
+
+    def __init__(self, kind: str, source: int, target: int, launch: int, land: int):
+        self.kind = kind
+        self.source = source
+        self.target = target
+        self.launch = launch
+        self.land = land
+        self.cost = 0.0
+
+
+class Step:
+    """
+    One waypoint of a planned path.
+
+    Walk to `x` on the current surface, then perform `kind` to reach the
+    surface on row `y`. Falls keep walking in `direction` until the pet is
+    off the edge. The last step of a path is a `GOAL`.
+    """
+
+    __slots__ = ("kind", "x", "y", "direction")
+
+    def __init__(self, kind: str, x: int, y: int, direction: int):
+        self.kind = kind
+        self.x = x
+        self.y = y
+        self.direction = direction
+
+    def __repr__(self):
+        return f"Step({self.kind}, {self.x}, {self.y}, {self.direction})"
+
+
+class NavGraph:
+    """
+    Walkable platforms of one world snapshot for one pet size, with the
+    fall, jump and walk links between them.
+
+    Built from the graph of an older snapshot (`previous`), only the
+    platforms a changed platform could affect are linked again, the others
+    keep their links.
+    """
+
+    def __init__(
+        self, world: "World", width: int, height: int, previous: "NavGraph" = None
+    ):
+        self.width = width
+        self.height = height
+        self.generation = world.generation
+        self.platforms = []
+        self.links = []
+
+        # stats
+        self.relinked = 0
+
+        # every visible edge is a platform, plus the screen floor
+        edges = world.edges
+        for y, x0, x1, wid, slot in zip(
+            edges.y.tolist(),
+            edges.x0.tolist(),
+            edges.x1.tolist(),
+            edges.owner.tolist(),
+            edges.slot.tolist(),
+        ):
+            self.platforms.append(Platform(len(self.platforms), wid, slot, y, x0, x1))
+        self.floor = Platform(
+            len(self.platforms), None, 0, world.screen_height - 2, 0, world.screen_width
+        )
+        self.platforms.append(self.floor)
+
+        self._y = np.array([p.y for p in self.platforms], dtype=np.int64)
+        self._x0 = np.array([p.x0 for p in self.platforms], dtype=np.int64)
+        self._x1 = np.array([p.x1 for p in self.platforms], dtype=np.int64)
+
+        self.max_jump = jump_height(settings.JUMP_SPEED) - JUMP_MARGIN
+        if previous != None and (previous.width, previous.height) == (width, height):
+            self._patch_links(previous)
+        else:
+            self._build_links()
+
+    # ---------------------------- #
+    # building
+
+    def _landing(self, left: int, above: int) -> int:
+        """First platform below row `above` caught by a pet falling at `left`"""
+        mask = (self._y > above) & (self._x0 < left + self.width) & (self._x1 > left)
+        found = np.flatnonzero(mask)
+        if not len(found):
+            return self.floor.index
+        return int(found[np.argmin(self._y[found])])
+
+    def _add_link(self, link: "Link"):
+        source = self.platforms[link.source]
+        target = self.platforms[link.target]
+        if link.kind == FALL:
+            link.cost = (target.y - source.y) / (settings.GRAVITY / settings.DRAG)
+        elif link.kind == JUMP:
+            link.cost = JUMP_COST
+        self.links[link.source].append(link)
+
+    def _build_links(self):
+        self.links = [[] for _ in self.platforms]
+        for platform in self.platforms:
+            self._link(platform)
+
+    def _patch_links(self, previous: "NavGraph"):
+        """Link the platforms near a changed one, copy the rest from `previous`"""
+        old = {p.key(): p.index for p in previous.platforms}
+        new = {p.key(): p.index for p in self.platforms}
+        renumber = {i: new[key] for key, i in old.items() if key in new}
+        changed = [p for p in self.platforms if p.key() not in old]
+        changed += [p for p in previous.platforms if p.key() not in new]
+
+        # a platform only links to surfaces in the columns below it, the
+        # rows it can jump up to, and the row it is on
+        affected = np.zeros(len(self.platforms), dtype=bool)
+        if changed:
+            y = np.array([p.y for p in changed], dtype=np.int64)
+            x0 = np.array([p.x0 for p in changed], dtype=np.int64)
+            x1 = np.array([p.x1 for p in changed], dtype=np.int64)
+            affected = (
+                (y[None, :] >= self._y[:, None] - self.max_jump - JUMP_MARGIN)
+                & (x0[None, :] < self._x1[:, None] + self.width)
+                & (x1[None, :] > self._x0[:, None] - self.width)
+            ).any(axis=1)
+
+        self.links = [[] for _ in self.platforms]
+        for platform, dirty in zip(self.platforms, affected.tolist()):
+            before = old.get(platform.key())
+            if dirty or before == None:
+                self._link(platform)
+                continue
+            for link in previous.links[before]:
+                copy = Link(
+                    link.kind,
+                    platform.index,
+                    renumber[link.target],
+                    link.launch,
+                    link.land,
+                )
+                copy.cost = link.cost
+                self.links[platform.index].append(copy)
+
+    def _link(self, source: "Platform"):
+        """Add every link leaving `source`"""
+        self.relinked += 1
+        width = self.width
+
+        if source is not self.floor:
+            # walk off either end and fall
+            for launch in (source.x1, source.x0 - width):
+                target = self._landing(launch, source.y)
+                self._add_link(Link(FALL, source.index, target, launch, launch))
+
+        # surfaces above, close enough to jump to and overlapping
+        mask = (
+            (self._y < source.y)
+            & (self._y >= source.y - self.max_jump)
+            & (self._x0 < source.x1)
+            & (self._x1 > source.x0)
+        )
+        for index in np.flatnonzero(mask).tolist():
+            target = self.platforms[index]
+            low = max(source.x0, target.x0)
+            high = min(source.x1, target.x1)
+            launch = max(low, (low + high - width) // 2)
+
+            # another surface right above the target would catch the pet
+            apex = target.y - JUMP_MARGIN
+            blocked = (
+                (self._y >= apex)
+                & (self._y < target.y)
+                & (self._x0 < launch + width)
+                & (self._x1 > launch)
+            )
+            if blocked.any():
+                continue
+            self._add_link(Link(JUMP, source.index, index, launch, launch))
+
+        # touching surfaces on the same row
+        mask = (self._y == source.y) & (self._x0 <= source.x1) & (self._x1 >= source.x0)
+        for index in np.flatnonzero(mask).tolist():
+            if index == source.index:
+                continue
+            target = self.platforms[index]
+            border = target.x0 if target.x0 >= source.x0 else target.x1 - width
+            self._add_link(Link(WALK, source.index, index, border, border))
+
+    # ---------------------------- #
+    # queries
+
+    def locate(self, rect: "Rect") -> "Platform":
+        """Platform the pet is standing on, None while in the air"""
+        row = rect.bottom - 1
+        mask = (
+            (np.abs(self._y - row) <= 1)
+            & (self._x0 < rect.right)
+            & (self._x1 > rect.left)
+        )
+        found = np.flatnonzero(mask)
+        if not len(found):
+            return None
+        return self.platforms[int(found[np.argmin(self._y[found])])]
+
+    def find(self, key: tuple) -> "Platform":
+        for platform in self.platforms:
+            if platform.key() == key:
+                return platform
+        return None
+
+    def reachable(self, start: "Platform") -> ["Platform"]:
+        """All platforms that can be reached from `start`"""
+        seen = {start.index}
+        queue = [start.index]
+        while queue:
+            index = queue.pop()
+            for link in self.links[index]:
+                if link.target not in seen:
+                    seen.add(link.target)
+                    queue.append(link.target)
+        return [self.platforms[i] for i in sorted(seen)]
+
+    def plan(
+        self, start: "Platform", x: int, goal: "Platform", goal_x: int, speed: float
+    ):
+        """
+        A* from pet left position `x` on `start` to `goal_x` on `goal`.
+
+        Costs are seconds: walking at `speed`, falling at terminal velocity,
+        a fixed cost per jump. Returns the links, None if the goal is out of
+        reach.
+        """
+
+        def heuristic(position: int) -> float:
+            return abs(goal_x - position) / speed
+
+        best = {start.index: 0.0}
+        arrival = {start.index: x}
+        came_from = {}
+        queue = [(heuristic(x), 0, start.index)]
+        counter = 1
+        while queue:
+            _, _, index = heapq.heappop(queue)
+            if index == goal.index:
+                break
+            position = arrival[index]
+            for link in self.links[index]:
+                cost = best[index] + abs(link.launch - position) / speed + link.cost
+                if cost < best.get(link.target, float("inf")):
+                    best[link.target] = cost
+                    arrival[link.target] = link.land
+                    came_from[link.target] = link
+                    heapq.heappush(
+                        queue, (cost + heuristic(link.land), counter, link.target)
+                    )
+                    counter += 1
+        if goal.index not in best:
+            return None
+
+        links = []
+        index = goal.index
+        while index != start.index:
+            link = came_from[index]
+            links.append(link)
+            index = link.source
+        links.reverse()
+        return links
+
+
+# ---------------------------- #
+# navigator
+
+
+class Navigator:
+    """
+    Path planning for the pets of a world.
+
+    There is one graph per pet size. When the world changes it is patched
+    from the previous one instead of being built again.
+
+    Routes -- the jumps and falls between two platforms -- are cached per
+    (start platform, goal platform, pet size) together with the screen area
+    they pass through. Only the routes crossing a changed window are
+    dropped when the world changes. A route is planned from the position
+    of the first query, later queries reuse it and only walk to their own
+    goal at the end.
+    """
+
+    def __init__(self, world: "World"):
+        self.world = world
+        self._graphs = {}
+        self._routes = {}
+
+        # stats
+        self.hits = 0
+        self.misses = 0
+
+    def graph(self, width: int, height: int) -> "NavGraph":
+        key = (width, height)
+        graph = self._graphs.get(key)
+        if graph == None or graph.generation != self.world.generation:
+            graph = NavGraph(self.world, width, height, graph)
+            self._graphs[key] = graph
+        return graph
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def invalidate(self, areas: ["Rect"]):
+        """Forget the cached routes that pass through any of `areas`"""
+        if not areas:
+            return
+        self._routes = {
+            key: (steps, corridor)
+            for key, (steps, corridor) in self._routes.items()
+            if not any(rect.collidelist(areas) != -1 for rect in corridor)
+        }
+
+    # ---------------------------- #
+    # queries
+
+    def locate(self, rect: "Rect") -> "Platform":
+        return self.graph(rect.w, rect.h).locate(rect)
+
+    def reachable(self, rect: "Rect") -> ["Platform"]:
+        """Platforms reachable from where the pet stands"""
+        graph = self.graph(rect.w, rect.h)
+        start = graph.locate(rect)
+        if start == None:
+            return []
+        return graph.reachable(start)
+
+    def plan(
+        self, rect: "Rect", goal: "Platform", goal_x: int, speed: float
+    ) -> ["Step"]:
+        """
+        Steps from the pet at `rect` to pet left position `goal_x` on
+        `goal` walking at `speed`, None if it can't get there.
+        """
+        graph = self.graph(rect.w, rect.h)
+        start = graph.locate(rect)
+        if start == None:
+            return None
+
+        key = (start.key(), goal.key(), rect.w, rect.h)
+        cached = self._routes.get(key)
+        if cached != None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            links = graph.plan(start, rect.x, goal, goal_x, speed)
+            if links == None:
+                return None
+            cached = self._route(graph, start, goal, links, rect)
+            self._routes[key] = cached
+        return cached[0] + [Step(GOAL, goal_x, goal.y, 0)]
+
+    def _route(
+        self,
+        graph: "NavGraph",
+        start: "Platform",
+        goal: "Platform",
+        links: ["Link"],
+        rect: "Rect",
+    ) -> (["Step"], ["Rect"]):
+        """Steps of `links` + the area the pet moves through"""
+        steps = []
+        # the walks at both ends depend on the query, keep the whole surface
+        corridor = [self._surface_area(start, rect), self._surface_area(goal, rect)]
+        position = None
+        current = start
+        for link in links:
+            target = graph.platforms[link.target]
+            direction = 1 if link.launch >= current.x1 else -1
+            steps.append(Step(link.kind, link.launch, target.y, direction))
+            if position != None:
+                corridor.append(self._walk_area(current, position, link.launch, rect))
+            top = min(current.y, target.y) - rect.h - JUMP_MARGIN
+            corridor.append(
+                Rect(
+                    min(link.launch, link.land),
+                    top,
+                    abs(link.land - link.launch) + rect.w,
+                    max(current.y, target.y) - top + 1,
+                )
+            )
+            position = link.land
+            current = target
+        return steps, corridor
+
+    def _surface_area(self, platform: "Platform", rect: "Rect") -> "Rect":
+        return self._walk_area(platform, platform.x0, platform.x1 - rect.w, rect)
+
+    def _walk_area(self, platform: "Platform", start: int, end: int, rect: "Rect"):
+        left = min(start, end)
+        return Rect(
+            left, platform.y - rect.h + 1, abs(end - start) + rect.w, rect.h + 1
+        )
@@ -0,0 +1,286 @@
+import numpy as np
+
+
+# ---------------------------- #
+# constants
+
+# windows swept at once -- their edges are tested against each other in one
+# vectorized pass, and against the bands covered by the windows in front
+BLOCK_SIZE = 64
+
+# ---------------------------- #
+# helpers
+
+
+def _spans(start: "np.ndarray", count: "np.ndarray") -> ("np.ndarray", "np.ndarray"):
+    """Every `(i, start[i] + k)` with `k < count[i]`, as two arrays"""
+    rows = np.repeat(np.arange(len(count)), count)
+    offset = np.arange(len(rows)) - np.repeat(np.cumsum(count) - count, count)
+    return rows, start[rows] + offset
+
+
+def _union(
+    group: "np.ndarray", x0: "np.ndarray", x1: "np.ndarray"
+) -> ("np.ndarray", "np.ndarray", "np.ndarray"):
+    """Merge the `[x0, x1)` intervals of every group, sorted by group then x"""
+    order = np.lexsort((x0, group))
+    group = group[order]
+    x0 = x0[order]
+    x1 = x1[order]
+
+    # running maximum of the right side, restarted for every group
+    base = x0.min()
+    span = x1.max() - base + 1
+    shift = group * span
+    reach = np.maximum.accumulate(x1 - base + shift) - shift + base
+
+    # an interval starts a new run if it begins past everything before it
+    start = np.ones(len(group), dtype=bool)
+    start[1:] = (group[1:] != group[:-1]) | (x0[1:] > reach[:-1])
+    first = np.flatnonzero(start)
+    last = np.append(first[1:] - 1, len(group) - 1)
+    return group[first], x0[first], reach[last]
+
+
+class _Region:
+    """
+    Union of rectangles as bands of rows, each with its sorted, merged x
+    intervals. Bands are disjoint and sorted by row; touching bands with
+    the same intervals are joined, so a screen that is mostly covered stays
+    a handful of bands.
+    """
+
+    def __init__(self):
+        self.y0 = np.zeros(0, dtype=np.int64)
+        self.y1 = np.zeros(0, dtype=np.int64)
+        self.start = np.zeros(1, dtype=np.int64)
+        self.x0 = np.zeros(0, dtype=np.int64)
+        self.x1 = np.zeros(0, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.y0)
+
+    def covering(
+        self, y: "np.ndarray", x0: "np.ndarray", x1: "np.ndarray"
+    ) -> ("np.ndarray", "np.ndarray", "np.ndarray"):
+        """`(edge, x0, x1)` of the covered parts of the edges `[x0, x1)` on row `y`"""
+        band = np.maximum(np.searchsorted(self.y0, y, side="right") - 1, 0)
+        count = self.start[band + 1] - self.start[band]
+        count[(y < self.y0[band]) | (y >= self.y1[band])] = 0
+        edge, index = _spans(self.start[band], count)
+        cover_x0 = np.maximum(self.x0[index], x0[edge])
+        cover_x1 = np.minimum(self.x1[index], x1[edge])
+        hit = cover_x1 > cover_x0
+        return edge[hit], cover_x0[hit], cover_x1[hit]
+
+    def add(
+        self, y0: "np.ndarray", y1: "np.ndarray", x0: "np.ndarray", x1: "np.ndarray"
+    ):
+        """Cover the rectangles `[x0, x1) x [y0, y1)` too"""
+        # cut the rows into bands at every top and bottom
+        rows = np.unique(np.concatenate([self.y0, self.y1, y0, y1]))
+        owner = np.repeat(np.arange(len(self)), np.diff(self.start))
+        first = np.concatenate(
+            [np.searchsorted(rows, self.y0)[owner], np.searchsorted(rows, y0)]
+        )
+        last = np.concatenate(
+            [np.searchsorted(rows, self.y1)[owner], np.searchsorted(rows, y1)]
+        )
+        item, band = _spans(first, last - first)
+        band, x0, x1 = _union(
+            band,
+            np.concatenate([self.x0, x0])[item],
+            np.concatenate([self.x1, x1])[item],
+        )
+
+        # bands that continue the one above with the same intervals
+        bands, start, count = np.unique(band, return_index=True, return_counts=True)
+        same = np.zeros(len(bands), dtype=bool)
+        same[1:] = (bands[1:] == bands[:-1] + 1) & (count[1:] == count[:-1])
+        above = np.maximum(np.arange(len(band)) - np.repeat(count, count), 0)
+        equal = (x0 == x0[above]) & (x1 == x1[above])
+        same &= np.logical_and.reduceat(equal, start)
+
+        # join them
+        kept = np.flatnonzero(~same)
+        end = np.append(kept[1:] - 1, len(bands) - 1)
+        self.y0 = rows[bands[kept]]
+        self.y1 = rows[bands[end] + 1]
+        self.start = np.append(0, np.cumsum(count[kept]))
+        keep = np.repeat(~same, count)
+        self.x0 = x0[keep]
+        self.x1 = x1[keep]
+
+
+# ---------------------------- #
+# occlusion
+
+
+def exposed_edges(
+    left: "np.ndarray",
+    right: "np.ndarray",
+    top: "np.ndarray",
+    bottom: "np.ndarray",
+    blocking: "np.ndarray",
+    bounds: "Rect" = None,
+) -> ("np.ndarray", "np.ndarray", "np.ndarray", "np.ndarray"):
+    """
+    Compute the visible parts of the top and bottom edge of every window.
+
+    The columns describe windows ordered front to back -- a window can only
+    be covered by the windows before it. Windows with `blocking[i] == False`
+    never cover anything (dock, finder, ...). The top edge lives on row
+    `top` and the bottom edge on row `bottom`, like the collision edges.
+    Given `bounds`, edges on rows outside of it are dropped and the others
+    are clipped to it.
+
+    The windows are swept front to back in blocks of `BLOCK_SIZE`. The
+    edges of a block are tested against each other in one vectorized pass
+    and against the region covered by all blocks in front, kept as bands of
+    merged intervals -- one band lookup per edge instead of a test against
+    every window. The covered intervals of each edge are then merged with a
+    segmented running maximum instead of a python loop per edge.
+
+    Returns `(owner, slot, x0, x1)` arrays, one entry per visible segment,
+    ordered by window, then top (slot 0) before bottom (slot 1), then x.
+    """
+    count = len(left)
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+    top = np.asarray(top, dtype=np.int64)
+    bottom = np.asarray(bottom, dtype=np.int64)
+    blocking = np.asarray(blocking, dtype=bool) & (right > left) & (bottom > top)
+
+    # two edge queries per window: (top, bottom)
+    q_owner = np.repeat(np.arange(count), 2)
+    q_slot = np.tile(np.array([0, 1]), count)
+    q_y = np.stack([top, bottom], axis=1).reshape(-1)
+    q_x0 = np.repeat(left, 2)
+    q_x1 = np.repeat(right, 2)
+
+    # nothing outside the bounds is asked for, so it doesn't need covering
+    cover_left = left
+    cover_right = right
+    shown = True
+    if bounds != None:
+        shown = (q_y >= bounds.top) & (q_y < bounds.bottom)
+        q_x0 = np.maximum(q_x0, bounds.left)
+        q_x1 = np.minimum(q_x1, bounds.right)
+        cover_left = np.maximum(left, bounds.left)
+        cover_right = np.minimum(right, bounds.right)
+        blocking &= cover_right > cover_left
+
+    # drop edges with nothing left to show
+    keep = np.flatnonzero((q_x1 > q_x0) & shown)
+    q_owner = q_owner[keep]
+    q_slot = q_slot[keep]
+    q_y = q_y[keep]
+    q_x0 = q_x0[keep]
+    q_x1 = q_x1[keep]
+    queries = len(q_owner)
+
+    # find the covered parts of every edge, one block at a time
+    pair_q = [np.zeros(0, dtype=np.int64)]
+    cover_x0 = [np.zeros(0, dtype=np.int64)]
+    cover_x1 = [np.zeros(0, dtype=np.int64)]
+    region = _Region()
+    for start in range(0, count, BLOCK_SIZE):
+        end = min(start + BLOCK_SIZE, count)
+        first, last = np.searchsorted(q_owner, [start, end])
+
+        # covered by the blocks in front
+        if len(region) and last > first:
+            q, x0, x1 = region.covering(
+                q_y[first:last], q_x0[first:last], q_x1[first:last]
+            )
+            pair_q.append(q + first)
+            cover_x0.append(x0)
+            cover_x1.append(x1)
+
+        # covered by the windows in front in this block
+        y = q_y[first:last, None]
+        cover = (
+            (np.arange(start, end)[None, :] < q_owner[first:last, None])
+            & blocking[None, start:end]
+            & (top[None, start:end] <= y)
+            & (bottom[None, start:end] > y)
+            & (left[None, start:end] < q_x1[first:last, None])
+            & (right[None, start:end] > q_x0[first:last, None])
+        )
+        q, w = np.nonzero(cover)
+        q += first
+        w += start
+        pair_q.append(q)
+        cover_x0.append(np.maximum(left[w], q_x0[q]))
+        cover_x1.append(np.minimum(right[w], q_x1[q]))
+
+        # the blocks behind are covered by this one
+        w = np.flatnonzero(blocking[start:end]) + start
+        if end < count and len(w):
+            region.add(top[w], bottom[w], cover_left[w], cover_right[w])
+    pair_q = np.concatenate(pair_q)
+    cover_x0 = np.concatenate(cover_x0)
+    cover_x1 = np.concatenate(cover_x1)
+
+    # covered intervals sorted by edge then x
+    order = np.lexsort((cover_x0, pair_q))
+    pair_q = pair_q[order]
+    cover_x0 = cover_x0[order]
+    cover_x1 = cover_x1[order]
+
+    # running maximum of the covered right side, restarted for every edge
+    # (edges are shifted apart so one accumulate handles all of them)
+    base = min(q_x0.min(), 0) if queries else 0
+    span = (q_x1.max() - base + 1) if queries else 1
+    shift = pair_q * span
+    reach = np.maximum.accumulate(cover_x1 - base + shift) - shift + base
+
+    # gap before each covered interval
+    first = np.ones(len(pair_q), dtype=bool)
+    first[1:] = pair_q[1:] != pair_q[:-1]
+    previous = np.empty(len(pair_q), dtype=np.int64)
+    previous[first] = q_x0[pair_q[first]]
+    previous[~first] = reach[np.flatnonzero(~first) - 1]
+    gap = cover_x0 > previous
+
+    # gap after the last covered interval of each edge
+    last = np.ones(len(pair_q), dtype=bool)
+    last[:-1] = pair_q[:-1] != pair_q[1:]
+    last_q = pair_q[last]
+    tail = q_x1[last_q] > reach[last]
+
+    # edges with nothing in front of them are fully visible
+    uncovered = np.ones(queries, dtype=bool)
+    uncovered[pair_q] = False
+
+    seg_q = np.concatenate([pair_q[gap], last_q[tail], np.flatnonzero(uncovered)])
+    seg_x0 = np.concatenate([previous[gap], reach[last][tail], q_x0[uncovered]])
+    seg_x1 = np.concatenate([cover_x0[gap], q_x1[last_q][tail], q_x1[uncovered]])
+
+    order = np.lexsort((seg_x0, seg_q))
+    seg_q = seg_q[order]
+    return q_owner[seg_q], q_slot[seg_q], seg_x0[order], seg_x1[order]
+
+
+def exposed_segments(
+    rects: ["Rect"], blocking: [bool], bounds: "Rect" = None
+) -> [([(int, int)], [(int, int)])]:
+    """
+    `exposed_edges` for a front to back list of rects.
+
+    Returns a `(top_segments, bottom_segments)` pair per window, each a list
+    of `(x0, x1)` half-open intervals.
+    """
+    owner, slot, x0, x1 = exposed_edges(
+        [r.left for r in rects],
+        [r.right for r in rects],
+        [r.top for r in rects],
+        [r.bottom for r in rects],
+        blocking,
+        bounds,
+    )
+
+    result = [([], []) for _ in rects]
+    for i, s, a, b in zip(owner.tolist(), slot.tolist(), x0.tolist(), x1.tolist()):
+        result[i][s].append((a, b))
+    return result
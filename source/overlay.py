@@ -0,0 +1,247 @@
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QPainter, QRegion
+from PyQt5.QtWidgets import QApplication, QWidget
+
+from pygame import Rect
+
+from source import pet, desktop, settings, signal
+from source.animation import AnimationCache, AnimationClock
+from source.atlas import AtlasLoader
+from source.scheduler import Scheduler
+from source.pacing import FramePacer
+from source.lifecycle import Lifecycle, PausableClock, VirtualClock
+from source.profiler import PROFILER
+
+
+# ---------------------------- #
+# constants
+
+# above this many dirty rects an overlay repaints their bounding box
+DIRTY_RECT_LIMIT = 32
+
+# ---------------------------- #
+# painting
+
+
+def paint_sprites(painter: "QPainter", sprites: list, x: int, y: int, clip: "Rect"):
+    """
+    Draw `(area, image)` sprites in global coordinates onto a surface whose
+    top left is at global `(x, y)`, skipping everything outside `clip`.
+    """
+    for area, image in sprites:
+        if area.colliderect(clip):
+            painter.drawImage(area.x - x, area.y - y, image)
+
+
+class PetOverlay(QWidget):
+    """
+    Transparent, click through window covering one screen.
+
+    Draws every pet on its screen in one paint pass. It never decides what
+    to draw itself: the swarm hands it the dirty areas of a frame and the
+    sprites to draw.
+    """
+
+    def __init__(self, swarm: "PetSwarm", geometry: "QRect"):
+        super().__init__()
+        self.swarm = swarm
+        self.area = Rect(
+            geometry.x(), geometry.y(), geometry.width(), geometry.height()
+        )
+
+        self.setWindowTitle(settings.APPLICATION_NAME)
+        self.setWindowFlags(
+            Qt.FramelessWindowHint
+            | Qt.WindowStaysOnTopHint
+            | Qt.WindowTransparentForInput
+            | Qt.Tool
+        )
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setGeometry(geometry)
+
+        # stats
+        self.paints = 0
+
+    def invalidate(self, areas: ["Rect"]):
+        """Schedule one repaint covering the global `areas` on this screen"""
+        local = [
+            a.clip(self.area).move(-self.area.x, -self.area.y)
+            for a in areas
+            if a.colliderect(self.area)
+        ]
+        if not local:
+            return
+        if len(local) > DIRTY_RECT_LIMIT:
+            local = [local[0].unionall(local[1:])]
+
+        region = QRegion()
+        for a in local:
+            region += QRect(a.x, a.y, a.w, a.h)
+        self.update(region)
+
+    def paintEvent(self, event):
+        started = PROFILER.enabled and PROFILER.start()
+        painter = QPainter(self)
+        self.paints += 1
+
+        # clear only what is repainted
+        bounds = event.rect()
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(bounds, Qt.transparent)
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        clip = Rect(bounds.x(), bounds.y(), bounds.width(), bounds.height())
+        clip.move_ip(self.area.x, self.area.y)
+        paint_sprites(painter, self.swarm.sprites, self.area.x, self.area.y, clip)
+        painter.end()
+        if started:
+            PROFILER.stop("paint", started)
+
+
+# ---------------------------- #
+# swarm
+
+
+class PetSwarm:
+    """
+    Many pets in one world, drawn by one overlay per screen.
+
+    All pets share the decoded animations and one animation clock that is
+    ticked once per frame. `update_state` runs every pet, collects the
+    areas that changed and hands them to the overlays, which then paint
+    all pets in a single pass.
+    """
+
+    def __init__(
+        self,
+        source: "WindowSource",
+        count: int,
+        pet_data: str = "assets/pet.json",
+        screens: ["QRect"] = None,
+        threaded: bool = True,
+    ):
+        self.world = desktop.World(source, threaded=threaded)
+
+        # timers, animations and pacing all run on a clock that stops while
+        # the swarm is suspended (and only moves with the frames in `VIRTUAL_TIME`)
+        self.virtual = VirtualClock() if settings.VIRTUAL_TIME else None
+        self.time = (
+            PausableClock(self.virtual) if self.virtual != None else PausableClock()
+        )
+        self.lifecycle = Lifecycle(self.time, self.world)
+
+        # one timer heap for all pets, run once per frame by the main loop
+        self.scheduler = Scheduler(self.time)
+        self.pacer = FramePacer(
+            settings.FPS, settings.IDLE_FPS, settings.IDLE_AFTER, self.time
+        )
+
+        # shared animation state
+        self.clock = AnimationClock(self.time)
+        self.cache = AnimationCache(
+            settings.ANIMATION_CACHE_MB << 20, AtlasLoader(settings.ATLAS_CACHE_DIR)
+        )
+        self.pet_data = pet_data
+        self.pets = []
+        self.spawn(count)
+
+        # one overlay per screen
+        if screens == None:
+            screens = [screen.geometry() for screen in QApplication.screens()]
+        self.overlays = [PetOverlay(self, geometry) for geometry in screens]
+
+        # what was drawn for every pet, and what to draw this frame
+        self._drawn = {}
+        self.sprites = []
+
+        # event handlers
+        signal.BUS.add_receiver(signal.HIDE, self.receive_hide_event)
+        signal.BUS.add_receiver(signal.SHOW, self.receive_show_event)
+        signal.BUS.add_receiver(signal.RESET, self.receive_reset_event)
+        if settings.SUSPEND_WHEN_LOCKED:
+            signal.BUS.add_receiver(signal.LOCK, self.receive_lock_event)
+            signal.BUS.add_receiver(signal.UNLOCK, self.receive_unlock_event)
+
+    # ============================================ #
+    # event handlers
+
+    def receive_hide_event(self, args):
+        for overlay in self.overlays:
+            overlay.hide()
+        self.lifecycle.suspend("hidden")
+
+    def receive_show_event(self, args):
+        self.lifecycle.resume("hidden")
+        self.show()
+
+    def receive_lock_event(self, args):
+        self.lifecycle.suspend("locked")
+
+    def receive_unlock_event(self, args):
+        self.lifecycle.resume("locked")
+
+    def receive_reset_event(self, args):
+        # the pets are put back on the screen
+        self.lifecycle.resume("offscreen")
+
+    def pet_resized(self, pet: "Pet"):
+        # sprites are drawn at the pet size, nothing to resize
+        pass
+
+    # ============================================ #
+
+    def spawn(self, count: int) -> [int]:
+        """Add `count` pets, returns their indices in `pets`"""
+        first = len(self.pets)
+        for _ in range(count):
+            self.pets.append(pet.Pet(self, self.pet_data, self.cache, self.clock))
+        return list(range(first, len(self.pets)))
+
+    def show(self):
+        for overlay in self.overlays:
+            overlay.show()
+        self._drawn.clear()
+
+    def is_resting(self) -> bool:
+        """Nothing changed this frame and every pet stays idle"""
+        return not self.world.last_diff and all(p.is_resting() for p in self.pets)
+
+    def is_offscreen(self) -> bool:
+        return not any(self.world.bounds.colliderect(p._rect) for p in self.pets)
+
+    def update_state(self) -> ["Rect"]:
+        """Advance every pet by a frame, returns the dirty areas"""
+        self.clock.tick()
+        self.world.tick(settings.DELTA)
+
+        started = PROFILER.enabled and PROFILER.start()
+        for p in self.pets:
+            p.update_state()
+        if started:
+            PROFILER.stop("statemachine", started)
+        self.world.step_bodies()
+
+        dirty = []
+        sprites = []
+        for p in self.pets:
+            position = self.world.render_position(p)
+            area = Rect(int(position.x), int(position.y), p._rect.w, p._rect.h)
+            image = p.current_image()
+            if image != None:
+                sprites.append((area, image))
+
+            # repaint the old and new area of pets that moved or animated
+            key = (area.topleft, p.frame_key())
+            drawn = self._drawn.get(id(p))
+            if drawn == None or drawn[1] != key:
+                dirty.append(area)
+                if drawn != None:
+                    dirty.append(drawn[0])
+                self._drawn[id(p)] = (area, key)
+        self.sprites = sprites
+
+        if dirty:
+            for overlay in self.overlays:
+                overlay.invalidate(dirty)
+        return dirty
@@ -0,0 +1,112 @@
+import time
+
+from source.profiler import RingBuffer
+
+
+# ---------------------------- #
+# pacer
+
+
+class FramePacer:
+    """
+    Frame timing of the main loop, against absolute deadlines.
+
+    Every frame calls `begin` (returns the real time since the previous
+    frame, the `DELTA` to simulate) and `end` (returns how long to wait
+    for the next one). Deadlines are `period` apart no matter how long the
+    work took, so the frame rate doesn't sag under load. A frame that ends
+    after its successor's deadline skips the missed slots; the next
+    `begin` merges their time into one longer delta.
+
+    `end(busy=False)` for `idle_after` seconds drops to `idle_fps`. A busy
+    frame, or `wake` (input), goes back to `fps` right away.
+    """
+
+    def __init__(
+        self,
+        fps: float,
+        idle_fps: float = None,
+        idle_after: float = 2.0,
+        clock: "function" = time.monotonic,
+    ):
+        self.fps = fps
+        self.idle_fps = idle_fps if idle_fps != None else fps
+        self.idle_after = idle_after
+        self.clock = clock
+
+        self.idle = False
+        self._deadline: float = None
+        self._started: float = None
+        self._last: float = None
+        self._busy: float = None
+
+        # stats
+        self.frames = 0
+        self.overruns = 0
+        self.skipped = 0
+        self.intervals = RingBuffer(64)
+        self.work = RingBuffer(64)
+
+    @property
+    def period(self) -> float:
+        return 1.0 / (self.idle_fps if self.idle else self.fps)
+
+    # ---------------------------- #
+    # frames
+
+    def begin(self) -> float:
+        """Start a frame, returns the seconds since the previous one"""
+        now = self._started = self.clock()
+        if self._last == None:
+            self._deadline = self._busy = now
+            delta = 1.0 / self.fps
+        else:
+            delta = now - self._last
+            self.intervals.push(delta)
+        self._last = now
+        self.frames += 1
+        return delta
+
+    def end(self, busy: bool = True) -> float:
+        """Finish the frame, returns the seconds until the next one is due"""
+        now = self.clock()
+        work = now - self._started
+        self.work.push(work)
+        if work > 1.0 / self.fps:
+            self.overruns += 1
+
+        if busy:
+            self.wake(now)
+        elif not self.idle and now - self._busy >= self.idle_after:
+            self.idle = True
+
+        period = self.period
+        deadline = self._deadline + period
+        if deadline <= now:
+            # behind -- drop the slots we missed instead of rushing them
+            missed = int((now - deadline) / period) + 1
+            self.skipped += missed
+            deadline += missed * period
+        self._deadline = deadline
+        return deadline - now
+
+    def wake(self, now: float = None):
+        """Back to the full frame rate"""
+        now = now if now != None else self.clock()
+        self._busy = now
+        self.idle = False
+
+    # ---------------------------- #
+    # stats
+
+    def achieved_fps(self) -> float:
+        """Frames per second over the recent frames"""
+        total = self.intervals.values().sum()
+        return len(self.intervals) / total if total > 0 else 0.0
+
+    def __str__(self):
+        return (
+            f"{self.achieved_fps():5.1f} fps"
+            f"{' idle' if self.idle else ''} | overruns {self.overruns}"
+            f" | skipped {self.skipped}"
+        )
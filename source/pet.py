@@ -1,25 +1,31 @@
 import os
 import json
+import time
 import random
 
-from PyQt5.QtWidgets import QLabel, QVBoxLayout
-from PyQt5.QtCore import QObject, Qt, QTimer, QEvent
-from PyQt5.QtGui import QMovie, QPainter, QTransform, QImageReader, QPixmap
-
 from source import settings, desktop
 
 from pygame import Rect
 from pygame.math import Vector2
 
-from source import statemachine, settings, signal
-from source.statemachine import StateMachineComponent, State
+from source import statemachine, settings, signal, navigation
+from source.physics import jump_speed
+from source.animation import AnimationCache, AnimationPlayer
+from source.atlas import AtlasLoader
+from source.bodies import BodyVector, BodyContacts
+from source.statemachine import StateMachineComponent, State, load_graph
 
 
 # ============================================================================== #
 
 
 class PetAnimationCache:
-    def __init__(self, filename: str):
+    def __init__(
+        self,
+        filename: str,
+        cache: "AnimationCache" = None,
+        clock: "function" = time.monotonic,
+    ):
         self.filename = filename
 
         # open file
@@ -27,124 +33,178 @@ class PetAnimationCache:
             self.metadata = json.load(file)
         self.parent_folder = os.path.join(os.getcwd(), self.metadata["parent_folder"])
 
-        # load items into cache
-        self.cache = {}
-        self.cache_imagereader = {}
+        # decoded frames are shared, loaded on first use
+        if cache == None:
+            cache = AnimationCache(
+                settings.ANIMATION_CACHE_MB << 20, AtlasLoader(settings.ATLAS_CACHE_DIR)
+            )
+        self.cache = cache
+
+        # only the file names are read up front
+        self.files = {}
+        self.players = {}
         for key, val in self.metadata[settings.ANIMATION_KEY].items():
             # multiple items
-            self.cache[key] = [QMovie(os.path.join(self.parent_folder, v)) for v in val]
-            self.cache_imagereader[key] = [
-                QImageReader(os.path.join(self.parent_folder, v)) for v in val
+            self.files[key] = sorted(os.path.join(self.parent_folder, v) for v in val)
+            self.players[key] = [
+                AnimationPlayer(cache, f, clock) for f in self.files[key]
             ]
-            self.cache[key].sort(key=lambda x: x.fileName())
-            self.cache_imagereader[key].sort(key=lambda x: x.fileName())
 
-            print([v.fileName() for v in self.cache[key]])
+    def get(self, key: str) -> ["AnimationPlayer"]:
+        return self.players[key]
+
+    def get_index(self, key: str, index: int) -> "AnimationPlayer":
+        return self.players[key][index]
+
+    def get_image_reader_index(self, key: str, index: int) -> "QImageReader":
+        from PyQt5.QtGui import QImageReader
 
-        print(self.cache)
+        return QImageReader(self.files[key][index])
 
-    def get(self, key: str) -> QMovie:
-        return self.cache[key]
+    def prefetch(self, *keys: str):
+        """Hint that the animations `keys` will be played soon"""
+        for key in keys:
+            self.cache.prefetch(self.files.get(key, []))
 
-    def get_index(self, key: str, index: int) -> QMovie:
-        return self.cache[key][index]
+    def warm(self):
+        """Decode a prefetched animation, called once per frame"""
+        self.cache.warm()
 
-    def get_image_reader_index(self, key: str, index: int) -> QImageReader:
-        return self.cache_imagereader[key][index]
 
+def pet_seed(seed: int, index: int) -> str:
+    """Seed of the `index`th pet of a host, None (unseeded) without `seed`"""
+    if seed == None:
+        seed = settings.SEED
+    return None if seed == None else f"{seed}/{index}"
+
+
+class Pet:
+    """
+    A pet, without any widget (and without Qt).
+
+    `parent` is the host: it owns the `world` and is told through
+    `pet_resized` when the pet changes size. The host draws
+    `current_image()` at the pet's render position, either in its own
+    window (`window.PetObject`), in a shared overlay with many other pets
+    or not at all (`headless.HeadlessHost`).
+    """
 
-class PetObject(QLabel):
     MS = 30
 
-    def __init__(self, parent, pet_data: str):
-        super().__init__(parent)
+    def __init__(
+        self,
+        parent,
+        pet_data: str,
+        cache: "AnimationCache" = None,
+        clock: "function" = time.monotonic,
+        seed: int = None,
+    ):
         self.parent = parent
 
-        self.animation_cache = PetAnimationCache(pet_data)
+        # every random choice of the pet comes from here, seeded per pet
+        self.random = random.Random(pet_seed(seed, len(parent.world.pets)))
+
+        self.animation_cache = PetAnimationCache(pet_data, cache, clock)
         self.active_movie_name = "idle"
         self.active_movie = None
 
-        # create label
-        self._pos = Vector2(
-            (
-                random.randint(10, self.parent.world.screen_width - 10),
-                random.randint(10, self.parent.world.screen_height - 10),
-            )
+        # create pet -- its physics state is a row of the world's bodies
+        bodies = self.parent.world.bodies
+        self.body = bodies.add(
+            self.random.randint(10, self.parent.world.screen_width - 10),
+            self.random.randint(10, self.parent.world.screen_height - 10),
+            settings.CHARACTER_WIDTH,
+            settings.CHARACTER_HEIGHT,
         )
-        self._rect = Rect(0, 0, settings.CHARACTER_WIDTH, settings.CHARACTER_HEIGHT)
-        self._vel = Vector2()
+        self.parent.world.pets[self.body] = self
+        self._box = Rect(0, 0, settings.CHARACTER_WIDTH, settings.CHARACTER_HEIGHT)
         self._flipped = False
 
+        # views of the row, `_drive` is the walking speed set by the states
+        self._pos = BodyVector(bodies, self.body, ("x", "y"))
+        self._vel = BodyVector(bodies, self.body, ("vx", "vy"))
+        self._prev_pos = BodyVector(bodies, self.body, ("px", "py"))
+        self._hit = BodyContacts(bodies, self.body)
+
         # select a movie
-        self.active_movie = random.choice(
+        self.active_movie = self.random.choice(
             list(self.animation_cache.get(self.active_movie_name))
         )
-        self.setMovie(self.active_movie)
         self.active_movie.start()
 
-        self.backup_frame = None
-
-        # ============================================ #
-        # setup world interaction
-
-        self.setAttribute(Qt.WA_TransparentForMouseEvents, False)
-
         # features
         self.is_dragged = False
-        self.drag_offset = Vector2()
 
         # target location
         self._target_location = None
         self.current_window = None
 
-        # statemachine
-        self.statemachine = PetStateMachine(self)
+        # statemachine -- the transitions come from the behaviors file
+        self.statemachine = PetStateMachine(
+            self, self.animation_cache.metadata.get("behavior", "pet")
+        )
         self.statemachine.add_state(IdleState())
         self.statemachine.add_state(MoveState())
         self.statemachine.add_state(FallState())
         self.statemachine.add_state(JumpStage1())
         # self.statemachine.add_state(JumpStage2())
 
-        self.statemachine.set_current_state("idle")
+        self.statemachine.start()
 
         # signal handlers
-        signal.SignalHandler.add_receiver("reset", self.receive_reset_event)
-        signal.SignalHandler.add_receiver("custom", self.recieve_custom_event)
+        signal.BUS.add_receiver(signal.RESET, self.receive_reset_event)
+        signal.BUS.add_receiver(signal.CUSTOM, self.recieve_custom_event)
 
     # ------------------------- #
 
     def recieve_custom_event(self, args):
         print("custom event")
         # run event
-        self.statemachine.set_next_state("jumpstage1")
+        self.statemachine.fire(self.statemachine.custom_event)
 
     def receive_reset_event(self, args):
         self._pos.xy = (
-            random.randint(0, self.parent.world.screen_width - self._rect.w),
-            random.randint(0, self.parent.world.screen_height - self._rect.h),
+            self.random.randint(0, self.parent.world.screen_width - self._rect.w),
+            self.random.randint(0, self.parent.world.screen_height - self._rect.h),
         )
+        self._prev_pos.xy = self._pos.xy
 
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.is_dragged = True
-            self.drag_offset = Vector2(event.pos().x(), event.pos().y())
-
-    def mouseMoveEvent(self, event):
-        if self.is_dragged:
-            delta = event.pos()
-            self._rect.x = event.globalPos().x() - self.drag_offset.x
-            self._rect.y = event.globalPos().y() - self.drag_offset.y
-            self._pos.xy = self._rect.topleft
+    def drag_to(self, x: int, y: int):
+        self._pos.xy = (x, y)
+        self._prev_pos.xy = self._pos.xy
 
-    def mouseReleaseEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self.is_dragged = False
+    def is_resting(self) -> bool:
+        """Idle, not held and about to stay idle -- the main loop may slow down"""
+        return not self.is_dragged and self.statemachine.settled()
 
     # ------------------------- #
 
+    @property
+    def _rect(self) -> "Rect":
+        # the rect follows the body position
+        self._box.topleft = self._pos.xy
+        return self._box
+
+    @property
+    def _drive(self) -> float:
+        return float(self.parent.world.bodies.drive[self.body])
+
+    @_drive.setter
+    def _drive(self, value: float):
+        self.parent.world.bodies.drive[self.body] = value
+
     def change_rect(self, widht: int, height: int):
-        self._rect.w = widht
-        self._rect.h = height
+        """Resize, keeping the bottom center in place"""
+        rect = self._rect.copy()
+        self._box.w = widht
+        self._box.h = height
+        self._box.midbottom = rect.midbottom
+        self._pos.xy = self._box.topleft
+        self._prev_pos.xy = self._pos.xy
+
+        bodies = self.parent.world.bodies
+        bodies.w[self.body] = widht
+        bodies.h[self.body] = height
 
     # ------------------------- #
 
@@ -156,8 +216,9 @@ class PetObject(QLabel):
         if index != -1:
             self.active_movie = self.animation_cache.get_index(new_ani, index)
         else:
-            self.active_movie = random.choice(list(self.animation_cache.get(new_ani)))
-        self.setMovie(self.active_movie)
+            self.active_movie = self.random.choice(
+                list(self.animation_cache.get(new_ani))
+            )
         self.active_movie.start()
         self.active_movie_name = new_ani
 
@@ -165,101 +226,111 @@ class PetObject(QLabel):
         if self.active_movie:
             self.active_movie.stop()
             self.active_movie = None
-            self.setMovie(None)
 
     def update_animation_isotope(self):
         self.active_movie.stop()
-        self.active_movie = random.choice(
+        self.active_movie = self.random.choice(
             list(self.animation_cache.get(self.active_movie_name))
         )
-        self.setMovie(self.active_movie)
         self.active_movie.start()
 
     def update_state(self):
         # is a state machine -- update all states!
-        windows = self.parent.world.get_active_windows()
-        blocks = [window.area for window in windows]
-
         # update current window
-        for window in windows:
-            if window.area.colliderect(self._rect):
-                self.current_window = window
-                break
+        window = self.parent.world.find_window(self._rect)
+        if window != None:
+            self.current_window = window
 
         # ------------------------- #
         # statemachine
         self.statemachine.update()
 
-        # update geometry
-        # self.setGeometry(self._rect.x, self._rect.y, self._rect.w, self._rect.h)
-        # self.setGeometry(0, 0, self._rect.w, self._rect.h)
-
-        self.update()
-
-    def paintEvent(self, event):
-        # ------------------------- #
-        # draw the pet
-        painter = QPainter(self)
-        painter.setCompositionMode(QPainter.CompositionMode_Source)
-        painter.fillRect(self.rect(), Qt.transparent)  # Clear the background
-        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+        # decode animations the states asked for ahead of time
+        self.animation_cache.warm()
+
+    def frame_key(self) -> tuple:
+        """Everything that decides what is drawn for the pet"""
+        if self.active_movie == None:
+            return (None, self._rect.size)
+        return (
+            self.active_movie.fileName(),
+            self.active_movie.currentFrameNumber(),
+            self._flipped,
+            self._rect.size,
+        )
 
-        # custom draw command
-        if self.active_movie != None:
-            frame_pixmap = self.active_movie.currentPixmap()
-            if self._flipped:
-                frame_pixmap = frame_pixmap.transformed(QTransform().scale(-1, 1))
-            painter.drawPixmap(0, 0, frame_pixmap)
+    def current_image(self) -> "QImage":
+        """Frame to draw, None without an animation"""
+        if self.active_movie == None:
+            return None
+        # mirrored frames are cached, painting is a lookup + blit
+        return self.active_movie.currentImage(self._flipped)
 
 
 # ============================================================================== #
 # statemachine
 
 
+def _airborne(pet: "Pet") -> bool:
+    return not pet._hit["bottom"]
+
+
+def _grounded(pet: "Pet") -> bool:
+    return pet._hit["bottom"]
+
+
+def _jump_done(pet: "Pet") -> bool:
+    # on the 25th frame, we swap to other animation
+    return pet.active_movie.currentFrameNumber() > 24
+
+
+# guards the behaviors file can name in `when`
+PET_GUARDS = {"airborne": _airborne, "grounded": _grounded, "jump_done": _jump_done}
+
+
 class PetStateMachine(StateMachineComponent):
-    def __init__(self, pet: "PetObject"):
-        super().__init__()
+    def __init__(self, pet: "Pet", behavior: str = "pet"):
+        graph = load_graph(settings.BEHAVIORS_FILE, behavior, PET_GUARDS)
+        super().__init__(graph, pet, pet.parent.scheduler)
         self.pet = pet
 
+        # events the states fire, resolved once
+        self.wander_event = graph.event("wander")
+        self.lost_event = graph.event("lost")
+        self.arrived_event = graph.event("arrived")
+        self.custom_event = graph.event("custom")
+
 
 # ---------------------------- #
 class IdleState(State):
     def __init__(self):
         super().__init__("idle")
 
-        self.timer = QTimer()
-        self.timer.timeout.connect(self._timer_update)
-
-        self.idle_move_timer = QTimer()
-        self.idle_move_timer.timeout.connect(self._move_timer_update)
-
     def __post_init__(self, statemachine: "PetStateMachine"):
         self._statemachine = statemachine
 
+        # suspended by the statemachine while the pet is not idle
+        scheduler = statemachine.scheduler
+        self.timer = scheduler.timer(self._timer_update, owner=self)
+        self.idle_move_timer = scheduler.timer(self._move_timer_update, owner=self)
+
     # ---------------------------- #
 
     def on_enter(self):
         self._statemachine.pet.update_animation("idle")
-        self.timer.start(int(3000 + (random.random() - 0.5) * 2000))
-        self.idle_move_timer.start(int(8000 + (random.random() - 0.5) * 5000))
+        self._statemachine.pet.animation_cache.prefetch("run", "fall")
+        rng = self._statemachine.pet.random
+        self.timer.start(int(3000 + (rng.random() - 0.5) * 2000))
+        self.idle_move_timer.start(int(8000 + (rng.random() - 0.5) * 5000))
         self._statemachine.pet._target_location = None
 
         # set geometry
-        self._statemachine.pet.setGeometry(
-            0,
-            0,
-            self._statemachine.pet._rect.w,
-            self._statemachine.pet._rect.h,
-        )
-
-    def on_exit(self):
-        self.timer.stop()
-        self.idle_move_timer.stop()
+        self._statemachine.pet.parent.pet_resized(self._statemachine.pet)
 
     def _move_timer_update(self):
         # decide on a place to move towards
         self._statemachine.pet._target_location = self.generate_random_target()
-        self._statemachine.set_next_state("move")
+        self._statemachine.fire(self._statemachine.wander_event)
 
         print(
             "moving to:",
@@ -275,101 +346,163 @@ class IdleState(State):
         self._statemachine.pet.update_animation_isotope()
 
     def update(self):
-        hit = self._statemachine.pet.parent.world.move_pet(self._statemachine.pet)
-        if not hit["bottom"]:
-            self._statemachine.set_next_state("fall")
+        # falls through the `airborne` guard
+        self._statemachine.pet.parent.world.move_pet(self._statemachine.pet)
 
     def generate_random_target(self) -> {"window": "pid", "pos": "Vector2"}:
+        pet = self._statemachine.pet
+        world = pet.parent.world
+
+        # only surfaces the pet can actually get to
+        platforms = world.navigation.reachable(pet._rect)
+        if not platforms:
+            return None
+
         # choose inside or outside
-        inside = random.choice([True, False])
-        target_window = None
-        if not inside or self._statemachine.pet.current_window == None:
-            # find a new window
-            target_window = random.choice(
-                self._statemachine.pet.parent.world.get_active_windows()
-            )
-        else:
-            target_window = self._statemachine.pet.current_window
-        target_position = Vector2()
-        # generate random x
-        target_position.x = int(
-            target_window.area.x + random.random() * target_window.area.w
+        inside = pet.random.choice([True, False])
+        current_window = pet.current_window
+        if inside and current_window != None and current_window.active:
+            own = [p for p in platforms if p.wid == current_window.wid]
+            if own:
+                platforms = own
+        platform = pet.random.choice(platforms)
+
+        # generate random x on the visible segment
+        low, high = platform.standing_range(pet._rect.w)
+        target_x = pet.random.randint(low, high)
+
+        # sometimes go and stand next to a neighbour instead
+        friends = world.nearby_pets(pet, settings.SOCIAL_RADIUS)
+        if friends and pet.random.random() < settings.SOCIAL_CHANCE:
+            friend = pet.random.choice(friends)
+            spot = world.navigation.locate(friend._rect)
+            shared = [p for p in platforms if spot != None and p.key() == spot.key()]
+            if shared:
+                platform = shared[0]
+                low, high = platform.standing_range(pet._rect.w)
+                side = -1 if friend._rect.centerx > pet._rect.centerx else 1
+                target_x = friend._rect.x + side * pet._rect.w
+                target_x = max(low, min(high, target_x))
+
+        target_position = Vector2(target_x, platform.y - pet._rect.h + 1)
+        path = world.navigation.plan(
+            pet._rect, platform, int(target_position.x), pet.MS
         )
-        # pick top or bottom
-        if random.choice([True, False]):
-            # top
-            target_position.y = target_window.area.y - self._statemachine.pet._rect.h
-        else:
-            # bottom
-            target_position.y = (
-                target_window.area.y
-                + target_window.area.h
-                - self._statemachine.pet._rect.h
-            )
+        if path == None:
+            return None
 
-        return {"window": target_window, "pos": target_position}
+        return {
+            "window": world.get_window(platform.wid),
+            "pos": target_position,
+            "path": path,
+        }
 
 
 class MoveState(State):
     def __init__(self):
         super().__init__("move")
 
-        # target location
+        # target location + path steps
         self.target_location = None
+        self._replanned = False
+        self._hop_from = None
 
-        # target validity timer
-        self._target_validity_timer = QTimer()
-        self._target_validity_timer.timeout.connect(self._target_validity_timer_update)
+        # in the air at the last update -- physics runs after the states, so
+        # a landing shows up in the contacts of the next update
+        self._airborne = False
 
     def __post_init__(self, statemachine: "PetStateMachine"):
         self._statemachine = statemachine
 
+        # target validity timer
+        self._target_validity_timer = statemachine.scheduler.timer(
+            self._target_validity_timer_update, owner=self
+        )
+
     # ---------------------------- #
 
     def on_enter(self):
         self._target_validity_timer.start(200)
         self.target_location = self._statemachine.pet._target_location
+        self._replanned = False
+        self._hop_from = None
+        self._airborne = False
         self._statemachine.pet.update_animation("run")
+        self._statemachine.pet.animation_cache.prefetch("jump", "fall", "idle")
 
         # set geometry
-        self._statemachine.pet.setGeometry(
-            0,
-            0,
-            self._statemachine.pet._rect.w,
-            self._statemachine.pet._rect.h,
-        )
+        self._statemachine.pet.parent.pet_resized(self._statemachine.pet)
 
     def on_exit(self):
-        self._target_validity_timer.stop()
         self.target_location = None
+        self._statemachine.pet._drive = 0.0
 
     def _target_validity_timer_update(self):
         # check if target is still valid
-        if self._statemachine.pet._target_location["window"] != None:
-            if not self._statemachine.pet._target_location["window"].active:
-                self._statemachine.set_next_state("idle")
+        if self.target_location == None:
+            return
+        if self.target_location["window"] != None:
+            if not self.target_location["window"].active:
+                self._statemachine.fire(self._statemachine.lost_event)
 
     def update(self):
         if not self.target_location:
-            self._statemachine.set_next_state("idle")
+            self._statemachine.fire(self._statemachine.lost_event)
+            return
+        pet = self._statemachine.pet
+        path = self.target_location["path"]
+        step = path[0]
+
+        # falling or jumping between two surfaces
+        if not pet._hit["bottom"]:
+            self._airborne = True
+            if step.kind == navigation.FALL:
+                pet._drive = 0.0
+            self._move()
             return
 
-        # set velocity
-        self._statemachine.pet._vel.x = (
-            1.0
-            if self.target_location["pos"].x > self._statemachine.pet._pos.x
-            else -1.0
-        ) * self._statemachine.pet.MS
-        self._statemachine.pet._flipped = self._statemachine.pet._vel.x < 0
-
-        # check if x error is close enough
-        if abs(self.target_location["pos"].x - self._statemachine.pet._pos.x) < 10:
-            self._statemachine.pet._vel.x = 0
-            self._statemachine.set_next_state("idle")
+        # landed during the last physics steps
+        if self._airborne:
+            self._airborne = False
+            if not self._land():
+                return
+            path = self.target_location["path"]
+            step = path[0]
+
+        # walk to the start of the next step
+        error = step.x - pet._pos.x
+        if abs(error) >= 2:
+            pet._drive = (1.0 if error > 0 else -1.0) * pet.MS
+            # hop over a pet standing in the way
+            blocker = self._blocker(pet._drive)
+            if blocker != None:
+                height = blocker._rect.h + navigation.JUMP_MARGIN
+                pet._vel.y = -(jump_speed(height) or settings.JUMP_SPEED)
+                pet._hit["bottom"] = False
+                self._hop_from = pet._rect.bottom
+        elif step.kind == navigation.GOAL:
+            pet._drive = 0.0
+            pet._vel.x = 0
             print("reached x")
             # perform the jump animation !!!
-            self._statemachine.set_next_state("jumpstage1")
+            self._statemachine.fire(self._statemachine.arrived_event)
+            return
+        elif step.kind == navigation.JUMP:
+            pet._drive = 0.0
+            pet._vel.x = 0
+            height = pet._rect.bottom - 1 - step.y + navigation.JUMP_MARGIN
+            pet._vel.y = -(jump_speed(height) or settings.JUMP_SPEED)
+            pet._hit["bottom"] = False
+        elif step.kind == navigation.FALL:
+            # keep walking until the pet drops off the edge
+            pet._drive = step.direction * pet.MS
+        else:
+            path.pop(0)
+        if pet._drive:
+            pet._flipped = pet._drive < 0
+        self._move()
 
+    def _move(self):
         # move towards target location
         hit = self._statemachine.pet.parent.world.move_pet(self._statemachine.pet)
         # if falling
@@ -378,6 +511,45 @@ class MoveState(State):
         else:
             self._statemachine.pet.update_animation("run")
 
+    def _blocker(self, direction: float) -> "Pet":
+        """Another pet standing right ahead on the same surface"""
+        pet = self._statemachine.pet
+        for other in pet.parent.world.nearby_pets(pet, 2):
+            ahead = (other._rect.centerx - pet._rect.centerx) * direction
+            if ahead > 0 and abs(other._rect.bottom - pet._rect.bottom) <= 2:
+                return other
+        return None
+
+    def _land(self) -> bool:
+        """Landed after a fall or jump, continue or replan the path (False: lost)"""
+        pet = self._statemachine.pet
+        path = self.target_location["path"]
+        # back on the same surface after hopping over a pet
+        hopped, self._hop_from = self._hop_from, None
+        if hopped != None and abs(pet._rect.bottom - hopped) <= 1:
+            return True
+        if abs(pet._rect.bottom - 1 - path[0].y) <= 1:
+            # the goal is on this surface, keep walking to it
+            if path[0].kind != navigation.GOAL:
+                path.pop(0)
+            return True
+
+        # landed somewhere else -- plan again from here, once
+        goal = pet.parent.world.navigation.locate(
+            Rect(self.target_location["pos"], pet._rect.size)
+        )
+        replanned = None
+        if goal != None and not self._replanned:
+            replanned = pet.parent.world.navigation.plan(
+                pet._rect, goal, int(self.target_location["pos"].x), pet.MS
+            )
+        self._replanned = True
+        if replanned == None:
+            self._statemachine.fire(self._statemachine.lost_event)
+            return False
+        self.target_location["path"] = replanned
+        return True
+
 
 class JumpStage1(State):
     def __init__(self):
@@ -396,27 +568,12 @@ class JumpStage1(State):
         self._orect = self._statemachine.pet._rect.copy()
         # create new rect for new animation
         # grab a frame from the movie
-        frame = self._statemachine.pet.active_movie.currentPixmap()
-        self._statemachine.pet.change_rect(frame.width(), frame.height())
-        # center to bottomcenter
-        self._statemachine.pet._rect.bottom = self._orect.bottom
-        self._statemachine.pet._rect.centerx = self._orect.centerx
+        w, h = self._statemachine.pet.active_movie.currentSize()
+        # (centered on the bottom center)
+        self._statemachine.pet.change_rect(w, h)
 
         # update parent area
-        self._statemachine.pet.parent.setGeometry(
-            self._statemachine.pet._rect.x,
-            self._statemachine.pet._rect.y,
-            self._statemachine.pet._rect.w,
-            self._statemachine.pet._rect.h,
-        )
-
-        # set geometry
-        self._statemachine.pet.setGeometry(
-            0,
-            0,
-            self._statemachine.pet._rect.w,
-            self._statemachine.pet._rect.h,
-        )
+        self._statemachine.pet.parent.pet_resized(self._statemachine.pet)
 
     def on_exit(self):
 
@@ -426,19 +583,11 @@ class JumpStage1(State):
         )
 
         # reset parent area
-        self._statemachine.pet.parent.setGeometry(
-            self._statemachine.pet._rect.x,
-            self._statemachine.pet._rect.y,
-            self._statemachine.pet._rect.w,
-            self._statemachine.pet._rect.h,
-        )
+        self._statemachine.pet.parent.pet_resized(self._statemachine.pet)
 
     def update(self):
-        # on the 27th frame, we swap to other animation
-        # check if movie is playing
-        # print("jumping", self._statemachine.pet.active_movie.currentFrameNumber())
-        if self._statemachine.pet.active_movie.currentFrameNumber() > 24:
-            self._statemachine.set_next_state("idle")
+        # back to idle through the `jump_done` guard
+        pass
 
 
 class FallState(State):
@@ -452,16 +601,11 @@ class FallState(State):
 
     def on_enter(self):
         self._statemachine.pet.update_animation("fall")
+        self._statemachine.pet.animation_cache.prefetch("idle")
 
         # set geometry
-        self._statemachine.pet.setGeometry(
-            0,
-            0,
-            self._statemachine.pet._rect.w,
-            self._statemachine.pet._rect.h,
-        )
+        self._statemachine.pet.parent.pet_resized(self._statemachine.pet)
 
     def update(self):
-        hit = self._statemachine.pet.parent.world.move_pet(self._statemachine.pet)
-        if hit["bottom"]:
-            self._statemachine.set_next_state("idle")
+        # lands through the `grounded` guard
+        self._statemachine.pet.parent.world.move_pet(self._statemachine.pet)
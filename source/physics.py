@@ -0,0 +1,136 @@
+import math
+
+from source import settings
+
+
+# ---------------------------- #
+# clock
+
+
+class PhysicsClock:
+    """
+    Fixed timestep accumulator.
+
+    Every frame adds its real duration with `advance`; the physics then runs
+    `steps` steps of exactly `step` seconds. The leftover time is kept for
+    the next frame and exposed as `alpha`, the fraction of a step the
+    renderer should interpolate by.
+    """
+
+    def __init__(self, rate: float, max_steps: int = 8):
+        self.rate = rate
+        self.step = 1.0 / rate
+        self.max_steps = max_steps
+
+        self.accumulator = 0.0
+        self.steps = 0
+        self.alpha = 0.0
+        self.dropped = 0
+
+    def advance(self, delta: float) -> int:
+        """Add a frame of `delta` seconds, returns the number of steps to run"""
+        self.accumulator += max(delta, 0.0)
+        steps = int(self.accumulator / self.step)
+
+        # a very long stall -- don't spiral trying to catch up
+        if steps > self.max_steps:
+            self.dropped += steps - self.max_steps
+            steps = self.max_steps
+            self.accumulator = 0.0
+        else:
+            self.accumulator -= steps * self.step
+
+        self.steps = steps
+        self.alpha = self.accumulator / self.step
+        return steps
+
+
+# ---------------------------- #
+# integration
+
+
+def step_body(pet: "PetObject", edges: "EdgeIndex", dt: float, floor: int) -> dict:
+    """
+    Advance one pet by one fixed step.
+
+    Gravity and drag are per second. The vertical move is swept: the rows
+    between the pet's old and new bottom (or top, when moving up) are
+    searched for window edges, so a long step can't tunnel through one.
+    Edges only stop a falling pet, jumps pass up through them.
+
+    The world steps all pets at once with `BodyTable.step`, this is the
+    single pet version it is checked against.
+    """
+    hit = {"top": False, "right": False, "bottom": False, "left": False}
+    pet._prev_pos.xy = pet._pos.xy
+
+    # walking overrides the horizontal velocity every step
+    if pet._drive:
+        pet._vel.x = pet._drive
+    pet._vel.y += settings.GRAVITY * dt
+
+    # x-axis
+    pet._pos.x += pet._vel.x * dt
+    pet._rect.x = pet._pos.x
+
+    # y-axis -- the pet stands on an edge when its last row is on it
+    start_row = pet._rect.bottom - 1
+    pet._pos.y += pet._vel.y * dt
+    pet._rect.y = pet._pos.y
+
+    # edges are one-way platforms, a rising (jumping) pet passes through
+    if pet._vel.y > 0:
+        # falling -- land on the first edge crossed by the bottom row
+        found = edges.sweep(
+            pet._rect.left, pet._rect.right, start_row, pet._rect.bottom - 1
+        )
+        if len(found):
+            hit["bottom"] = True
+            pet._vel.y = 0
+            pet._pos.y = int(edges.y[found[0]]) - pet._rect.h + 1
+    pet._rect.y = pet._pos.y
+
+    # restriction #1 - cannot fall out of bottom of screen
+    if pet._rect.bottom >= floor:
+        hit["bottom"] = True
+        pet._vel.y = 0
+        pet._rect.bottom = floor - 1
+        pet._pos.y = pet._rect.y
+
+    # drag
+    pet._vel.xy *= math.exp(-settings.DRAG * dt)
+
+    return hit
+
+
+# ---------------------------- #
+# jumping
+
+
+def jump_height(speed: float) -> float:
+    """Apex height of a jump starting at `speed` px/s, using the fixed steps"""
+    dt = 1.0 / settings.PHYSICS_RATE
+    drag = math.exp(-settings.DRAG * dt)
+    velocity = -speed
+    y = 0.0
+    apex = 0.0
+    while velocity < 0:
+        velocity += settings.GRAVITY * dt
+        y += velocity * dt
+        velocity *= drag
+        apex = min(apex, y)
+    return -apex
+
+
+def jump_speed(height: float) -> float:
+    """Smallest take-off speed reaching `height`, None if out of reach"""
+    if jump_height(settings.JUMP_SPEED) < height:
+        return None
+    low, high = 0.0, float(settings.JUMP_SPEED)
+    for _ in range(24):
+        middle = (low + high) / 2
+        if jump_height(middle) < height:
+            low = middle
+        else:
+            high = middle
+    return high
@@ -0,0 +1,137 @@
+import time
+import threading
+
+from source.snapshot import Snapshot, EMPTY_SNAPSHOT, snapshot_key
+from source.profiler import PROFILER, RingBuffer
+
+
+# ---------------------------- #
+# double buffer
+
+
+class DoubleBuffer:
+    """
+    Single writer, many reader snapshot exchange.
+
+    The writer fills the back slot and then flips `_front`. Both steps are
+    single reference assignments, so readers never take a lock and always
+    see a complete snapshot.
+    """
+
+    def __init__(self, initial: "Snapshot" = EMPTY_SNAPSHOT):
+        self._slots = [initial, initial]
+        self._front = 0
+
+    def publish(self, snapshot: "Snapshot"):
+        """Write into the back slot, then make it the front"""
+        back = 1 - self._front
+        self._slots[back] = snapshot
+        self._front = back
+
+    def read(self) -> "Snapshot":
+        """Latest published snapshot, never blocks"""
+        return self._slots[self._front]
+
+
+# ---------------------------- #
+# poller
+
+
+class WindowPoller(threading.Thread):
+    """
+    Polls a window source on its own thread.
+
+    `source` is any callable returning the front to back window list (like
+    `desktop.get_active_windows`). While windows keep changing the source
+    is polled every `fast_interval` seconds; every unchanged poll doubles
+    the interval until it reaches `slow_interval`.
+    """
+
+    def __init__(self, source: "callable", fast_interval: float, slow_interval: float):
+        super().__init__(name="WindowPoller", daemon=True)
+        self.source = source
+        self.fast_interval = fast_interval
+        self.slow_interval = max(slow_interval, fast_interval)
+        self.interval = fast_interval
+
+        self.buffer = DoubleBuffer()
+        self._stop_event = threading.Event()
+        self._wake_event = threading.Event()
+
+        # cleared while paused, the thread then waits without polling
+        self._running = threading.Event()
+        self._running.set()
+
+        # stats
+        self.polls = 0
+        self.changes = 0
+        self.last_poll_time = 0.0
+
+        # how long reading the window list took, written by the poll thread
+        self.durations = RingBuffer()
+
+    # ---------------------------- #
+    # logic
+
+    def poll(self) -> bool:
+        """Poll the source once, returns True if a new snapshot was published"""
+        started = PROFILER.enabled and PROFILER.start()
+        windows = self.source()
+        if started:
+            self.durations.push(time.perf_counter() - started)
+        self.polls += 1
+        self.last_poll_time = time.time()
+
+        key = snapshot_key(windows)
+        if key == self.buffer.read().key:
+            # stable desktop -- back off
+            self.interval = min(self.interval * 2, self.slow_interval)
+            return False
+
+        self.changes += 1
+        self.buffer.publish(Snapshot(self.changes, self.last_poll_time, windows, key))
+        self.interval = self.fast_interval
+        return True
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self._running.wait()
+            if self._stop_event.is_set():
+                break
+            self.poll()
+            self._wake_event.wait(self.interval)
+            self._wake_event.clear()
+
+    def wake(self):
+        """Poll again right away and return to the fast rate"""
+        self.interval = self.fast_interval
+        self._wake_event.set()
+
+    def pause(self):
+        """Stop polling (after the current poll) until `resume`"""
+        self._running.clear()
+        self._wake_event.set()
+
+    def resume(self):
+        """Poll again right away, at the fast rate"""
+        self.interval = self.fast_interval
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._running.set()
+        self._wake_event.set()
+
+    # ---------------------------- #
+    # utils
+
+    def latest(self) -> "Snapshot":
+        return self.buffer.read()
+
+    def get_poll_rate(self) -> float:
+        """Current polls per second"""
+        return 1.0 / self.interval
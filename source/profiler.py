@@ -0,0 +1,164 @@
+import time
+
+import numpy as np
+
+
+# ---------------------------- #
+# constants
+
+# frames kept per ring buffer
+HISTORY = 512
+PERCENTILES = (50, 90, 99)
+
+# ---------------------------- #
+# ring buffer
+
+
+class RingBuffer:
+    """The last `size` samples, overwriting the oldest"""
+
+    def __init__(self, size: int = HISTORY):
+        self.data = np.zeros(size, dtype=np.float64)
+        self.size = size
+        self.count = 0
+
+    def push(self, value: float):
+        self.data[self.count % self.size] = value
+        self.count += 1
+
+    def values(self) -> "np.ndarray":
+        """Samples, oldest first"""
+        if self.count <= self.size:
+            return self.data[: self.count]
+        start = self.count % self.size
+        return np.concatenate([self.data[start:], self.data[:start]])
+
+    def last(self) -> float:
+        return float(self.data[(self.count - 1) % self.size]) if self.count else 0.0
+
+    def percentiles(self, qs: (int,) = PERCENTILES) -> {int: float}:
+        if not self.count:
+            return {q: 0.0 for q in qs}
+        found = np.percentile(self.values(), qs)
+        return dict(zip(qs, found.tolist()))
+
+    def __len__(self):
+        return min(self.count, self.size)
+
+
+# ---------------------------- #
+# profiler
+
+
+class StateStats:
+    """Time spent in, time spent updating and transitions of one state graph"""
+
+    def __init__(self, names: (str,)):
+        self.names = names
+        self.dwell = np.zeros(len(names), dtype=np.float64)
+        self.update = np.zeros(len(names), dtype=np.float64)
+        self.updates = np.zeros(len(names), dtype=np.int64)
+        self.transitions = np.zeros((len(names), len(names)), dtype=np.int64)
+
+
+class Profiler:
+    """
+    Per frame timings of the main loop phases.
+
+    A phase is timed with a pair of calls, guarded so that a disabled
+    profiler costs two truth tests per phase and no calls at all:
+
+        started = PROFILER.enabled and PROFILER.start()
+        ...
+        if started:
+            PROFILER.stop("paint", started)
+
+    Phases may be entered many times a frame (once per pet), their time
+    adds up until `frame` pushes every phase's total into its ring buffer.
+    Phases can nest -- `events` contains the `paint` Qt runs inside it.
+    """
+
+    def __init__(self, enabled: bool = False, size: int = HISTORY):
+        self.enabled = enabled
+        self.size = size
+
+        self.frames = RingBuffer(size)
+        self.phases: {str: "RingBuffer"} = {}
+        self.states: {int: "StateStats"} = {}
+        self._current: {str: float} = {}
+        self._frame_start = None
+
+    def reset(self):
+        """Drop everything recorded so far"""
+        self.frames = RingBuffer(self.size)
+        self.phases.clear()
+        self.states.clear()
+        self._current.clear()
+        self._frame_start = None
+
+    # ---------------------------- #
+    # phases
+
+    def start(self) -> float:
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, phase: str, started: float):
+        if self.enabled:
+            spent = time.perf_counter() - started
+            self._current[phase] = self._current.get(phase, 0.0) + spent
+
+    def frame(self):
+        """End the frame: record its length and what every phase took"""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start != None:
+            self.frames.push(now - self._frame_start)
+        self._frame_start = now
+
+        for phase in self._current.keys() - self.phases.keys():
+            self.phases[phase] = RingBuffer(self.size)
+        for phase, buffer in self.phases.items():
+            buffer.push(self._current.get(phase, 0.0))
+        self._current.clear()
+
+    # ---------------------------- #
+    # states
+
+    def graph(self, graph: "StateGraph") -> "StateStats":
+        stats = self.states.get(id(graph))
+        if stats == None:
+            stats = self.states[id(graph)] = StateStats(graph.names)
+        return stats
+
+    # ---------------------------- #
+    # summaries
+
+    def summary(self, qs: (int,) = PERCENTILES) -> {str: {int: float}}:
+        """Percentiles (seconds) of the frame time and of every phase"""
+        result = {"frame": self.frames.percentiles(qs)}
+        for phase, buffer in self.phases.items():
+            result[phase] = buffer.percentiles(qs)
+        return result
+
+    def report(self) -> str:
+        lines = []
+        for phase, found in self.summary().items():
+            values = " ".join(f"p{q} {v * 1000:7.3f}" for q, v in found.items())
+            lines.append(f"{phase:>14} | {values} ms")
+        for stats in self.states.values():
+            for i, name in enumerate(stats.names):
+                update = stats.update[i] / max(stats.updates[i], 1)
+                lines.append(
+                    f"{name:>14} | in state {stats.dwell[i]:9.2f} s | "
+                    f"update {update * 1e6:7.2f} us | "
+                    f"left {stats.transitions[i].sum():6} times"
+                )
+        return "\n".join(lines)
+
+    def __str__(self):
+        return self.report()
+
+
+# one profiler for the whole process, enabled by the main loop
+PROFILER = Profiler()
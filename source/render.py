@@ -0,0 +1,107 @@
+# ---------------------------- #
+# render pipeline
+
+
+class RenderPipeline:
+    """
+    Dirty tracking for the widgets on screen.
+
+    Instead of calling `move`, `setGeometry` and `update` every frame, the
+    window and pet submit what they want to show. Submissions are compared
+    to what was last applied and only changes are kept; `flush` applies at
+    most one geometry change and one repaint per widget, once per frame.
+    Nothing is sent to qt (or the compositor) when nothing changed.
+    """
+
+    def __init__(self):
+        # last applied value per (widget, channel)
+        self._applied = {}
+
+        # pending changes of this frame, by widget
+        self._geometry = {}
+        self._repaint = {}
+        self._widgets = {}
+
+        # stats
+        self.frames = 0
+        self.idle_frames = 0
+        self.moves = 0
+        self.resizes = 0
+        self.repaints = 0
+
+    # ---------------------------- #
+    # submitting
+
+    def _changed(self, widget, channel: str, value) -> bool:
+        return self._applied.get((id(widget), channel)) != value
+
+    def move(self, widget, x: int, y: int):
+        """Place `widget` at `(x, y)`, keeping its size"""
+        pending = self._geometry.get(id(widget))
+        if pending != None and pending[1] != None:
+            # keep the size of a pending resize
+            self._geometry[id(widget)] = ((x, y), pending[1])
+        else:
+            self._geometry[id(widget)] = ((x, y), None)
+        self._widgets[id(widget)] = widget
+
+    def set_geometry(self, widget, x: int, y: int, w: int, h: int):
+        self._geometry[id(widget)] = ((x, y), (w, h))
+        self._widgets[id(widget)] = widget
+
+    def repaint(self, widget, key):
+        """
+        Repaint `widget` if `key` (anything describing what it shows)
+        differs from the last painted one.
+        """
+        self._repaint[id(widget)] = key
+        self._widgets[id(widget)] = widget
+
+    def invalidate(self, widget):
+        """Forget what `widget` shows, its next submissions are all applied"""
+        for channel in ("position", "size", "content"):
+            self._applied.pop((id(widget), channel), None)
+
+    # ---------------------------- #
+    # applying
+
+    def flush(self) -> bool:
+        """Apply the changes of this frame, returns whether anything changed"""
+        self.frames += 1
+        changed = False
+
+        for key, (position, size) in self._geometry.items():
+            widget = self._widgets[key]
+            moved = self._changed(widget, "position", position)
+            resized = size != None and self._changed(widget, "size", size)
+            if resized:
+                widget.setGeometry(position[0], position[1], size[0], size[1])
+                self._applied[(key, "size")] = size
+                self.resizes += 1
+            elif moved:
+                widget.move(position[0], position[1])
+                self.moves += 1
+            self._applied[(key, "position")] = position
+            changed |= moved or resized
+
+        for key, content in self._repaint.items():
+            widget = self._widgets[key]
+            if self._changed(widget, "content", content):
+                widget.update()
+                self._applied[(key, "content")] = content
+                self.repaints += 1
+                changed = True
+
+        self._geometry.clear()
+        self._repaint.clear()
+        self._widgets.clear()
+        if not changed:
+            self.idle_frames += 1
+        return changed
+
+    def __str__(self):
+        return (
+            f"RenderPipeline: {self.frames} frames | idle: {self.idle_frames} | "
+            f"moves: {self.moves} | resizes: {self.resizes} | "
+            f"repaints: {self.repaints}"
+        )
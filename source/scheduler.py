@@ -0,0 +1,179 @@
+import time
+import heapq
+
+
+# ---------------------------- #
+# timers
+
+
+class Timer:
+    """
+    `QTimer`-like handle on a `Scheduler`.
+
+    Repeats every `interval` ms once started unless `single_shot`. A timer
+    with an `owner` is suspended and resumed with it, keeping the time it
+    had left.
+    """
+
+    __slots__ = (
+        "scheduler",
+        "callback",
+        "owner",
+        "single_shot",
+        "interval",
+        "deadline",
+        "remaining",
+        "_token",
+    )
+
+    def __init__(
+        self,
+        scheduler: "Scheduler",
+        callback: "function",
+        owner=None,
+        single_shot: bool = False,
+    ):
+        self.scheduler = scheduler
+        self.callback = callback
+        self.owner = owner
+        self.single_shot = single_shot
+        self.interval = 0.0
+
+        # pending: `deadline` is set -- suspended: `remaining` is set
+        self.deadline: float = None
+        self.remaining: float = None
+        self._token = 0
+
+    def start(self, ms: int = None):
+        """(Re)start the timer, optionally with a new interval"""
+        if ms != None:
+            self.interval = ms / 1000
+        self.remaining = None
+        self.scheduler._push(self, self.scheduler.clock() + self.interval)
+
+    def stop(self):
+        self._token += 1
+        self.deadline = None
+        self.remaining = None
+
+    def isActive(self) -> bool:
+        return self.deadline != None or self.remaining != None
+
+
+# ---------------------------- #
+# scheduler
+
+
+class Scheduler:
+    """
+    One timer heap for every pet.
+
+    Nothing here wakes up on its own: the host calls `run` once per frame
+    and every timer that is due fires, in deadline order (ties in the order
+    they were started). Stopped timers are dropped lazily when they reach
+    the top of the heap. The time comes from `clock`, so tests can drive
+    it by hand.
+    """
+
+    def __init__(self, clock: "function" = time.monotonic):
+        self.clock = clock
+        self._heap = []
+        self._sequence = 0
+        self._owned = {}
+
+        # timers started while `run` fires wait for the next run
+        self._running = False
+        self._deferred = []
+
+        # stats
+        self.wakeups = 0
+        self.fired = 0
+
+    def timer(self, callback: "function", owner=None, single_shot: bool = False):
+        """New stopped timer calling `callback`"""
+        timer = Timer(self, callback, owner, single_shot)
+        if owner != None:
+            self._owned.setdefault(id(owner), []).append(timer)
+        return timer
+
+    def call_later(self, ms: int, callback: "function", owner=None) -> "Timer":
+        """Call `callback` once, `ms` from now"""
+        timer = self.timer(callback, owner, single_shot=True)
+        timer.start(ms)
+        return timer
+
+    def _push(self, timer: "Timer", deadline: float):
+        timer._token += 1
+        timer.deadline = deadline
+        self._sequence += 1
+        entry = (deadline, self._sequence, timer._token, timer)
+        if self._running:
+            self._deferred.append(entry)
+        else:
+            heapq.heappush(self._heap, entry)
+
+    # ---------------------------- #
+    # owners
+
+    def suspend(self, owner):
+        """Pause the pending timers of `owner`"""
+        now = self.clock()
+        for timer in self._owned.get(id(owner), ()):
+            if timer.deadline != None:
+                remaining = max(timer.deadline - now, 0.0)
+                timer.stop()
+                timer.remaining = remaining
+
+    def resume(self, owner):
+        """Continue the timers `suspend` paused"""
+        now = self.clock()
+        for timer in self._owned.get(id(owner), ()):
+            if timer.remaining != None:
+                remaining = timer.remaining
+                timer.remaining = None
+                self._push(timer, now + remaining)
+
+    def forget(self, owner):
+        """Stop and drop every timer of `owner`"""
+        for timer in self._owned.pop(id(owner), ()):
+            timer.stop()
+
+    # ---------------------------- #
+    # running
+
+    def run(self, now: float = None) -> int:
+        """Fire every due timer, returns how many fired"""
+        if now == None:
+            now = self.clock()
+        self.wakeups += 1
+
+        fired = 0
+        heap = self._heap
+        self._running = True
+        try:
+            while heap and heap[0][0] <= now:
+                deadline, _, token, timer = heapq.heappop(heap)
+                if token != timer._token:
+                    continue
+
+                if timer.single_shot:
+                    timer.deadline = None
+                else:
+                    # a late repeating timer fires once, not once per missed period
+                    deadline += timer.interval
+                    if deadline <= now:
+                        deadline = now + timer.interval
+                    self._push(timer, deadline)
+                fired += 1
+                timer.callback()
+        finally:
+            self._running = False
+            for entry in self._deferred:
+                heapq.heappush(heap, entry)
+            self._deferred.clear()
+        self.fired += fired
+        return fired
+
+    def __len__(self):
+        """Pending timers"""
+        return sum(1 for entry in self._heap if entry[2] == entry[3]._token)
@@ -2,6 +2,7 @@ import sys
 import json
 import time
 
+
 # ============================================================================== #
 # constants
 
@@ -12,6 +13,41 @@ FPS = 16
 DELTA = 1 / FPS
 WORLD_DELTA = 2
 
+# physics runs at a fixed rate, forces are per second
+PHYSICS_RATE = 16
+GRAVITY = 480
+DRAG = 5.7
+JUMP_SPEED = 1500
+
+# seeds the random choices of every pet (None: different every run), and
+# runs timers + animations on frame time instead of the wall clock
+SEED = None
+VIRTUAL_TIME = False
+
+# pets closer than this are neighbours, some idle walks go to one of them
+SOCIAL_RADIUS = 150
+SOCIAL_CHANCE = 0.3
+
+# time per frame the signal bus may spend calling receivers
+SIGNAL_BUDGET_MS = 2
+
+# main loop rate once every pet rested for `IDLE_AFTER` seconds
+IDLE_FPS = 4
+IDLE_AFTER = 2.0
+
+# while suspended (hidden, screen locked, ...) the loop only waits for signals
+SUSPENDED_DELTA = 0.5
+SUSPEND_WHEN_LOCKED = True
+SUSPEND_OFFSCREEN = False
+
+# scripting socket (`--control`), commands run per frame within a budget
+CONTROL_SOCKET = "/tmp/desktoppet.sock"
+CONTROL_LINE_LIMIT = 1 << 24  # bytes per request line, longer ones are refused
+CONTROL_BUDGET_MS = 4
+
+# decoded animation frames kept in memory
+ANIMATION_CACHE_MB = 64
+
 NAME_KEY = "name"
 ANIMATION_KEY = "animations"
 
@@ -30,6 +66,8 @@ MINIMUM_WINDOW_HEIGHT = 100
 
 
 ICON_PATH = "assets/icon.png"
+ATLAS_CACHE_DIR = ".cache/atlas"
+BEHAVIORS_FILE = "assets/behaviors.json"
 START_TIME = time.time()
 ILLEGAL_WINDOW_NAMES = [
     # windows
@@ -87,3 +125,19 @@ def init():
     FPS = settings["FPS"]
     DELTA = 1 / FPS
     WORLD_DELTA = settings["WORLD_DELTA"]
+
+    # set physics
+    global PHYSICS_RATE, GRAVITY, DRAG, JUMP_SPEED
+    PHYSICS_RATE = settings["PHYSICS_RATE"]
+    GRAVITY = settings["GRAVITY"]
+    DRAG = settings["DRAG"]
+    JUMP_SPEED = settings["JUMP_SPEED"]
+
+    # set animation cache
+    global ANIMATION_CACHE_MB
+    ANIMATION_CACHE_MB = settings["ANIMATION_CACHE_MB"]
+
+    # reproducible runs
+    global SEED, VIRTUAL_TIME
+    SEED = settings.get("SEED", SEED)
+    VIRTUAL_TIME = settings.get("VIRTUAL_TIME", VIRTUAL_TIME)
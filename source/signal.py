@@ -1,25 +1,124 @@
-class SignalHandler:
-
-    SIGNAL_QUEUE = []
-    SIGNAL_RECEIVERS = {}
-
-    @classmethod
-    def iterate_signals(cls):
-        # print(cls.SIGNAL_QUEUE)
-        for signal in cls.SIGNAL_QUEUE:
-            receiver, args = signal
-            if receiver in cls.SIGNAL_RECEIVERS:
-                for function in cls.SIGNAL_RECEIVERS[receiver]:
-                    function(args)
-        cls.SIGNAL_QUEUE = []
-
-    @classmethod
-    def add_receiver(cls, receiver: str, function: "function"):
-        if receiver not in cls.SIGNAL_RECEIVERS:
-            cls.SIGNAL_RECEIVERS[receiver] = []
-        cls.SIGNAL_RECEIVERS[receiver].append(function)
-
-    @classmethod
-    def add_signal(cls, receiver: str, args: dict):
-        # print(f"Adding signal {receiver} with args {args}")
-        cls.SIGNAL_QUEUE.append((receiver, args))
+import time
+import heapq
+import itertools
+import collections
+
+
+# ---------------------------- #
+# bus
+
+
+class SignalBus:
+    """
+    Signals posted from anywhere, dispatched once per frame on the main thread.
+
+    Topics are registered by name once and used as integer ids after
+    that; receivers are kept in a list per id. `post` only appends to a
+    deque (atomic, no lock), so AppKit callbacks and other threads can post
+    at any time. `dispatch` moves what was posted so far into a priority
+    queue -- signals posted while it runs wait for the next frame -- and
+    calls the receivers, highest priority first, until `budget` seconds are
+    used up. What is left over is dispatched first next frame.
+
+    For a coalescing topic only the last signal posted before a dispatch
+    is delivered.
+    """
+
+    def __init__(self):
+        self._names: {str: int} = {}
+        self._receivers: [["function"]] = []
+        self._priority: [int] = []
+        self._coalesce: [bool] = []
+
+        # posted (topic, args), drained by `dispatch`
+        self._queue = collections.deque()
+        self._pending = []
+        self._latest = {}
+        self._sequence = itertools.count()
+
+        # stats
+        self.posted = 0
+        self.dispatched = 0
+        self.coalesced = 0
+        self.deferred = 0
+
+    # ---------------------------- #
+    # topics
+
+    def topic(self, name: str, priority: int = 0, coalesce: bool = False) -> int:
+        """Id of topic `name`, registering it the first time"""
+        topic = self._names.get(name)
+        if topic == None:
+            topic = self._names[name] = len(self._receivers)
+            self._receivers.append([])
+            self._priority.append(priority)
+            self._coalesce.append(coalesce)
+        return topic
+
+    def add_receiver(self, topic: int, function: "function"):
+        self._receivers[topic].append(function)
+
+    def remove_receiver(self, topic: int, function: "function"):
+        if function in self._receivers[topic]:
+            self._receivers[topic].remove(function)
+
+    # ---------------------------- #
+    # signals
+
+    def post(self, topic: int, args: dict = None):
+        """Queue a signal, from any thread"""
+        self._queue.append((topic, args))
+
+    def dispatch(self, budget: float = None) -> int:
+        """Call the receivers of the queued signals, returns how many ran"""
+        started = time.perf_counter()
+
+        # only what was posted up to now
+        queue = self._queue
+        count = len(queue)
+        self.posted += count
+        for _ in range(count):
+            topic, args = queue.popleft()
+            sequence = next(self._sequence)
+            if self._coalesce[topic]:
+                self._latest[topic] = sequence
+            heapq.heappush(
+                self._pending, (-self._priority[topic], sequence, topic, args)
+            )
+
+        dispatched = 0
+        pending = self._pending
+        while pending:
+            # always make progress, even on a tiny budget
+            if budget != None and dispatched:
+                if time.perf_counter() - started >= budget:
+                    self.deferred += len(pending)
+                    break
+
+            _, sequence, topic, args = heapq.heappop(pending)
+            if self._coalesce[topic] and self._latest[topic] != sequence:
+                self.coalesced += 1
+                continue
+            for function in self._receivers[topic]:
+                function(args)
+            dispatched += 1
+
+        self.dispatched += dispatched
+        return dispatched
+
+    def __len__(self):
+        """Signals waiting for a dispatch"""
+        return len(self._queue) + len(self._pending)
+
+
+# ---------------------------- #
+# the application's bus + its topics
+
+BUS = SignalBus()
+
+HIDE = BUS.topic("hide", priority=1, coalesce=True)
+SHOW = BUS.topic("show", priority=1, coalesce=True)
+RESET = BUS.topic("reset", coalesce=True)
+LOCK = BUS.topic("lock", priority=1, coalesce=True)
+UNLOCK = BUS.topic("unlock", priority=1, coalesce=True)
+CUSTOM = BUS.topic("custom")
@@ -0,0 +1,104 @@
+import numpy as np
+
+from source.windowtable import WindowTable
+
+
+# ---------------------------- #
+# diff
+
+
+class WorldDiff:
+    """Changes between two consecutive window snapshots (lists of window ids)"""
+
+    def __init__(self):
+        self.added = []
+        self.removed = []
+        self.moved = []
+        self.restacked = []
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.moved or self.restacked)
+
+    def changed(self) -> set:
+        """All window ids touched by this diff"""
+        return (
+            set(self.added) | set(self.removed) | set(self.moved) | set(self.restacked)
+        )
+
+    def __str__(self):
+        return f"WorldDiff: added {self.added} | removed {self.removed} | moved {self.moved} | restacked {self.restacked}"
+
+
+def snapshot_key(windows: "WindowTable") -> bytes:
+    """Cheap identity of a snapshot -- equal keys mean nothing changed"""
+    return windows.key()
+
+
+def diff_windows(previous: "WindowTable", current: "WindowTable") -> WorldDiff:
+    """
+    Compare two window tables (front to back) from `get_active_windows`.
+
+    Windows are matched by their `wid`. A window is restacked when its
+    position among the windows present in both snapshots changed.
+    """
+    diff = WorldDiff()
+
+    old = previous.data
+    new = current.data
+    old_kept = np.isin(old["wid"], new["wid"])
+    new_kept = np.isin(new["wid"], old["wid"])
+
+    diff.added = new["wid"][~new_kept].tolist()
+    diff.removed = old["wid"][~old_kept].tolist()
+
+    # windows in both snapshots, in stacking order
+    old = old[old_kept]
+    new = new[new_kept]
+
+    # stacking order of the windows that exist in both snapshots
+    diff.restacked = new["wid"][old["wid"] != new["wid"]].tolist()
+
+    # geometry changes -- line both up by wid first
+    old = old[np.argsort(old["wid"], kind="stable")]
+    new = new[np.argsort(new["wid"], kind="stable")]
+    moved = (
+        (old["x"] != new["x"])
+        | (old["y"] != new["y"])
+        | (old["w"] != new["w"])
+        | (old["h"] != new["h"])
+    )
+    diff.moved = new["wid"][moved].tolist()
+
+    return diff
+
+
+# ---------------------------- #
+# snapshot
+
+
+class Snapshot:
+    """
+    Immutable result of one window-list poll.
+
+    `windows` is the read only window table of the poll, the same object is
+    shared between threads.
+    """
+
+    __slots__ = ("sequence", "timestamp", "windows", "key")
+
+    def __init__(
+        self, sequence: int, timestamp: float, windows: "WindowTable", key: bytes
+    ):
+        object.__setattr__(self, "sequence", sequence)
+        object.__setattr__(self, "timestamp", timestamp)
+        object.__setattr__(self, "windows", windows)
+        object.__setattr__(self, "key", key)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Snapshot is immutable")
+
+    def __len__(self):
+        return len(self.windows)
+
+
+EMPTY_SNAPSHOT = Snapshot(0, 0.0, WindowTable.empty(), WindowTable.empty().key())
@@ -0,0 +1,100 @@
+import numpy as np
+
+
+# ---------------------------- #
+# constants
+
+# below this many edges a python loop beats the vectorized sweep, whose
+# numpy calls cost more than the scan -- bench_collision measures the
+# crossover at 200 to 300 edges and fails if this drifts far from it
+LINEAR_EDGES = 256
+
+# ---------------------------- #
+# edge index
+
+
+class EdgeIndex:
+    """
+    Horizontal edges of the active windows, sorted by their row.
+
+    Every edge is one pixel tall. The edges are stored as columns sorted by
+    `y`, so a y-range query is two binary searches and the x-overlap test
+    runs vectorized over the edges in that range only. With fewer than
+    `LINEAR_EDGES` edges `sweep` scans them in a python loop.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    # ---------------------------- #
+    # building
+
+    def clear(self):
+        """Remove all edges"""
+        self.rebuild(np.zeros(0), np.zeros(0), np.zeros(0))
+
+    def rebuild(
+        self,
+        x0: "np.ndarray",
+        x1: "np.ndarray",
+        y: "np.ndarray",
+        owner: "np.ndarray" = None,
+        slot: "np.ndarray" = None,
+    ):
+        """
+        Rebuild the index from `[x0, x1)` edges on row `y`. `owner` is the
+        window id of each edge and `slot` 0 for top, 1 for bottom edges.
+        """
+        y = np.asarray(y, dtype=np.int64)
+        order = np.argsort(y, kind="stable")
+        if owner is None:
+            owner = np.full(len(y), -1, dtype=np.int64)
+        if slot is None:
+            slot = np.zeros(len(y), dtype=np.int64)
+
+        # `order` keeps the insertion index of every sorted edge
+        self.order = order
+        self.y = y[order]
+        self.x0 = np.asarray(x0, dtype=np.int64)[order]
+        self.x1 = np.asarray(x1, dtype=np.int64)[order]
+        self.owner = np.asarray(owner, dtype=np.int64)[order]
+        self.slot = np.asarray(slot, dtype=np.int64)[order]
+
+        # (y, x0, x1, position) of every edge, sorted by y
+        self._linear = None
+        if len(y) < LINEAR_EDGES:
+            self._linear = list(
+                zip(
+                    self.y.tolist(),
+                    self.x0.tolist(),
+                    self.x1.tolist(),
+                    range(len(y)),
+                )
+            )
+
+    # ---------------------------- #
+    # queries
+
+    def sweep(self, left: int, right: int, top: int, bottom: int) -> "np.ndarray":
+        """
+        Positions of the edges with `top <= y <= bottom` overlapping
+        `[left, right)`, sorted by `y`.
+        """
+        if self._linear != None:
+            found = [
+                i
+                for y, x0, x1, i in self._linear
+                if top <= y <= bottom and x0 < right and x1 > left
+            ]
+            return np.array(found, dtype=np.int64)
+
+        lo = np.searchsorted(self.y, top, side="left")
+        hi = np.searchsorted(self.y, bottom, side="right")
+        if lo >= hi:
+            return np.zeros(0, dtype=np.int64)
+
+        mask = (self.x0[lo:hi] < right) & (self.x1[lo:hi] > left)
+        return np.flatnonzero(mask) + lo
+
+    def __len__(self):
+        return len(self.y)
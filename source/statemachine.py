@@ -1,4 +1,7 @@
-import pygame
+import json
+import time
+
+from source.profiler import PROFILER
 
 
 # ---------------------------- #
@@ -6,61 +9,224 @@ import pygame
 
 COMPONENT_NAME = "StateMachineComponent"
 
+# no transition
+NONE = -1
+
+# ---------------------------- #
+# graph
+
+
+class StateGraph:
+    """
+    A state graph compiled into integer indexed tables.
+
+    `definition` lists the `states` (their order gives the indices), the
+    `initial` state and the `transitions`. A transition goes `from` a state
+    (or `*`, every state) `to` another one either when the guard named in
+    `when` holds after the state's update, or when the `event` it names is
+    fired. Guard names are looked up in `guards` once, here. After
+    compiling, every lookup is a list index: `guards[state]` is the tuple of
+    `(predicate, target)` checked in order, `events[event][state]` the
+    target of an event (`NONE` when the state ignores it).
+
+    A graph has no per-pet data; every pet with the same behavior shares it.
+    """
+
+    def __init__(self, definition: dict, guards: {str: "function"}):
+        self.names = tuple(definition["states"])
+        index = {name: i for i, name in enumerate(self.names)}
+        self.initial = self._resolve(index, definition["initial"])
+
+        guard_table = [[] for _ in self.names]
+        self.event_names = []
+        self.events = []
+        for transition in definition["transitions"]:
+            if transition["from"] == "*":
+                sources = range(len(self.names))
+            else:
+                sources = [self._resolve(index, transition["from"])]
+            target = self._resolve(index, transition["to"])
+
+            if "when" in transition:
+                if transition["when"] not in guards:
+                    raise ValueError(f"unknown guard: {transition['when']}")
+                predicate = guards[transition["when"]]
+                for source in sources:
+                    guard_table[source].append((predicate, target))
+            else:
+                event = self.event(transition["event"], create=True)
+                for source in sources:
+                    self.events[event][source] = target
+
+        self.guards = tuple(tuple(entries) for entries in guard_table)
+
+    def _resolve(self, index: {str: int}, name: str) -> int:
+        if name not in index:
+            raise ValueError(f"unknown state: {name}")
+        return index[name]
+
+    def state(self, name: str) -> int:
+        """Index of state `name` -- resolve once, keep the index"""
+        return self.names.index(name)
+
+    def event(self, name: str, create: bool = False) -> int:
+        """Index of event `name` -- resolve once, keep the index"""
+        if name in self.event_names:
+            return self.event_names.index(name)
+        if not create:
+            raise ValueError(f"unknown event: {name}")
+        self.event_names.append(name)
+        self.events.append([NONE] * len(self.names))
+        return len(self.events) - 1
+
+
+# compiled graphs by (file, name), shared by every machine using them
+_graphs = {}
+
+
+def load_graph(filename: str, name: str, guards: {str: "function"}) -> "StateGraph":
+    """Graph `name` of a behaviors file, compiled the first time it is asked for"""
+    key = (filename, name)
+    if key not in _graphs:
+        with open(filename, "r") as file:
+            definition = json.load(file)[name]
+        _graphs[key] = StateGraph(definition, guards)
+    return _graphs[key]
+
+
 # ---------------------------- #
 # component
 
 
 class StateMachineComponent:
+    """
+    One running instance of a `StateGraph`.
 
-    def __init__(self):
+    The instance only keeps the index of its current and next state, and
+    its `State` objects in graph order together with their bound
+    `on_enter` / `update` / `on_exit` methods, so a tick and a transition
+    are a few list lookups. Guards are called with `context`.
+    """
+
+    def __init__(self, graph: "StateGraph", context, scheduler: "Scheduler" = None):
         """Initialize the renderable component"""
         super().__init__()
+        self.graph = graph
+        self.context = context
+
+        # timers owned by a state only run while it is the current one
+        self.scheduler = scheduler
 
-        self._states = {}
-        self._next_state: str = None
-        self._current_state: str = None
+        self._states = [None] * len(graph.names)
+        self._next_state = NONE
+        self._current_state = NONE
+
+        # when the last profiled tick ran
+        self._seen: float = None
+
+        # dispatch tables, filled by `add_state`
+        self._enter = [None] * len(graph.names)
+        self._update = [None] * len(graph.names)
+        self._exit = [None] * len(graph.names)
 
     # ---------------------------- #
     # logic
 
-    def set_next_state(self, name: str):
-        """Set the next state"""
-        self._next_state = self.get_state(name)
+    def start(self):
+        """Switch to the initial state once every state was added (no `on_enter`)"""
+        missing = [n for n, s in zip(self.graph.names, self._states) if s == None]
+        if missing:
+            raise ValueError(f"states without an implementation: {missing}")
+        self._current_state = self.graph.initial
 
-    def set_current_state(self, name: str):
-        """Set the current state"""
-        self._current_state = self.get_state(name)
+    def fire(self, event: int):
+        """Take the transition of `event` from the current state, if any"""
+        if self._current_state == NONE:
+            return
+        target = self.graph.events[event][self._current_state]
+        # the first transition asked for in a tick wins
+        if target != NONE and self._next_state == NONE:
+            self._next_state = target
 
     def get_current_state(self) -> "State":
         """Get the current state"""
+        if self._current_state == NONE:
+            return None
+        return self._states[self._current_state]
+
+    def get_current_index(self) -> int:
         return self._current_state
 
+    def settled(self) -> bool:
+        """In the initial state with no transition pending"""
+        return self._current_state == self.graph.initial and self._next_state == NONE
+
     def add_state(self, state: "State"):
-        """Add a state to the state machine"""
-        self._states[state.get_name()] = state
+        """Add the implementation of one state of the graph"""
+        index = self.graph.state(state.get_name())
+        self._states[index] = state
+        self._enter[index] = state.on_enter
+        self._update[index] = state.update
+        self._exit[index] = state.on_exit
         state.__post_init__(self)
 
     def get_state(self, name: str) -> "State":
         """Get a state by name"""
-        return self._states.get(name, None)
-
-    def remove_state(self, name: str):
-        """Remove a state by name"""
-        return self._states.pop(name, None)
+        return self._states[self.graph.state(name)]
 
     def update(self):
-        if not self.get_current_state():
+        current = self._current_state
+        if current == NONE:
             return
+        if PROFILER.enabled:
+            return self._profiled_update(current)
 
         # run statemachine logic
-        if self._next_state != None:
-            self.get_current_state().on_exit()
-            self._current_state = self._next_state
-            self.get_current_state().on_enter()
-            self._next_state = None
+        if self._next_state != NONE:
+            current = self._switch(current)
 
         # update state
-        self.get_current_state().update()
+        self._update[current]()
+
+        # guarded transitions, taken on the next tick
+        self._check_guards(current)
+
+    def _switch(self, current: int) -> int:
+        """Leave `current` for the next state, returns the new one"""
+        self._exit[current]()
+        if self.scheduler != None:
+            self.scheduler.suspend(self._states[current])
+        current = self._current_state = self._next_state
+        self._next_state = NONE
+        if self.scheduler != None:
+            self.scheduler.resume(self._states[current])
+        self._enter[current]()
+        return current
+
+    def _check_guards(self, current: int):
+        if self._next_state == NONE:
+            for predicate, target in self.graph.guards[current]:
+                if predicate(self.context):
+                    self._next_state = target
+                    break
+
+    def _profiled_update(self, current: int):
+        """`update`, recording time in and updating states, and transitions"""
+        stats = PROFILER.graph(self.graph)
+        now = time.perf_counter()
+        if self._seen != None:
+            stats.dwell[current] += now - self._seen
+        self._seen = now
+
+        if self._next_state != NONE:
+            stats.transitions[current, self._next_state] += 1
+            current = self._switch(current)
+
+        started = time.perf_counter()
+        self._update[current]()
+        stats.update[current] += time.perf_counter() - started
+        stats.updates[current] += 1
+        self._check_guards(current)
 
 
 class State:
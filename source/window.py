@@ -1,6 +1,6 @@
 import sys
 import time
-from PyQt5.QtCore import Qt, QTimer, QEvent
+from PyQt5.QtCore import Qt, QEvent
 from PyQt5.QtGui import QColor, QPainter, QMovie
 from PyQt5.QtWidgets import (
     QApplication,
@@ -20,11 +20,74 @@ from AppKit import (
     NSVariableStatusItemLength,
     NSMenuItem,
     NSMenu,
+    NSDistributedNotificationCenter,
 )
 from PyObjCTools.AppHelper import runEventLoop
 
+from pygame.math import Vector2
 
-from source import pet, desktop, settings, signal
+from source import pet, desktop, settings, signal, render
+from source.hud import ProfilerHud, HudOverlay
+from source.scheduler import Scheduler
+from source.pacing import FramePacer
+from source.lifecycle import Lifecycle, PausableClock, VirtualClock
+from source.profiler import PROFILER
+
+
+# ============================================ #
+# the pet widget
+
+
+class PetObject(QLabel):
+    """The widget showing a single pet inside its own window"""
+
+    def __init__(self, parent, pet: "Pet"):
+        super().__init__(parent)
+        self.parent = parent
+        self.pet = pet
+
+        # ============================================ #
+        # setup world interaction
+
+        self.setAttribute(Qt.WA_TransparentForMouseEvents, False)
+
+        # features
+        self.drag_offset = Vector2()
+
+    # ------------------------- #
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.pet.is_dragged = True
+            self.drag_offset = Vector2(event.pos().x(), event.pos().y())
+
+    def mouseMoveEvent(self, event):
+        if self.pet.is_dragged:
+            self.pet.drag_to(
+                event.globalPos().x() - self.drag_offset.x,
+                event.globalPos().y() - self.drag_offset.y,
+            )
+
+    def mouseReleaseEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.pet.is_dragged = False
+
+    def paintEvent(self, event):
+        # ------------------------- #
+        # draw the pet
+        started = PROFILER.enabled and PROFILER.start()
+        painter = QPainter(self)
+        painter.setCompositionMode(QPainter.CompositionMode_Source)
+        painter.fillRect(self.rect(), Qt.transparent)  # Clear the background
+        painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
+
+        # custom draw command
+        image = self.pet.current_image()
+        if image != None:
+            painter.drawImage(0, 0, image)
+        painter.end()
+        if started:
+            PROFILER.stop("paint", started)
 
 
 # ============================================ #
@@ -32,7 +95,7 @@ from source import pet, desktop, settings, signal
 
 
 class TransparentWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, source: "WindowSource" = None):
         super().__init__()
 
         # grab size of monitor
@@ -52,45 +115,141 @@ class TransparentWindow(QMainWindow):
 
         self.status_bar = StatusBarApp()
 
+        # batched move / resize / repaint calls
+        self.render = render.RenderPipeline()
+
+        # timers, animations and pacing all run on a clock that stops while
+        # the pet is suspended (and only moves with the frames in `VIRTUAL_TIME`)
+        self.virtual = VirtualClock() if settings.VIRTUAL_TIME else None
+        self.clock = (
+            PausableClock(self.virtual) if self.virtual != None else PausableClock()
+        )
+
+        # every timer of the pet, run once per frame by the main loop
+        self.scheduler = Scheduler(self.clock)
+        self.pacer = FramePacer(
+            settings.FPS, settings.IDLE_FPS, settings.IDLE_AFTER, self.clock
+        )
+
         # ============================================ #
         # the world
-        self.world = desktop.World()
+        self.world = desktop.World(source)
+        self.lifecycle = Lifecycle(self.clock, self.world)
 
         # the header toolbar
 
-        # the pet
-        self.pet = pet.PetObject(self, "assets/pet.json")
-        self.installEventFilter(self.pet)
+        # the pet + the label showing it
+        self.pet = pet.Pet(self, "assets/pet.json", clock=self.clock)
+        self.pet_label = PetObject(self, self.pet)
+        self.pets = [self.pet]
+        self.installEventFilter(self.pet_label)
+
+        # profiler overlay, replayed from recorded pictures onto a window
+        # of its own covering the screen
+        self.hud = None
+        self.hud_overlay = None
+        if settings.DEBUG:
+            self.hud = ProfilerHud(self.world)
+            self.hud_overlay = HudOverlay(self.hud, self.screen.geometry())
+            self.hud_overlay.show()
 
         # ============================================ #
         # event handlers
-        signal.SignalHandler.add_receiver("hide", self.receive_hide_event)
-        signal.SignalHandler.add_receiver("show", self.receive_show_event)
+        signal.BUS.add_receiver(signal.HIDE, self.receive_hide_event)
+        signal.BUS.add_receiver(signal.SHOW, self.receive_show_event)
+        signal.BUS.add_receiver(signal.RESET, self.receive_reset_event)
+        if settings.SUSPEND_WHEN_LOCKED:
+            signal.BUS.add_receiver(signal.LOCK, self.receive_lock_event)
+            signal.BUS.add_receiver(signal.UNLOCK, self.receive_unlock_event)
 
     # ============================================ #
     # event handlers
 
     def keyPressEvent(self, event):
         if event.key() == Qt.Key_Space:
-            signal.SignalHandler.add_signal("custom", {})
+            signal.BUS.post(signal.CUSTOM)
 
     def receive_hide_event(self, args):
         self.hide()
+        if self.hud_overlay != None:
+            self.hud_overlay.hide()
+        self.lifecycle.suspend("hidden")
 
     def receive_show_event(self, args):
+        self.lifecycle.resume("hidden")
         self.show()
+        self.render.invalidate(self)
+        self.render.invalidate(self.pet_label)
+        if self.hud_overlay != None:
+            self.hud_overlay.show()
+            self.render.invalidate(self.hud_overlay)
+
+    def receive_lock_event(self, args):
+        self.lifecycle.suspend("locked")
+
+    def receive_unlock_event(self, args):
+        self.lifecycle.resume("locked")
+
+    def receive_reset_event(self, args):
+        # the pet is put back on the screen
+        self.lifecycle.resume("offscreen")
+
+    def pet_resized(self, pet: "Pet"):
+        # the window is as big as the pet, the label fills it
+        self.render.set_geometry(
+            self, pet._rect.x, pet._rect.y, pet._rect.w, pet._rect.h
+        )
+        self.render.set_geometry(self.pet_label, 0, 0, pet._rect.w, pet._rect.h)
 
     def update_state(self):
+        # swap in the latest window snapshot + advance the physics clock
+        self.world.tick(settings.DELTA)
 
+        started = PROFILER.enabled and PROFILER.start()
         self.pet.update_state()
-
-        # move the window around on the screen
-        self.move(self.pet._rect.x, self.pet._rect.y)
-
-        # draw self
-        self.update()
+        if started:
+            PROFILER.stop("statemachine", started)
+        self.world.step_bodies()
+
+        # only repaint when the shown frame changed
+        self.render.repaint(self.pet_label, self.pet.frame_key())
+
+        # move the window around on the screen, between physics steps
+        position = self.world.render_position(self.pet)
+        self.render.move(self, int(position.x), int(position.y))
+
+        # the overlay only changes with the world (or the stats it shows)
+        # timed on its own, so it doesn't skew the phases it shows
+        if self.hud != None:
+            started = PROFILER.enabled and PROFILER.start()
+            self.hud.update(
+                {
+                    "frames": self.pet.animation_cache.cache.hit_rate(),
+                    "paths": self.world.navigation.hit_rate(),
+                },
+                [str(self.pacer), str(self.render)],
+            )
+            if started:
+                PROFILER.stop("hud", started)
+            self.render.repaint(
+                self.hud_overlay, (self.world.generation, self.hud.version)
+            )
+
+        # apply everything that changed this frame at once
+        started = PROFILER.enabled and PROFILER.start()
+        self.render.flush()
+        if started:
+            PROFILER.stop("render", started)
+
+    def is_resting(self) -> bool:
+        """Nothing changed this frame and the pet stays idle"""
+        return not self.world.last_diff and self.pet.is_resting()
+
+    def is_offscreen(self) -> bool:
+        return not self.world.bounds.colliderect(self.pet._rect)
 
     def paintEvent(self, event):
+        started = PROFILER.enabled and PROFILER.start()
         painter = QPainter(self)
 
         # clear surface
@@ -98,20 +257,15 @@ class TransparentWindow(QMainWindow):
         painter.fillRect(self.rect(), Qt.transparent)
         painter.setCompositionMode(QPainter.CompositionMode_SourceOver)
 
-        if settings.DEBUG:
-            # draw overlay
+        if self.hud != None:
+            # show the extent of the pet window
             painter.setRenderHint(QPainter.Antialiasing)
             painter.setBrush(QColor(0, 0, 0, 30))
             painter.setPen(Qt.NoPen)
             painter.drawRect(self.rect())
-
-            # draw rectangles around all active windows within the desktop
-            painter.setPen(QColor(255, 255, 255, 255))
-            painter.setBrush(QColor(0, 0, 0, 0))
-            for window in self.world.iter_active_windows():
-                area = window.area
-                # draw rect
-                painter.drawRect(area.x, area.y, area.w, area.h)
+        painter.end()
+        if started:
+            PROFILER.stop("paint", started)
 
 
 # supporting application
@@ -138,6 +292,15 @@ class StatusBarApp:
         # attach menu to status bar item
         self.status_item.setMenu_(self.menu)
 
+        # the pets are suspended while the screen is locked
+        center = NSDistributedNotificationCenter.defaultCenter()
+        center.addObserver_selector_name_object_(
+            self, "screenlocked:", "com.apple.screenIsLocked", None
+        )
+        center.addObserver_selector_name_object_(
+            self, "screenunlocked:", "com.apple.screenIsUnlocked", None
+        )
+
     def create_menu(self):
         # create menu items
         self.quit_item = NSMenuItem.alloc().initWithTitle_action_keyEquivalent_(
@@ -171,11 +334,17 @@ class StatusBarApp:
 
     def hideevent_(self, sender):
         # print("event received")
-        signal.SignalHandler.add_signal("hide", {})
+        signal.BUS.post(signal.HIDE)
 
     def showevent_(self, sender):
         # print("event received", sender)
-        signal.SignalHandler.add_signal("show", {})
+        signal.BUS.post(signal.SHOW)
 
     def resetevent_(self, sender):
-        signal.SignalHandler.add_signal("reset", {})
+        signal.BUS.post(signal.RESET)
+
+    def screenlocked_(self, notification):
+        signal.BUS.post(signal.LOCK)
+
+    def screenunlocked_(self, notification):
+        signal.BUS.post(signal.UNLOCK)
@@ -0,0 +1,248 @@
+import json
+import time
+
+
+# ---------------------------- #
+# constants
+
+TRACE_VERSION = 1
+
+# raw window-list keys stored in a trace, in record order
+TRACE_KEYS = (
+    "kCGWindowNumber",
+    "kCGWindowLayer",
+    "kCGWindowName",
+    "kCGWindowOwnerName",
+    "kCGWindowOwnerPID",
+    "kCGWindowIsOnscreen",
+)
+
+# ---------------------------- #
+# sources
+
+
+class WindowSource:
+    """
+    Where the world gets its raw window list from.
+
+    `get_windows` returns the front to back window list in the format of
+    `CGWindowListCopyWindowInfo` (dicts with `kCGWindow...` keys and a
+    `kCGWindowBounds` dict). Sources are callable so they can be handed to
+    anything that just wants the window list.
+    """
+
+    def get_windows(self) -> [dict]:
+        raise NotImplementedError
+
+    def get_screen_size(self) -> (int, int):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __call__(self) -> [dict]:
+        return self.get_windows()
+
+
+class QuartzWindowSource(WindowSource):
+    """Live window list of the macOS window server"""
+
+    def __init__(self, options: int = None):
+        import objc
+        import Quartz
+
+        self._objc = objc
+        self._quartz = Quartz
+        self.options = (
+            options if options != None else Quartz.kCGWindowListOptionOnScreenOnly
+        )
+
+    def get_windows(self) -> [dict]:
+        # may run on the poller thread
+        with self._objc.autorelease_pool():
+            return self._quartz.CGWindowListCopyWindowInfo(
+                self.options, self._quartz.kCGNullWindowID
+            )
+
+    def get_screen_size(self) -> (int, int):
+        screen = self._quartz.CGMainDisplayID()
+        return (
+            self._quartz.CGDisplayPixelsWide(screen),
+            self._quartz.CGDisplayPixelsHigh(screen),
+        )
+
+
+class StaticWindowSource(WindowSource):
+    """Fixed window list, for tests and synthetic desktops"""
+
+    def __init__(self, windows: [dict], screen_size: (int, int)):
+        self.windows = windows
+        self.screen_size = screen_size
+
+    def get_windows(self) -> [dict]:
+        return self.windows
+
+    def get_screen_size(self) -> (int, int):
+        return self.screen_size
+
+
+# ---------------------------- #
+# trace encoding
+
+
+def encode_window(window: dict) -> list:
+    bounds = window.get("kCGWindowBounds")
+    return [window.get(key) for key in TRACE_KEYS] + [
+        bounds["X"],
+        bounds["Y"],
+        bounds["Width"],
+        bounds["Height"],
+    ]
+
+
+def decode_window(record: list) -> dict:
+    window = {key: value for key, value in zip(TRACE_KEYS, record) if value != None}
+    x, y, w, h = record[len(TRACE_KEYS) :]
+    window["kCGWindowBounds"] = {"X": x, "Y": y, "Width": w, "Height": h}
+    return window
+
+
+# ---------------------------- #
+# record / replay
+
+
+class TraceRecorder(WindowSource):
+    """
+    Wraps another source and writes every window list it returns to a
+    trace file, replacing any trace already there.
+
+    The trace is JSON lines: a header with the screen size, then one
+    `{"t": seconds, "w": [...]}` record per poll. Polls that return the same
+    list as the one before only store `{"t": seconds}`.
+    """
+
+    def __init__(self, source: "WindowSource", filename: str):
+        self.source = source
+        self.filename = filename
+        self.start_time = time.monotonic()
+
+        self._last = None
+        self._file = open(filename, "w", buffering=1)
+        self._file.write(
+            json.dumps(
+                {
+                    "version": TRACE_VERSION,
+                    "screen": list(source.get_screen_size()),
+                    "keys": TRACE_KEYS,
+                }
+            )
+            + "\n"
+        )
+
+    def get_windows(self) -> [dict]:
+        windows = self.source.get_windows()
+        encoded = [encode_window(window) for window in windows]
+
+        record = {"t": round(time.monotonic() - self.start_time, 4)}
+        if encoded != self._last:
+            record["w"] = encoded
+            self._last = encoded
+        self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+        return windows
+
+    def get_screen_size(self) -> (int, int):
+        return self.source.get_screen_size()
+
+    def close(self):
+        self._file.close()
+        self.source.close()
+
+
+class ReplaySource(WindowSource):
+    """
+    Feeds a recorded trace back.
+
+    With a `speed` the trace plays against `clock` (seconds), `speed=2.0`
+    replays twice as fast. With `speed=None` every call returns the next
+    record, which makes replays fully deterministic. A finished trace keeps
+    returning its last window list.
+
+    Raises `ValueError` for a file that is not a trace of this version or
+    has a broken record.
+    """
+
+    def __init__(
+        self, filename: str, speed: float = 1.0, clock: "callable" = time.monotonic
+    ):
+        self.filename = filename
+        self.speed = speed
+        self.clock = clock
+
+        self.times = []
+        self.snapshots = []
+        with open(filename, "r") as file:
+            header = self._parse(file.readline(), 1)
+            if header.get("version") != TRACE_VERSION:
+                raise ValueError(
+                    f"{filename}: trace version {header.get('version')}, "
+                    f"expected {TRACE_VERSION}"
+                )
+            if tuple(header.get("keys", ())) != TRACE_KEYS:
+                raise ValueError(f"{filename}: unexpected trace keys")
+            self.screen_size = tuple(header["screen"])
+            windows = []
+            for number, line in enumerate(file, 2):
+                if not line.strip():
+                    continue
+                record = self._parse(line, number)
+                if "version" in record:
+                    raise ValueError(f"{filename}:{number}: a second trace header")
+                if "t" not in record:
+                    raise ValueError(f"{filename}:{number}: not a trace record")
+                if "w" in record:
+                    windows = [decode_window(x) for x in record["w"]]
+                self.times.append(record["t"])
+                self.snapshots.append(windows)
+
+        self.index = 0
+        self.start_time = None
+
+    def _parse(self, line: str, number: int) -> dict:
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            record = None
+        if not isinstance(record, dict):
+            raise ValueError(f"{self.filename}:{number}: not a trace record")
+        return record
+
+    # ---------------------------- #
+    # logic
+
+    def get_windows(self) -> [dict]:
+        if not self.snapshots:
+            return []
+
+        if self.speed == None:
+            windows = self.snapshots[self.index]
+            self.index = min(self.index + 1, len(self.snapshots) - 1)
+            return windows
+
+        if self.start_time == None:
+            self.start_time = self.clock()
+        elapsed = (self.clock() - self.start_time) * self.speed
+        while (
+            self.index + 1 < len(self.times) and self.times[self.index + 1] <= elapsed
+        ):
+            self.index += 1
+        return self.snapshots[self.index]
+
+    def get_screen_size(self) -> (int, int):
+        return self.screen_size
+
+    def finished(self) -> bool:
+        return self.index >= len(self.snapshots) - 1
+
+    def __len__(self):
+        return len(self.snapshots)
@@ -0,0 +1,133 @@
+import numpy as np
+from numpy.lib.recfunctions import repack_fields
+
+
+# ---------------------------- #
+# constants
+
+WINDOW_DTYPE = np.dtype(
+    [
+        ("wid", np.int64),
+        ("x", np.int32),
+        ("y", np.int32),
+        ("w", np.int32),
+        ("h", np.int32),
+        ("layer", np.int32),
+        ("order", np.int32),
+        ("pid", np.int64),
+        ("flags", np.uint8),
+    ]
+)
+
+# flag bits
+FLAG_ONSCREEN = 1 << 0
+FLAG_MANDATORY = 1 << 1
+FLAG_GLOBAL = 1 << 2
+
+# columns that make up the identity, geometry and stacking of a window
+KEY_COLUMNS = ["wid", "x", "y", "w", "h", "layer", "order"]
+
+# ---------------------------- #
+# table
+
+
+class WindowTable:
+    """
+    Columnar (structured array) storage of a window list.
+
+    `data` holds one row per window in front to back order, names and
+    owners are kept in parallel object arrays since they are only needed
+    for filtering and printing. Tables are read only once built.
+    """
+
+    def __init__(self, data: "np.ndarray", names: "np.ndarray", owners: "np.ndarray"):
+        self.data = data
+        self.names = names
+        self.owners = owners
+
+        self.data.flags.writeable = False
+
+    @classmethod
+    def from_raw(cls, window_list: [dict]) -> "WindowTable":
+        """Build a table from a `CGWindowListCopyWindowInfo` style list"""
+        rows = []
+        names = []
+        owners = []
+        for order, window in enumerate(window_list):
+            bounds = window.get("kCGWindowBounds")
+            pid = window.get("kCGWindowOwnerPID")
+            rows.append(
+                (
+                    window.get("kCGWindowNumber", order),
+                    bounds["X"],
+                    bounds["Y"],
+                    bounds["Width"],
+                    bounds["Height"],
+                    window.get("kCGWindowLayer", 0),
+                    order,
+                    pid if pid != None else -1,
+                    FLAG_ONSCREEN if window.get("kCGWindowIsOnscreen", False) else 0,
+                )
+            )
+            names.append(window.get("kCGWindowName", "Unknown"))
+            owners.append(window.get("kCGWindowOwnerName", "Unknown"))
+
+        return cls(
+            np.array(rows, dtype=WINDOW_DTYPE),
+            np.array(names, dtype=object),
+            np.array(owners, dtype=object),
+        )
+
+    @classmethod
+    def empty(cls) -> "WindowTable":
+        return cls(
+            np.zeros(0, dtype=WINDOW_DTYPE),
+            np.zeros(0, dtype=object),
+            np.zeros(0, dtype=object),
+        )
+
+    # ---------------------------- #
+    # logic
+
+    def select(self, mask: "np.ndarray") -> "WindowTable":
+        """New table with the rows where `mask` is set"""
+        return WindowTable(self.data[mask], self.names[mask], self.owners[mask])
+
+    def with_flags(self, mask: "np.ndarray", flag: int) -> "WindowTable":
+        """New table with `flag` set on the rows where `mask` is set"""
+        data = self.data.copy()
+        data["flags"][mask] |= flag
+        return WindowTable(data, self.names, self.owners)
+
+    def has_flag(self, flag: int) -> "np.ndarray":
+        return (self.data["flags"] & flag) != 0
+
+    def key(self) -> bytes:
+        """
+        Identity, geometry and stacking of every window, equal keys mean nothing
+        changed. Selecting fields keeps the full row size, so the selection
+        is packed before it is turned into bytes.
+        """
+        return repack_fields(self.data[KEY_COLUMNS]).tobytes()
+
+    # ---------------------------- #
+    # columns
+
+    @property
+    def left(self) -> "np.ndarray":
+        return self.data["x"]
+
+    @property
+    def top(self) -> "np.ndarray":
+        return self.data["y"]
+
+    @property
+    def right(self) -> "np.ndarray":
+        return self.data["x"] + self.data["w"]
+
+    @property
+    def bottom(self) -> "np.ndarray":
+        return self.data["y"] + self.data["h"]
+
+    def __len__(self):
+        return len(self.data)
@@ -0,0 +1,94 @@
+"""
+Run the animation cache against synthetic animations.
+
+run from the repository root:
+    python -m tests.animation_check
+"""
+
+from source.animation import Animation, AnimationCache, AnimationPlayer
+
+
+class SyntheticLoader:
+    """Every file decodes to `frames` frames of `size` bytes each"""
+
+    def __init__(self, frames: int, size: int):
+        self.frames = frames
+        self.size = size
+        self.loads = []
+
+    def __call__(self, filename: str) -> "Animation":
+        self.loads.append(filename)
+        return Animation(
+            filename,
+            [filename] * self.frames,
+            [100] * self.frames,
+            self.frames * self.size,
+        )
+
+
+def synthetic_transform(frame: str, flipped: bool, scale: float) -> (str, int):
+    return f"{frame}:{flipped}:{scale}", 512
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+if __name__ == "__main__":
+    # 4 frames of 1 KB, room for 3 animations
+    loader = SyntheticLoader(frames=4, size=1024)
+    cache = AnimationCache(3 * 4 * 1024, loader, synthetic_transform)
+
+    # nothing is decoded until it is played
+    clock = ManualClock()
+    players = {name: AnimationPlayer(cache, name, clock) for name in "abcde"}
+    assert loader.loads == []
+
+    for name in "abcab":
+        players[name].start()
+    assert loader.loads == ["a", "b", "c"], loader.loads
+    assert cache.hits == 2 and cache.misses == 3
+
+    # "c" is the least recently used
+    players["d"].start()
+    assert "c" not in cache and "a" in cache and "b" in cache
+    assert cache.resident <= cache.budget
+
+    # its player still holds "c", it is only freed once the player lets go
+    assert cache.retained() == 4 * 1024
+    players["c"].stop()
+    assert cache.retained() == 0
+
+    # prefetched files are decoded by warm, one per call
+    cache.prefetch(["e", "a"])
+    assert cache.warm() == 1 and "e" in cache
+    assert cache.warm() == 0
+    players["e"].start()
+    assert cache.hits == 3
+
+    # frames follow the clock and loop
+    clock.now = 0.25
+    assert players["e"].currentFrameNumber() == 2
+    clock.now = 0.45
+    assert players["e"].currentFrameNumber() == 0
+
+    # variants are made once and then looked up
+    assert players["e"].currentImage() == "e"
+    assert players["e"].currentImage(flipped=True) == "e:True:1.0"
+    assert players["e"].currentImage(flipped=True) == "e:True:1.0"
+    assert players["e"].currentImage(scale=0.5) == "e:False:0.5"
+    assert cache.variants == 2 and cache.resident <= cache.budget
+    assert "e" in cache and players["e"]._animation.nbytes == 5 * 1024
+
+    # dropped animations still played are taken back, not decoded again
+    assert "b" not in cache and cache.retained() >= 4 * 1024
+    players["b"].start()
+    assert "b" in cache and cache.revived == 1 and loader.loads.count("b") == 1
+
+    print(cache)
+    print(cache.stats())
+    print("ok")
@@ -0,0 +1,55 @@
+"""
+Round trip synthetic frames through the sprite atlas cache.
+
+run from the repository root:
+    python -m tests.atlas_check
+"""
+
+import os
+import tempfile
+
+import numpy as np
+
+from source.atlas import atlas_frames, file_hash, read_atlas, write_atlas
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    frames = [
+        rng.integers(0, 256, size=(h, w, 4), dtype=np.uint8)
+        for h, w in [(100, 100), (100, 100), (80, 120), (1, 1)]
+    ]
+    delays = [100, 100, 40, 0]
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # a source file, the atlas is keyed by its contents
+        source = os.path.join(cache_dir, "pet.gif")
+        with open(source, "wb") as file:
+            file.write(b"GIF89a" + bytes(range(256)))
+        key = file_hash(source)
+        assert read_atlas(cache_dir, key) == None
+
+        write_atlas(cache_dir, key, frames, delays, source)
+        atlas, metadata = read_atlas(cache_dir, key)
+        assert isinstance(atlas, np.memmap)
+        assert [d for *_, d in metadata["frames"]] == delays
+
+        # frames are views into the mapping, with the original pixels
+        for original, mapped in zip(frames, atlas_frames(atlas, metadata)):
+            assert np.shares_memory(mapped, atlas)
+            assert np.array_equal(original, mapped)
+
+        # any change to the source gives a new key
+        with open(source, "ab") as file:
+            file.write(b"\0")
+        assert file_hash(source) != key
+        assert read_atlas(cache_dir, file_hash(source)) == None
+
+        # a truncated atlas is ignored, not mapped
+        pixels = os.path.join(cache_dir, key + ".rgba")
+        with open(pixels, "r+b") as file:
+            file.truncate(16)
+        assert read_atlas(cache_dir, key) == None
+
+        print(f"atlas: {metadata['width']}x{metadata['height']} | {len(frames)} frames")
+    print("ok")
@@ -0,0 +1,119 @@
+"""
+Check the batched body physics against `step_body`, then measure its
+throughput in pet-steps per second for growing numbers of pets.
+
+run from the repository root:
+    python -m tests.bench_bodies
+"""
+
+import time
+import random
+
+import numpy as np
+
+from pygame import Rect
+from pygame.math import Vector2
+
+from source import settings
+from source.bodies import BodyTable
+from source.physics import step_body
+from source.spatial import EdgeIndex
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+PET_COUNTS = [1, 10, 100, 1000, 10000]
+STEPS = 200
+
+# ---------------------------- #
+# setup
+
+
+class ScalarPet:
+    """The attributes `step_body` works on"""
+
+    def __init__(self, x: float, y: float, w: int, h: int):
+        self._pos = Vector2(x, y)
+        self._prev_pos = Vector2(x, y)
+        self._vel = Vector2()
+        self._rect = Rect(round(x), round(y), w, h)
+        self._drive = 0.0
+
+
+def random_edges(rng: "random.Random", count: int) -> "EdgeIndex":
+    """Top and bottom edges of `count` random windows"""
+    x0, x1, y = [], [], []
+    for _ in range(count):
+        w = rng.randint(200, 900)
+        h = rng.randint(150, 700)
+        x = rng.randint(0, SCREEN[0] - w)
+        top = rng.randint(0, SCREEN[1] - h)
+        x0 += [x, x]
+        x1 += [x + w, x + w]
+        y += [top, top + h]
+    edges = EdgeIndex()
+    edges.rebuild(np.array(x0), np.array(x1), np.array(y))
+    return edges
+
+
+def check(rng: "random.Random", pets: int, steps: int):
+    """Run the same pets through `step_body` and `BodyTable.step`"""
+    edges = random_edges(rng, 20)
+    dt = 1.0 / settings.PHYSICS_RATE
+
+    scalar = []
+    table = BodyTable()
+    for _ in range(pets):
+        x = rng.uniform(0, SCREEN[0] - 100)
+        y = rng.uniform(0, SCREEN[1] - 100)
+        scalar.append(ScalarPet(x, y, 100, 100))
+        table.add(x, y, 100, 100)
+
+    for _ in range(steps):
+        # random walking + the occasional jump
+        for i, pet in enumerate(scalar):
+            if rng.random() < 0.05:
+                pet._drive = rng.choice([-30.0, 0.0, 30.0])
+                table.drive[i] = pet._drive
+            if rng.random() < 0.01:
+                pet._vel.y = table.vy[i] = -rng.uniform(200, 1500)
+
+        hits = [step_body(p, edges, dt, SCREEN[1])["bottom"] for p in scalar]
+        table.moving[: len(scalar)] = True
+        table.step(edges, dt, SCREEN[1])
+
+        for i, pet in enumerate(scalar):
+            assert abs(pet._pos.x - table.x[i]) < 1e-6, (i, pet._pos, table.x[i])
+            assert abs(pet._pos.y - table.y[i]) < 1e-6, (i, pet._pos, table.y[i])
+            assert hits[i] == table.contact[i, 2], (i, hits[i])
+
+
+def bench(rng: "random.Random", count: int) -> float:
+    """Pet-steps per second for `count` pets"""
+    edges = random_edges(rng, 50)
+    table = BodyTable()
+    for _ in range(count):
+        index = table.add(
+            rng.uniform(0, SCREEN[0] - 100), rng.uniform(0, SCREEN[1] - 100), 100, 100
+        )
+        table.drive[index] = rng.choice([-30.0, 30.0])
+
+    dt = 1.0 / settings.PHYSICS_RATE
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        table.moving[: table.count] = True
+        table.step(edges, dt, SCREEN[1])
+    return count * STEPS / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    for _ in range(20):
+        check(rng, pets=50, steps=100)
+    print("batched steps match step_body")
+
+    for count in PET_COUNTS:
+        rate = bench(rng, count)
+        print(f"{count:6} pets | {rate / 1e6:8.3f} M pet-steps/s")
@@ -0,0 +1,170 @@
+"""
+Compare the old per-tick collision path in `World.move_pet` with the
+`EdgeIndex` sweep on synthetic desktops, then find the number of edges
+where the index's vectorized sweep starts to beat its linear scan. Fails
+if `spatial.LINEAR_EDGES` is more than a factor of two away from it.
+
+run from the repository root:
+    python -m tests.bench_collision
+"""
+
+import random
+import time
+
+from pygame import Rect
+
+from source import spatial
+from source.spatial import EdgeIndex
+
+
+SCREEN_WIDTH = 2560
+SCREEN_HEIGHT = 1440
+TICKS = 2000
+CROSSOVER_COUNTS = (5, 10, 25, 50, 100, 150, 200, 250, 300, 400, 500)
+# how far the linear scan threshold may be from the measured crossover
+MAX_CROSSOVER_FACTOR = 2
+
+
+class FakeWindow:
+    def __init__(self, area: "Rect"):
+        self.area = area
+        self.active = True
+
+
+def generate_desktop(count: int, seed: int = 0) -> ["FakeWindow"]:
+    rng = random.Random(seed)
+    windows = []
+    for _ in range(count):
+        w = rng.randint(300, 1200)
+        h = rng.randint(100, 900)
+        x = rng.randint(-100, SCREEN_WIDTH - 200)
+        y = rng.randint(0, SCREEN_HEIGHT - 100)
+        windows.append(FakeWindow(Rect(x, y, w, h)))
+    return windows
+
+
+def generate_path(seed: int = 1) -> ["Rect"]:
+    # a pet falling and walking across the screen
+    rng = random.Random(seed)
+    rects = []
+    for i in range(TICKS):
+        x = (i * 7) % (SCREEN_WIDTH - 100)
+        y = rng.randint(0, SCREEN_HEIGHT - 100)
+        rects.append(Rect(x, y, 100, 100))
+    return rects
+
+
+# ---------------------------- #
+# collision paths
+
+
+def old_path(windows: ["FakeWindow"], pet_rect: "Rect") -> int:
+    hits = 0
+    blocks = [window.area for window in windows if window.active]
+    for rect in blocks:
+        top = Rect(rect.x, rect.y, rect.w, 1)
+        bottom = Rect(rect.x, rect.y + rect.h, rect.w, 1)
+        if pet_rect.colliderect(top):
+            hits += 1
+        if pet_rect.colliderect(bottom):
+            hits += 1
+    return hits
+
+
+def new_path(index: "EdgeIndex", pet_rect: "Rect") -> int:
+    # the rows the pet covers, `sweep` includes its bottom row
+    return len(
+        index.sweep(pet_rect.left, pet_rect.right, pet_rect.top, pet_rect.bottom - 1)
+    )
+
+
+def build_index(windows: ["FakeWindow"]) -> "EdgeIndex":
+    x0, x1, y = [], [], []
+    for window in windows:
+        area = window.area
+        x0 += [area.left, area.left]
+        x1 += [area.right, area.right]
+        y += [area.top, area.bottom]
+    index = EdgeIndex()
+    index.rebuild(x0, x1, y)
+    return index
+
+
+# ---------------------------- #
+# benchmark
+
+
+def run(count: int):
+    windows = generate_desktop(count)
+    path = generate_path()
+
+    start = time.perf_counter()
+    index = build_index(windows)
+    rebuild_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    old_hits = sum(old_path(windows, rect) for rect in path)
+    old_time = (time.perf_counter() - start) / TICKS
+
+    start = time.perf_counter()
+    new_hits = sum(new_path(index, rect) for rect in path)
+    new_time = (time.perf_counter() - start) / TICKS
+
+    mode = "linear" if len(index) < spatial.LINEAR_EDGES else "indexed"
+    print(
+        f"{count:5} windows | old: {old_time * 1e6:9.2f} us/tick | "
+        f"new ({mode:>7}): {new_time * 1e6:9.2f} us/tick | "
+        f"speedup: {old_time / new_time:6.1f}x | "
+        f"rebuild: {rebuild_time * 1e6:9.2f} us | hits: {old_hits}/{new_hits}"
+    )
+
+
+def query_time(index: "EdgeIndex", path: ["Rect"]) -> float:
+    """Best seconds per query over a few runs"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for rect in path:
+            new_path(index, rect)
+        best = min(best, (time.perf_counter() - start) / len(path))
+    return best
+
+
+def crossover() -> int:
+    """Edges at which the vectorized query gets faster than the linear scan"""
+    path = generate_path()
+    threshold = spatial.LINEAR_EDGES
+    found = None
+    try:
+        for count in CROSSOVER_COUNTS:
+            windows = generate_desktop(count)
+            spatial.LINEAR_EDGES = float("inf")
+            linear = query_time(build_index(windows), path)
+            spatial.LINEAR_EDGES = 0
+            indexed = query_time(build_index(windows), path)
+            print(
+                f"{count * 2:5} edges | linear: {linear * 1e6:7.2f} us | "
+                f"indexed: {indexed * 1e6:7.2f} us"
+            )
+            if found == None and indexed < linear:
+                found = count * 2
+    finally:
+        spatial.LINEAR_EDGES = threshold
+    return found
+
+
+if __name__ == "__main__":
+    for count in (10, 100, 1000):
+        run(count)
+
+    found = crossover()
+    print(
+        f"the index wins from {found} edges on, "
+        f"it scans linearly below {spatial.LINEAR_EDGES}"
+    )
+    assert (
+        found != None
+        and found / MAX_CROSSOVER_FACTOR
+        <= spatial.LINEAR_EDGES
+        <= found * MAX_CROSSOVER_FACTOR
+    ), "LINEAR_EDGES is far from the measured crossover"
@@ -0,0 +1,186 @@
+"""
+Load test for the control socket: pipeline batches of commands and
+measure throughput and round trip latency. First checks that oversized
+request lines and negative pet indices are answered with errors.
+
+Without `--socket` it serves a small in-process host (real state machines
+and bodies, no Qt) and runs the frame loop itself; with `--socket` it
+drives a running app started with `--control`.
+
+run from the repository root:
+    python -m tests.bench_control
+    python -m tests.bench_control --socket /tmp/desktoppet.sock
+"""
+
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+import numpy as np
+
+from source import settings
+from source.bodies import BodyTable, BodyVector, BodyContacts
+from source.control import ControlServer
+from source.statemachine import State, StateMachineComponent, load_graph
+
+
+# ---------------------------- #
+# constants
+
+SOCKET = "/tmp/desktoppet-load.sock"
+COMMANDS = 10000
+BATCH = 50
+IN_FLIGHT = 4  # batches sent ahead of the responses
+PETS = 20
+GUARDS = ("airborne", "grounded", "jump_done")
+
+# ---------------------------- #
+# in-process host
+
+
+class ScriptedPet:
+    """What the control commands touch on a pet"""
+
+    def __init__(self, bodies: "BodyTable"):
+        self.body = bodies.add(100.0, 100.0, 100, 100)
+        self._pos = BodyVector(bodies, self.body, ("x", "y"))
+        self._vel = BodyVector(bodies, self.body, ("vx", "vy"))
+        self._hit = BodyContacts(bodies, self.body)
+        self.statemachine = StateMachineComponent(
+            load_graph(settings.BEHAVIORS_FILE, "pet", {n: bool for n in GUARDS}), self
+        )
+        for name in self.statemachine.graph.names:
+            self.statemachine.add_state(State(name))
+        self.statemachine.start()
+
+    def receive_reset_event(self, args):
+        self._pos.xy = (0.0, 0.0)
+
+
+class ScriptedHost:
+    def __init__(self, count: int):
+        self.bodies = BodyTable()
+        self.pets = []
+        self.spawn(count)
+
+    def spawn(self, count: int) -> [int]:
+        first = len(self.pets)
+        self.pets += [ScriptedPet(self.bodies) for _ in range(count)]
+        return list(range(first, len(self.pets)))
+
+
+# ---------------------------- #
+# client
+
+
+def command(i: int) -> dict:
+    kind = i % 4
+    if kind == 0:
+        return {"id": i, "cmd": "query", "pets": [i % PETS]}
+    if kind == 1:
+        return {"id": i, "cmd": "trigger", "event": "custom", "pets": [i % PETS]}
+    if kind == 2:
+        return {"id": i, "cmd": "reset", "pets": [i % PETS]}
+    return {"id": i, "cmd": "query"}
+
+
+async def load(path: str, commands: int, batch: int) -> (float, "np.ndarray", int):
+    """Seconds for all commands, round trip latencies, error responses"""
+    reader, writer = await asyncio.open_unix_connection(path, limit=1 << 24)
+    sent = {}
+    latencies = []
+    errors = 0
+    window = asyncio.Semaphore(IN_FLIGHT)
+
+    async def send():
+        for start in range(0, commands, batch):
+            await window.acquire()
+            lines = [command(i) for i in range(start, min(start + batch, commands))]
+            now = time.perf_counter()
+            for c in lines:
+                sent[c["id"]] = now
+            writer.write((json.dumps(lines) + "\n").encode())
+            await writer.drain()
+
+    started = time.perf_counter()
+    sender = asyncio.ensure_future(send())
+    for i in range(commands):
+        response = json.loads(await reader.readline())
+        assert response["id"] == i, "responses out of order"
+        latencies.append(time.perf_counter() - sent[response["id"]])
+        errors += "error" in response
+        if (i + 1) % batch == 0:
+            window.release()
+    await sender
+    elapsed = time.perf_counter() - started
+    writer.close()
+    return elapsed, np.array(latencies), errors
+
+
+async def send_lines(path: str, lines: [bytes]) -> [dict]:
+    """Responses to raw request lines"""
+    reader, writer = await asyncio.open_unix_connection(path)
+    writer.write(b"".join(lines))
+    await writer.drain()
+    responses = [json.loads(await reader.readline()) for _ in lines]
+    writer.close()
+    return responses
+
+
+def serve(server: "ControlServer", client: "coroutine"):
+    """Run `client` on its own thread, the frame loop on this one"""
+    result = []
+    thread = threading.Thread(target=lambda: result.append(asyncio.run(client)))
+    thread.start()
+    while thread.is_alive():
+        server.process(settings.CONTROL_BUDGET_MS / 1000)
+        time.sleep(1.0 / settings.FPS)
+    return result[0]
+
+
+def check_errors():
+    server = ControlServer(ScriptedHost(2), SOCKET, limit=1024)
+    server.start()
+    lines = [
+        json.dumps({"id": 0, "cmd": "query", "pad": "x" * 4096}).encode() + b"\n",
+        json.dumps({"id": 1, "cmd": "query", "pets": [1]}).encode() + b"\n",
+        json.dumps({"id": 2, "cmd": "reset", "pets": [-1]}).encode() + b"\n",
+    ]
+    try:
+        too_long, query, negative = serve(server, send_lines(SOCKET, lines))
+    finally:
+        server.stop()
+    assert "error" in too_long
+    assert query["id"] == 1 and query["pets"][0]["pet"] == 1
+    assert negative["id"] == 2 and "error" in negative
+
+
+def report(elapsed: float, latencies: "np.ndarray", errors: int):
+    p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+    print(
+        f"{len(latencies)} commands, {IN_FLIGHT} batches of {BATCH} in flight | "
+        f"{len(latencies) / elapsed:9.0f} commands/s | "
+        f"latency p50 {p50:7.2f} ms p99 {p99:7.2f} ms | {errors} errors"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", help="control socket of a running app")
+    parser.add_argument("--commands", type=int, default=COMMANDS)
+    args = parser.parse_args()
+
+    if args.socket:
+        report(*asyncio.run(load(args.socket, args.commands, BATCH)))
+    else:
+        check_errors()
+        print("oversized lines and negative indices get error responses")
+
+        server = ControlServer(ScriptedHost(PETS), SOCKET)
+        server.start()
+        elapsed, latencies, errors = serve(server, load(SOCKET, args.commands, BATCH))
+        server.stop()
+        assert errors == 0 and server.processed == args.commands
+        report(elapsed, latencies, errors)
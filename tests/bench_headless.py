@@ -0,0 +1,135 @@
+"""
+Benchmark the headless simulation: ticks per second, cost per phase and
+allocations for an idle pet, a pet crossing 200 windows and 100 pets.
+
+Results can be saved and later compared, failing on a regression:
+    python -m tests.bench_headless --save .cache/bench.json
+    python -m tests.bench_headless --compare .cache/bench.json
+
+run from the repository root:
+    python -m tests.bench_headless
+"""
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from source.headless import HeadlessHost
+from source.profiler import PROFILER
+from source.windowsource import StaticWindowSource
+from tests.desktops import crossing_windows, few_windows
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+WARMUP = 5.0  # simulated seconds before measuring
+FRAMES = 500
+SEED = 1  # every run takes the same path
+PHASES = ("poll", "signals", "timers", "world", "occlusion", "statemachine", "physics")
+
+# slower than this fraction of the saved ticks per second is a regression
+TOLERANCE = 0.8
+
+# ---------------------------- #
+# scenarios
+
+
+SCENARIOS = {
+    "idle pet": lambda: HeadlessHost(StaticWindowSource([], SCREEN), 1, seed=SEED),
+    "200 windows": lambda: HeadlessHost(
+        StaticWindowSource(crossing_windows(200), SCREEN), 1, seed=SEED
+    ),
+    "100 pets": lambda: HeadlessHost(
+        StaticWindowSource(few_windows(), SCREEN), 100, seed=SEED
+    ),
+}
+
+# ---------------------------- #
+# measuring
+
+
+def measure(make: "function") -> dict:
+    """Ticks per second, mean ms per phase and allocations of a scenario"""
+    host = make()
+    host.run(seconds=WARMUP)
+
+    # plain speed
+    PROFILER.enabled = False
+    start = time.perf_counter()
+    host.run(frames=FRAMES)
+    ticks = FRAMES / (time.perf_counter() - start)
+
+    # where the time goes
+    PROFILER.reset()
+    PROFILER.enabled = True
+    host.run(frames=FRAMES)
+    PROFILER.enabled = False
+    phases = {
+        phase: float(PROFILER.phases[phase].values().mean()) * 1000
+        for phase in PHASES
+        if phase in PROFILER.phases
+    }
+
+    # what it allocates
+    blocks = sys.getallocatedblocks()
+    tracemalloc.start()
+    host.run(frames=FRAMES)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "ticks": ticks,
+        "phases": phases,
+        "peak_kb": peak / 1024,
+        "retained_kb": retained / 1024,
+        "blocks_per_tick": (sys.getallocatedblocks() - blocks) / FRAMES,
+    }
+
+
+def report(name: str, result: dict):
+    print(
+        f"{name:>12} | {result['ticks']:8.0f} ticks/s | "
+        f"peak {result['peak_kb']:7.1f} KB | retained {result['retained_kb']:7.1f} KB | "
+        f"{result['blocks_per_tick']:6.1f} blocks/tick"
+    )
+    print(
+        " " * 12
+        + " | "
+        + " ".join(f"{p} {ms:.3f}" for p, ms in result["phases"].items())
+        + " ms"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--save", help="write the results to a json file")
+    parser.add_argument("--compare", help="fail if slower than a saved run")
+    args = parser.parse_args()
+
+    results = {}
+    for name, make in SCENARIOS.items():
+        results[name] = measure(make)
+        report(name, results[name])
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+
+    if args.compare:
+        with open(args.compare, "r") as file:
+            baseline = json.load(file)
+        slower = [
+            name
+            for name, result in results.items()
+            if name in baseline
+            and result["ticks"] < baseline[name]["ticks"] * TOLERANCE
+        ]
+        for name in slower:
+            print(
+                f"regression: {name} {results[name]['ticks']:.0f} ticks/s, "
+                f"was {baseline[name]['ticks']:.0f}"
+            )
+        sys.exit(1 if slower else 0)
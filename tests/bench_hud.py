@@ -0,0 +1,112 @@
+"""
+Benchmark the debug overlay: drawing the window outlines on every paint
+vs. replaying the recorded HUD pictures, and what re-recording costs.
+
+The HUD is painted the way the app does it: the `HudOverlay` covering the
+screen renders into a screen sized image. The check afterwards makes sure
+the whole panel and the window outlines land where they belong.
+
+run from the repository root:
+    python -m tests.bench_hud
+"""
+
+import os
+import time
+
+
+# no windows are shown, painting goes to an image
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QColor, QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from source import desktop
+from source.hud import ProfilerHud, HudOverlay, MARGIN, PANEL_WIDTH
+from source.profiler import PROFILER
+from source.windowsource import StaticWindowSource
+from tests.desktops import crossing_windows
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+WINDOWS = 200
+PAINTS = 500
+
+# ---------------------------- #
+# setup
+
+
+def paint_direct(target: "QImage", world: "World"):
+    """The old overlay: walk the active windows on every paint"""
+    painter = QPainter(target)
+    painter.setPen(QColor(255, 255, 255, 255))
+    painter.setBrush(QColor(0, 0, 0, 0))
+    for window in world.iter_active_windows():
+        area = window.area
+        painter.drawRect(area.x, area.y, area.w, area.h)
+    painter.end()
+
+
+def paint_hud(target: "QImage", overlay: "HudOverlay"):
+    """The overlay's own paint event, drawn into `target`"""
+    overlay.render(target)
+
+
+def check_placement(target: "QImage", hud: "ProfilerHud"):
+    """The panel is not clipped and the outlines sit on their windows"""
+    target.fill(Qt.transparent)
+    paint_hud(target, HudOverlay(hud, QRect(0, 0, *SCREEN)))
+
+    # the right end of the panel, well past the size of a pet window
+    assert target.pixelColor(PANEL_WIDTH - 2, MARGIN).alpha() > 150
+
+    # the top edge of a window outline clear of the panel, nothing below it
+    area = next(
+        w.area for w in hud.world.iter_active_windows() if w.area.x > PANEL_WIDTH
+    )
+    assert target.pixelColor(area.x + 5, area.y).alpha() > 100, area
+    assert target.pixelColor(area.x + 5, area.y + 5).alpha() == 0, area
+
+    # on a screen starting just left of that window the outline moves along
+    target.fill(Qt.transparent)
+    paint_hud(target, HudOverlay(hud, QRect(area.x - 10, 0, *SCREEN)))
+    assert target.pixelColor(15, area.y).alpha() > 100, area
+
+
+def timed(function: "function", *args) -> float:
+    start = time.perf_counter()
+    for _ in range(PAINTS):
+        function(*args)
+    return (time.perf_counter() - start) / PAINTS
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+    PROFILER.enabled = True
+
+    world = desktop.World(
+        StaticWindowSource(crossing_windows(WINDOWS), SCREEN), threaded=False
+    )
+    for _ in range(60):
+        PROFILER.frame()
+    hud = ProfilerHud(world, rate=1e9)
+    overlay = HudOverlay(hud, QRect(0, 0, *SCREEN))
+    target = QImage(SCREEN[0], SCREEN[1], QImage.Format_ARGB32_Premultiplied)
+    target.fill(Qt.transparent)
+
+    record = timed(hud.update, {"frames": 0.9, "paths": 0.5})
+    hud.rate = 1e-9
+    update = timed(hud.update, {"frames": 0.9, "paths": 0.5})
+    direct = timed(paint_direct, target, world)
+    replay = timed(paint_hud, target, overlay)
+    check_placement(target, hud)
+
+    print(f"{WINDOWS} windows, {int(world.active.sum())} active")
+    print(f"re-record HUD:     {record * 1e6:9.1f} us")
+    print(f"HUD up to date:    {update * 1e6:9.1f} us")
+    print(f"paint outlines:    {direct * 1e6:9.1f} us")
+    print(f"replay pictures:   {replay * 1e6:9.1f} us")
+    print("panel and outlines are painted in full, at their screen position")
@@ -0,0 +1,136 @@
+"""
+Check the sweep-and-prune broadphase and the nearby queries against a
+brute force O(P²) test, check that stacked and side by side pets are
+pushed apart, then time `resolve` for growing numbers of pets.
+
+run from the repository root:
+    python -m tests.bench_interaction
+"""
+
+import time
+import random
+
+import numpy as np
+
+from source.bodies import BodyTable
+from source.interaction import BOTTOM, PetInteractions
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+PET_COUNTS = [10, 100, 1000, 10000]
+STEPS = 100
+
+# ---------------------------- #
+# setup
+
+
+def random_table(rng: "random.Random", count: int) -> "BodyTable":
+    table = BodyTable()
+    for _ in range(count):
+        table.add(
+            rng.uniform(0, SCREEN[0] - 100),
+            rng.uniform(0, SCREEN[1] - 100),
+            rng.randint(40, 140),
+            rng.randint(40, 140),
+        )
+    return table
+
+
+def brute_pairs(table: "BodyTable") -> {(int, int)}:
+    pairs = set()
+    x, w = table.x, table.w
+    for a in range(table.count):
+        for b in range(a + 1, table.count):
+            if not (table.alive[a] and table.alive[b]):
+                continue
+            if x[a] < x[b] + w[b] and x[b] < x[a] + w[a]:
+                pairs.add((a, b))
+    return pairs
+
+
+def brute_nearby(table: "BodyTable", row: int, radius: float) -> {int}:
+    x, y, w, h = table.x, table.y, table.w, table.h
+    found = set()
+    for other in range(table.count):
+        if other == row or not table.alive[other]:
+            continue
+        gap_x = max(x[other] - (x[row] + w[row]), x[row] - (x[other] + w[other]), 0)
+        gap_y = max(y[other] - (y[row] + h[row]), y[row] - (y[other] + h[other]), 0)
+        if (gap_x**2 + gap_y**2) ** 0.5 <= radius:
+            found.add(other)
+    return found
+
+
+def check(rng: "random.Random"):
+    table = random_table(rng, 200)
+    for row in rng.sample(range(200), 20):
+        table.remove(row)
+    interactions = PetInteractions()
+
+    # a few frames of jitter, the order is kept between them
+    for _ in range(10):
+        table.x[: table.count] += np.array(
+            [rng.uniform(-30, 30) for _ in range(table.count)]
+        )
+        interactions._sort(table)
+        a, b = interactions.broadphase.pairs()
+        found = {(min(p, q), max(p, q)) for p, q in zip(a.tolist(), b.tolist())}
+        assert found == brute_pairs(table)
+
+        for row in rng.sample(range(table.count), 10):
+            if table.alive[row]:
+                radius = rng.uniform(0, 200)
+                near = set(interactions.nearby(table, row, radius).tolist())
+                assert near == brute_nearby(table, row, radius), row
+
+
+def check_resolve():
+    table = BodyTable()
+    interactions = PetInteractions()
+
+    # coming down on another pet -- stands on it
+    lower = table.add(100, 500, 100, 100)
+    upper = table.add(120, 410, 100, 100)
+    table.vy[upper] = 200.0
+    table.moving[upper] = True
+    interactions.resolve(table)
+    assert table.y[upper] + table.h[upper] == table.y[lower]
+    assert table.contact[upper, BOTTOM] and table.vy[upper] == 0.0
+    assert table.x[lower] == 100 and table.y[lower] == 500
+
+    # side by side, both moving -- pushed apart evenly
+    table = BodyTable()
+    left = table.add(100, 500, 100, 100)
+    right = table.add(180, 500, 100, 100)
+    table.moving[:2] = True
+    interactions.resolve(table)
+    assert table.x[left] == 90 and table.x[right] == 190
+
+
+def bench(rng: "random.Random", count: int) -> (float, float):
+    """Seconds per `resolve` and candidate pairs per step for `count` pets"""
+    table = random_table(rng, count)
+    interactions = PetInteractions()
+    start = time.perf_counter()
+    for _ in range(STEPS):
+        table.moving[: table.count] = True
+        interactions.resolve(table)
+    return (time.perf_counter() - start) / STEPS, interactions.candidates / STEPS
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    for _ in range(10):
+        check(rng)
+    check_resolve()
+    print("broadphase and nearby queries match brute force, contacts resolve")
+
+    for count in PET_COUNTS:
+        seconds, candidates = bench(rng, count)
+        print(
+            f"{count:6} pets | resolve: {seconds * 1000:8.3f} ms | "
+            f"candidates: {candidates:10.0f} of {count * (count - 1) // 2} pairs"
+        )
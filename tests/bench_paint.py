@@ -0,0 +1,69 @@
+"""
+Benchmark the pet paint path: transforming the frame on every paint vs.
+looking up the cached mirrored frame.
+
+run from the repository root:
+    python -m tests.bench_paint
+"""
+
+import time
+
+from PyQt5.QtCore import Qt
+from PyQt5.QtGui import QImage, QPainter, QTransform
+from PyQt5.QtWidgets import QApplication
+
+from source.animation import AnimationCache, AnimationPlayer
+
+
+# ---------------------------- #
+# constants
+
+ANIMATION = "assets/pet-run.gif"
+PAINTS = 2000
+
+# ---------------------------- #
+# paint paths
+
+
+def paint_transformed(target: "QImage", player: "AnimationPlayer", flipped: bool):
+    """The old paint path: transform the frame on every paint"""
+    painter = QPainter(target)
+    frame = player.currentImage()
+    if flipped:
+        frame = frame.transformed(QTransform().scale(-1, 1))
+    painter.drawImage(0, 0, frame)
+    painter.end()
+
+
+def paint_cached(target: "QImage", player: "AnimationPlayer", flipped: bool):
+    """The new paint path: lookup + blit"""
+    painter = QPainter(target)
+    painter.drawImage(0, 0, player.currentImage(flipped))
+    painter.end()
+
+
+def run(paint: "function", player: "AnimationPlayer", flipped: bool) -> float:
+    target = QImage(player.currentImage().size(), QImage.Format_ARGB32_Premultiplied)
+    target.fill(Qt.transparent)
+    start = time.perf_counter()
+    for _ in range(PAINTS):
+        paint(target, player, flipped)
+    return (time.perf_counter() - start) / PAINTS
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+
+    cache = AnimationCache(64 << 20)
+    player = AnimationPlayer(cache, ANIMATION)
+    player.start()
+    print(f"{ANIMATION}: {player.frameCount()} frames")
+
+    for flipped in (False, True):
+        old = run(paint_transformed, player, flipped)
+        new = run(paint_cached, player, flipped)
+        print(
+            f"flipped: {flipped!s:5} | transform: {old * 1e6:8.2f} us/paint | "
+            f"cached: {new * 1e6:8.2f} us/paint | speedup: {old / new:5.1f}x"
+        )
+    print(cache)
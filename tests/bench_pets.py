@@ -0,0 +1,72 @@
+"""
+Benchmark the multi-pet overlay: frame time (update + one batched paint of
+the whole screen) for a growing number of pets.
+
+run from the repository root:
+    python -m tests.bench_pets
+"""
+
+import os
+import time
+
+
+# no windows are shown, painting goes to an image
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import Qt, QRect
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QApplication
+
+from pygame import Rect
+
+from source.overlay import PetSwarm, paint_sprites
+from source.windowsource import StaticWindowSource
+from tests.desktops import few_windows
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+PET_COUNTS = [1, 10, 100, 500]
+FRAMES = 200
+
+# ---------------------------- #
+# setup
+
+
+def run(count: int) -> (float, float):
+    """Average (update, paint) time per frame for `count` pets"""
+    source = StaticWindowSource(few_windows(), SCREEN)
+    swarm = PetSwarm(source, count, screens=[QRect(0, 0, *SCREEN)], threaded=False)
+    target = QImage(SCREEN[0], SCREEN[1], QImage.Format_ARGB32_Premultiplied)
+    screen = Rect(0, 0, *SCREEN)
+
+    update_time = 0.0
+    paint_time = 0.0
+    for _ in range(FRAMES):
+        start = time.perf_counter()
+        swarm.scheduler.run()
+        swarm.update_state()
+        update_time += time.perf_counter() - start
+
+        # the same single pass the overlay runs in its paint event
+        start = time.perf_counter()
+        target.fill(Qt.transparent)
+        painter = QPainter(target)
+        paint_sprites(painter, swarm.sprites, 0, 0, screen)
+        painter.end()
+        paint_time += time.perf_counter() - start
+
+    return update_time / FRAMES, paint_time / FRAMES
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+
+    for count in PET_COUNTS:
+        update, paint = run(count)
+        print(
+            f"{count:5} pets | update: {update * 1000:8.3f} ms | "
+            f"paint: {paint * 1000:8.3f} ms | frame: {(update + paint) * 1000:8.3f} ms"
+        )
@@ -0,0 +1,111 @@
+"""
+Check the signal bus (nothing lost, coalescing, priorities, budget), then
+measure posting throughput from several threads while the main thread
+dispatches every frame.
+
+run from the repository root:
+    python -m tests.bench_signals
+"""
+
+import time
+import threading
+
+from source.signal import SignalBus
+
+
+# ---------------------------- #
+# constants
+
+THREAD_COUNTS = [1, 2, 4, 8]
+POSTS = 100000
+
+# ---------------------------- #
+# checks
+
+
+def check_order():
+    bus = SignalBus()
+    low = bus.topic("low")
+    high = bus.topic("high", priority=5)
+    reset = bus.topic("reset", coalesce=True)
+    seen = []
+    bus.add_receiver(low, lambda args: seen.append(("low", args)))
+    bus.add_receiver(high, lambda args: seen.append(("high", args)))
+    bus.add_receiver(reset, lambda args: seen.append(("reset", args)))
+    assert bus.topic("low") == low
+
+    for i in range(3):
+        bus.post(low, i)
+        bus.post(reset, i)
+    bus.post(high, "first")
+    assert bus.dispatch() == 5
+    assert seen == [
+        ("high", "first"),
+        ("low", 0),
+        ("low", 1),
+        ("low", 2),
+        ("reset", 2),
+    ], seen
+    assert bus.coalesced == 2
+
+    # posted while dispatching -- next frame, not lost
+    seen.clear()
+    bus.add_receiver(low, lambda args: args == 0 and bus.post(low, 1))
+    bus.post(low, 0)
+    assert bus.dispatch() == 1 and seen == [("low", 0)]
+    assert bus.dispatch() == 1 and seen == [("low", 0), ("low", 1)]
+
+
+def check_budget():
+    bus = SignalBus()
+    slow = bus.topic("slow")
+    bus.add_receiver(slow, lambda args: time.sleep(0.002))
+    for _ in range(10):
+        bus.post(slow)
+
+    # a 5 ms budget runs a few, the rest waits for the next frames
+    first = bus.dispatch(0.005)
+    assert 1 <= first < 10 and len(bus) == 10 - first
+    total = first
+    while len(bus):
+        total += bus.dispatch(0.005)
+    assert total == 10
+
+
+def bench(threads: int) -> (float, int):
+    """Posts per second from `threads` threads, and signals received"""
+    bus = SignalBus()
+    topic = bus.topic("bench")
+    received = [0]
+
+    def receive(args):
+        received[0] += 1
+
+    bus.add_receiver(topic, receive)
+
+    def producer():
+        for i in range(POSTS // threads):
+            bus.post(topic, i)
+
+    workers = [threading.Thread(target=producer) for _ in range(threads)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    while any(worker.is_alive() for worker in workers):
+        bus.dispatch()
+    posted = time.perf_counter() - start
+    for worker in workers:
+        worker.join()
+    bus.dispatch()
+    return (POSTS // threads) * threads / posted, received[0]
+
+
+if __name__ == "__main__":
+    check_order()
+    check_budget()
+    print("no signal lost, coalescing, priorities and budget hold")
+
+    for threads in THREAD_COUNTS:
+        rate, received = bench(threads)
+        assert received == (POSTS // threads) * threads
+        print(f"{threads} threads | {rate / 1e6:6.3f} M posts/s | {received} received")
@@ -0,0 +1,176 @@
+"""
+Benchmark `World.update` on a replayed window trace.
+
+Without arguments a synthetic desktop session is recorded first. Pass a
+trace recorded with `python main.py --record trace.jsonl` to replay a real
+session instead. The occlusion pass is then timed alone on growing
+desktops, failing if its cost grows quadratically with the windows. First
+it checks that a layer change reaches the window views without rebuilding
+the edges.
+
+run from the repository root:
+    python -m tests.bench_world [trace.jsonl]
+"""
+
+import os
+import sys
+import time
+import random
+import tempfile
+
+import numpy as np
+from pygame import Rect
+
+from source.desktop import World
+from source.occlusion import exposed_edges
+from source.windowsource import WindowSource, TraceRecorder, ReplaySource
+
+
+SCREEN_WIDTH = 2560
+SCREEN_HEIGHT = 1440
+FRAMES = 600
+
+# occlusion scaling: window counts and the largest growth exponent allowed
+# between the first and the last (linear is 1, all pairs 2)
+SCALING_COUNTS = (500, 1000, 2000, 4000)
+SCALING_REPEATS = 10
+MAX_EXPONENT = 1.4
+
+
+class SyntheticDesktop(WindowSource):
+    """Random windows, one of them is dragged around every few frames"""
+
+    def __init__(self, count: int, seed: int = 0):
+        self.rng = random.Random(seed)
+        self.windows = []
+        for i in range(count):
+            self.windows.append(
+                {
+                    "kCGWindowNumber": 100 + i,
+                    "kCGWindowLayer": 0,
+                    "kCGWindowName": f"window {i}",
+                    "kCGWindowOwnerName": f"app {i % 7}",
+                    "kCGWindowOwnerPID": 1000 + i % 7,
+                    "kCGWindowIsOnscreen": True,
+                    "kCGWindowBounds": {
+                        "X": self.rng.randint(-100, SCREEN_WIDTH - 300),
+                        "Y": self.rng.randint(0, SCREEN_HEIGHT - 200),
+                        "Width": self.rng.randint(300, 1200),
+                        "Height": self.rng.randint(100, 900),
+                    },
+                }
+            )
+        self.frame = 0
+
+    def get_windows(self) -> [dict]:
+        self.frame += 1
+        if self.frame % 4 == 0:
+            # drag a random window
+            window = self.rng.choice(self.windows)
+            bounds = dict(window["kCGWindowBounds"])
+            bounds["X"] += self.rng.randint(-20, 20)
+            bounds["Y"] += self.rng.randint(-20, 20)
+            window["kCGWindowBounds"] = bounds
+        return [dict(x) for x in self.windows]
+
+    def get_screen_size(self) -> (int, int):
+        return (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+def record_synthetic(filename: str, count: int):
+    recorder = TraceRecorder(SyntheticDesktop(count), filename)
+    for _ in range(FRAMES):
+        recorder.get_windows()
+    recorder.close()
+
+
+def check_layer_change():
+    desktop = SyntheticDesktop(5)
+    world = World(desktop, threaded=False)
+    world.update()
+    generation = world.generation
+    window = world.windows[2]
+    layer = window.layer
+
+    # a window too small to stand on opens in front of everything
+    tiny = dict(desktop.windows[0], kCGWindowNumber=99)
+    tiny["kCGWindowBounds"] = {"X": 0, "Y": 0, "Width": 1, "Height": 1}
+    desktop.windows.insert(0, tiny)
+    desktop.frame = 1
+    assert world.poller.poll(), "the stacking changed"
+    assert not world.update() and world.generation == generation
+    assert world.table is world.poller.latest().windows
+    assert window.layer == layer - 1
+
+
+def run(filename: str, label: str):
+    source = ReplaySource(filename, speed=None)
+    world = World(source, threaded=False)
+
+    poll_time = 0.0
+    update_time = 0.0
+    changes = 0
+    for _ in range(len(source)):
+        start = time.perf_counter()
+        world.poller.poll()
+        poll_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        if world.update():
+            changes += 1
+        update_time += time.perf_counter() - start
+
+    frames = len(source)
+    print(
+        f"{label:>14} | {frames} frames | {changes:4} changed | "
+        f"poll: {poll_time / frames * 1e6:9.2f} us | "
+        f"update: {update_time / frames * 1e6:9.2f} us"
+    )
+
+
+def occlusion_time(count: int) -> float:
+    """Best seconds of one occlusion pass over a synthetic desktop"""
+    windows = SyntheticDesktop(count).get_windows()
+    columns = [
+        np.array([w["kCGWindowBounds"][key] for w in windows])
+        for key in ("X", "Y", "Width", "Height")
+    ]
+    x, y, w, h = columns
+    blocking = np.ones(count, dtype=bool)
+    bounds = Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+    best = float("inf")
+    for _ in range(SCALING_REPEATS):
+        start = time.perf_counter()
+        exposed_edges(x, x + w, y, y + h, blocking, bounds)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def scaling() -> float:
+    """Time the occlusion pass per desktop size, returns the growth exponent"""
+    times = []
+    for count in SCALING_COUNTS:
+        times.append(occlusion_time(count))
+        print(
+            f"{count:>5} windows | occlusion: {times[-1] * 1e3:7.2f} ms | "
+            f"{times[-1] / count * 1e6:5.2f} us per window"
+        )
+    return np.log(times[-1] / times[0]) / np.log(SCALING_COUNTS[-1] / SCALING_COUNTS[0])
+
+
+if __name__ == "__main__":
+    check_layer_change()
+    print("layer changes reach the windows, edges are kept")
+
+    if len(sys.argv) > 1:
+        run(sys.argv[1], os.path.basename(sys.argv[1]))
+    else:
+        with tempfile.TemporaryDirectory() as folder:
+            for count in (10, 100, 1000):
+                filename = os.path.join(folder, f"synthetic-{count}.jsonl")
+                record_synthetic(filename, count)
+                run(filename, f"{count} windows")
+
+    exponent = scaling()
+    print(f"occlusion grows as windows^{exponent:.2f}")
+    assert exponent < MAX_EXPONENT, "occlusion cost grows quadratically"
@@ -0,0 +1,31 @@
+"""
+Window lists shared by the checks and benchmarks, in the
+`CGWindowListCopyWindowInfo` format a `StaticWindowSource` serves.
+"""
+
+
+def window(wid: int, x: int, y: int, w: int, h: int) -> dict:
+    return {
+        "kCGWindowNumber": wid,
+        "kCGWindowLayer": 0,
+        "kCGWindowOwnerName": "bench",
+        "kCGWindowIsOnscreen": True,
+        "kCGWindowBounds": {"X": x, "Y": y, "Width": w, "Height": h},
+    }
+
+
+def crossing_windows(count: int) -> [dict]:
+    """Overlapping windows in steps across the whole screen"""
+    return [
+        window(i + 1, (i * 37) % 1500, 200 + (i * 53) % 700, 400, 250)
+        for i in range(count)
+    ]
+
+
+def few_windows() -> [dict]:
+    """A few overlapping windows for the pets to walk on"""
+    return [
+        window(1, 100, 300, 700, 500),
+        window(2, 600, 150, 800, 400),
+        window(3, 1200, 600, 600, 350),
+    ]
@@ -0,0 +1,91 @@
+"""
+Replay the same window trace twice with the same seed and check that the
+pets follow bit-identical trajectories (and a different seed does not).
+
+run from the repository root:
+    python -m tests.determinism_check
+"""
+
+import io
+import os
+import json
+import time
+import hashlib
+import tempfile
+import contextlib
+
+from source.headless import HeadlessHost
+from source.lifecycle import VirtualClock
+from source.windowsource import ReplaySource, TRACE_KEYS, TRACE_VERSION, encode_window
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+PETS = 10
+SECONDS = 60.0
+
+# ---------------------------- #
+# setup
+
+
+def write_trace(filename: str):
+    """A window sliding across the screen and two that stay put"""
+    with open(filename, "w") as file:
+        header = {"version": TRACE_VERSION, "screen": list(SCREEN), "keys": TRACE_KEYS}
+        file.write(json.dumps(header) + "\n")
+        for step in range(int(SECONDS * 2)):
+            windows = [
+                (1, 100 + (step * 20) % 1200, 400, 600, 400),
+                (2, 900, 250, 700, 300),
+                (3, 300, 700, 900, 300),
+            ]
+            encoded = [
+                encode_window(
+                    {
+                        "kCGWindowNumber": wid,
+                        "kCGWindowLayer": 0,
+                        "kCGWindowOwnerName": "trace",
+                        "kCGWindowIsOnscreen": True,
+                        "kCGWindowBounds": {"X": x, "Y": y, "Width": w, "Height": h},
+                    }
+                )
+                for wid, x, y, w, h in windows
+            ]
+            file.write(json.dumps({"t": step * 0.5, "w": encoded}) + "\n")
+
+
+def trajectory(trace: str, seed: int) -> (str, int, float):
+    """Hash of every pet position of every frame, the frames and ticks/s"""
+    clock = VirtualClock()
+    host = HeadlessHost(ReplaySource(trace, clock=clock), PETS, clock=clock, seed=seed)
+    bodies = host.world.bodies
+    digest = hashlib.sha1()
+    frames = 0
+    started = time.perf_counter()
+    # the states print where they walk to
+    with contextlib.redirect_stdout(io.StringIO()):
+        while clock() < SECONDS:
+            host.frame()
+            digest.update(bodies.x[:PETS].tobytes())
+            digest.update(bodies.y[:PETS].tobytes())
+            frames += 1
+    return digest.hexdigest(), frames, frames / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        trace = os.path.join(folder, "trace.jsonl")
+        write_trace(trace)
+
+        first, frames, rate = trajectory(trace, seed=7)
+        print(f"seed 7: {frames} frames | {first[:12]} | {rate:7.0f} ticks/s")
+        second, frames, rate = trajectory(trace, seed=7)
+        print(f"seed 7: {frames} frames | {second[:12]} | {rate:7.0f} ticks/s")
+        other, frames, rate = trajectory(trace, seed=8)
+        print(f"seed 8: {frames} frames | {other[:12]} | {rate:7.0f} ticks/s")
+
+    assert first == second, "same seed and trace, different trajectories"
+    assert first != other
+    print("same seed + trace -> bit-identical trajectories")
@@ -0,0 +1,156 @@
+"""
+Check the navigation graph and route cache: a graph patched after windows
+move has the same links as one built from scratch, and repeated plans
+between the same two surfaces hit the cache.
+
+run from the repository root:
+    python -m tests.navigation_check
+"""
+
+import random
+
+from pygame import Rect
+
+from source.desktop import World
+from source.navigation import NavGraph
+from source.windowsource import StaticWindowSource
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+PET = (100, 100)
+WINDOWS = 60
+CHANGES = 200
+PLANS = 500
+SEED = 3
+
+# ---------------------------- #
+# setup
+
+
+def window(wid: int, x: int, y: int, w: int, h: int) -> dict:
+    return {
+        "kCGWindowNumber": wid,
+        "kCGWindowLayer": 0,
+        "kCGWindowOwnerName": "check",
+        "kCGWindowIsOnscreen": True,
+        "kCGWindowBounds": {"X": x, "Y": y, "Width": w, "Height": h},
+    }
+
+
+def random_window(rng: "random.Random", wid: int) -> dict:
+    return window(
+        wid,
+        rng.randint(-100, SCREEN[0] - 200),
+        rng.randint(100, SCREEN[1] - 100),
+        rng.randint(200, 700),
+        rng.randint(80, 500),
+    )
+
+
+def links(graph: "NavGraph") -> set:
+    """Every link, by the surfaces it connects"""
+    return {
+        (
+            graph.platforms[link.source].key(),
+            graph.platforms[link.target].key(),
+            link.kind,
+            link.launch,
+            link.land,
+            link.cost,
+        )
+        for outgoing in graph.links
+        for link in outgoing
+    }
+
+
+def update(world: "World"):
+    world.poller.poll()
+    world.update()
+
+
+# ---------------------------- #
+# checks
+
+
+def check_patching(rng: "random.Random"):
+    """Move, add, remove and raise windows; patch the graph after each change"""
+    windows = [random_window(rng, i + 1) for i in range(WINDOWS)]
+    source = StaticWindowSource(list(windows), SCREEN)
+    world = World(source, threaded=False)
+    navigation = world.navigation
+
+    relinked = 0
+    platforms = 0
+    next_wid = WINDOWS + 1
+    for _ in range(CHANGES):
+        change = rng.random()
+        if change < 0.6:
+            # drag a window a little
+            i = rng.randrange(len(windows))
+            bounds = dict(windows[i]["kCGWindowBounds"])
+            bounds["X"] += rng.randint(-40, 40)
+            bounds["Y"] += rng.randint(-40, 40)
+            windows[i] = dict(windows[i], kCGWindowBounds=bounds)
+        elif change < 0.75:
+            windows.insert(
+                rng.randrange(len(windows) + 1), random_window(rng, next_wid)
+            )
+            next_wid += 1
+        elif change < 0.9 and len(windows) > 1:
+            windows.pop(rng.randrange(len(windows)))
+        else:
+            windows.insert(0, windows.pop(rng.randrange(len(windows))))
+        source.windows = list(windows)
+        update(world)
+
+        patched = navigation.graph(*PET)
+        built = NavGraph(world, *PET)
+        assert links(patched) == links(built), "patched graph differs"
+        relinked += patched.relinked
+        platforms += len(patched.platforms)
+
+    print(
+        f"{CHANGES} changes | relinked {relinked / platforms:5.1%} of the platforms "
+        f"| patched graphs match rebuilt ones"
+    )
+
+
+def check_cache(rng: "random.Random"):
+    """Plans from one surface to random spots on others share their routes"""
+    windows = [random_window(rng, i + 1) for i in range(WINDOWS // 4)]
+    world = World(StaticWindowSource(windows, SCREEN), threaded=False)
+    navigation = world.navigation
+
+    # standing on the floor
+    rect = Rect(SCREEN[0] // 2, SCREEN[1] - 1 - PET[1], *PET)
+    targets = [p for p in navigation.reachable(rect) if p.x1 - p.x0 >= PET[0]]
+    assert len(targets) > 1, "nothing to walk to"
+
+    planned = 0
+    for _ in range(PLANS):
+        goal = rng.choice(targets)
+        low, high = goal.standing_range(PET[0])
+        goal_x = rng.randint(low, high)
+        rect.x = rng.randint(0, SCREEN[0] - PET[0])
+        path = navigation.plan(rect, goal, goal_x, 30)
+        if path == None:
+            continue
+        planned += 1
+        assert path[-1].x == goal_x and path[-1].y == goal.y
+    assert navigation.misses <= len(targets), navigation.misses
+    assert navigation.hits == planned - navigation.misses
+    print(
+        f"{planned} plans to {len(targets)} surfaces | "
+        f"{navigation.hits} hits {navigation.misses} misses | "
+        f"hit rate {navigation.hit_rate():.1%}"
+    )
+
+
+if __name__ == "__main__":
+    rng = random.Random(SEED)
+    check_patching(rng)
+    check_cache(rng)
+    print("graphs patch like they rebuild, repeated plans hit the cache")
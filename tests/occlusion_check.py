@@ -0,0 +1,117 @@
+"""
+Randomized differential check of `occlusion.exposed_segments` against a
+brute-force pixel mask.
+
+run from the repository root:
+    python -m tests.occlusion_check
+"""
+
+import random
+
+from pygame import Rect
+
+from source import occlusion
+from source.occlusion import exposed_segments
+
+
+SCREEN_WIDTH = 160
+SCREEN_HEIGHT = 120
+ROUNDS = 2000
+
+# the default sweeps these desktops in one block, small blocks also go
+# through the covered bands
+BLOCK_SIZES = (occlusion.BLOCK_SIZE, 1, 3)
+
+
+def random_desktop(rng: "random.Random") -> (["Rect"], [bool]):
+    rects = []
+    blocking = []
+    for _ in range(rng.randint(0, 12)):
+        w = rng.randint(0, SCREEN_WIDTH)
+        h = rng.randint(0, SCREEN_HEIGHT)
+        # allow windows hanging off the screen and lots of shared edges
+        x = (
+            rng.choice([0, 20, 40])
+            if rng.random() < 0.3
+            else rng.randint(-40, SCREEN_WIDTH)
+        )
+        y = (
+            rng.choice([0, 20, 40])
+            if rng.random() < 0.3
+            else rng.randint(-40, SCREEN_HEIGHT)
+        )
+        rects.append(Rect(x, y, w, h))
+        blocking.append(rng.random() > 0.2)
+    return rects, blocking
+
+
+def mask_row(rects: ["Rect"], blocking: [bool], index: int, y: int) -> bytearray:
+    """Paint every covering window in front of `index` onto one pixel row"""
+    row = bytearray(SCREEN_WIDTH)
+    for j in range(index):
+        if not blocking[j]:
+            continue
+        rect = rects[j]
+        if rect.top <= y < rect.bottom:
+            for x in range(max(rect.left, 0), min(rect.right, SCREEN_WIDTH)):
+                row[x] = 1
+    return row
+
+
+def runs(row: bytearray, x0: int, x1: int) -> [(int, int)]:
+    """Turn the uncovered pixels of `[x0, x1)` into intervals"""
+    found = []
+    start = None
+    for x in range(x0, x1):
+        if not row[x] and start == None:
+            start = x
+        elif row[x] and start != None:
+            found.append((start, x))
+            start = None
+    if start != None:
+        found.append((start, x1))
+    return found
+
+
+def reference(rects: ["Rect"], blocking: [bool], bounds: "Rect"):
+    result = []
+    for i, rect in enumerate(rects):
+        x0 = max(rect.left, bounds.left)
+        x1 = min(rect.right, bounds.right)
+        if x1 <= x0:
+            result.append(([], []))
+            continue
+        top, bottom = (
+            (
+                runs(mask_row(rects, blocking, i, y), x0, x1)
+                if bounds.top <= y < bounds.bottom
+                else []
+            )
+            for y in (rect.top, rect.bottom)
+        )
+        result.append((top, bottom))
+    return result
+
+
+if __name__ == "__main__":
+    bounds = Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+
+    for size in BLOCK_SIZES:
+        occlusion.BLOCK_SIZE = size
+        rng = random.Random(1234)
+        for i in range(ROUNDS):
+            rects, blocking = random_desktop(rng)
+            expected = reference(rects, blocking, bounds)
+            actual = exposed_segments(rects, blocking, bounds)
+            if actual != expected:
+                print("MISMATCH in round", i, "with blocks of", size)
+                for rect, block in zip(rects, blocking):
+                    print("   ", rect, "blocking" if block else "")
+                print("expected:", expected)
+                print("actual:  ", actual)
+                raise SystemExit(1)
+
+        print(
+            f"{ROUNDS} random desktops match the pixel mask reference "
+            f"(blocks of {size})"
+        )
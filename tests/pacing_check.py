@@ -0,0 +1,88 @@
+"""
+Run the frame pacer on a hand driven clock: achieved frame rate under
+load compared to sleeping a fixed period after the work, skipped frames
+when overloaded, and the idle rate and ramp back up.
+
+run from the repository root:
+    python -m tests.pacing_check
+"""
+
+from source.pacing import FramePacer
+
+
+# ---------------------------- #
+# constants
+
+FPS = 16
+IDLE_FPS = 4
+SECONDS = 10.0
+WORK_LOADS = [0.005, 0.02, 0.05, 0.08]
+
+# ---------------------------- #
+# setup
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def fixed_delay(work: float) -> float:
+    """The old loop: `callLater(1 / FPS)` after the work, returns its fps"""
+    now, frames = 0.0, 0
+    while now < SECONDS:
+        now += work + 1.0 / FPS
+        frames += 1
+    return frames / now
+
+
+def paced(work: float, busy: "function" = lambda now: True) -> ("FramePacer", float):
+    """Run frames of `work` seconds for `SECONDS`, returns the pacer + simulated time"""
+    clock = ManualClock()
+    pacer = FramePacer(FPS, IDLE_FPS, idle_after=2.0, clock=clock)
+    simulated = 0.0
+    while clock.now < SECONDS:
+        simulated += pacer.begin()
+        clock.now += work
+        clock.now += pacer.end(busy(clock.now))
+    return pacer, simulated
+
+
+# ---------------------------- #
+# checks
+
+
+def check_idle():
+    # idle from 1s to 6s, busy again after
+    starts = []
+
+    def busy(now: float) -> bool:
+        starts.append(now)
+        return not 1.0 <= now < 6.0
+
+    pacer, _ = paced(0.001, busy)
+    gaps = [b - a for a, b in zip(starts, starts[1:])]
+    fast, slow = 1.0 / FPS, 1.0 / IDLE_FPS
+    # full rate, idle rate after `idle_after` quiet seconds, full rate again
+    assert all(abs(g - fast) < 1e-6 for g, s in zip(gaps, starts) if s < 2.9)
+    assert all(abs(g - slow) < 1e-6 for g, s in zip(gaps, starts) if 3.3 < s < 5.9)
+    assert all(abs(g - fast) < 1e-6 for g, s in zip(gaps, starts) if s > 6.3)
+    assert not pacer.idle
+
+
+if __name__ == "__main__":
+    check_idle()
+    print("idle rate after 2 quiet seconds, full rate on the next busy frame")
+
+    for work in WORK_LOADS:
+        pacer, simulated = paced(work)
+        # skipped or not, the simulation keeps up with real time
+        assert abs(simulated - pacer.clock.now) <= 1.0 / FPS + 1e-9
+        print(
+            f"work {work * 1000:4.0f} ms | fixed delay {fixed_delay(work):5.1f} fps | "
+            f"paced {pacer.achieved_fps():5.1f} fps, {pacer.overruns:3} overruns, "
+            f"{pacer.skipped:3} skipped"
+        )
@@ -0,0 +1,132 @@
+"""
+Walk pets along multi-step paths in a headless world and check that they
+land after every jump or fall and reach their goal.
+
+run from the repository root:
+    python -m tests.path_check
+"""
+
+import io
+import contextlib
+
+from pygame import Rect, Vector2
+
+from source import navigation
+from source.headless import HeadlessHost
+from source.windowsource import StaticWindowSource
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+SEED = 1
+TIMEOUT = 120.0  # simulated seconds to reach a goal
+
+# ---------------------------- #
+# setup
+
+
+def window(wid: int, x: int, y: int, w: int, h: int) -> dict:
+    return {
+        "kCGWindowNumber": wid,
+        "kCGWindowLayer": 0,
+        "kCGWindowOwnerName": "check",
+        "kCGWindowIsOnscreen": True,
+        "kCGWindowBounds": {"X": x, "Y": y, "Width": w, "Height": h},
+    }
+
+
+# two steps up from the floor
+STAIRS = [
+    window(1, 700, 900, 500, 180),
+    window(2, 1100, 760, 600, 320),
+]
+
+
+def settle(host: "HeadlessHost"):
+    """Run until the pet stands idle on a surface"""
+    pet = host.pets[0]
+    machine = pet.statemachine
+    idle = machine.graph.state("idle")
+    for _ in range(2000):
+        host.frame()
+        if (
+            machine.get_current_index() == idle
+            and host.world.navigation.locate(pet._rect) != None
+        ):
+            return
+    raise AssertionError("the pet never settled")
+
+
+def walk_to(host: "HeadlessHost", x: int, y: int) -> ["Step"]:
+    """Send the pet to `x` on the surface at height `y`, returns the path"""
+    pet = host.pets[0]
+    machine = pet.statemachine
+    navigation = host.world.navigation
+    w, h = pet._rect.size
+    goal = navigation.locate(Rect(x, y - h + 1, w, h))
+    assert goal != None, f"no surface at {x}, {y}"
+    path = navigation.plan(pet._rect, goal, x, pet.MS)
+    assert path != None, f"{x}, {y} out of reach"
+    pet._target_location = {
+        "window": host.world.get_window(goal.wid),
+        "pos": Vector2(x, goal.y - h + 1),
+        "path": path,
+    }
+    machine.fire(machine.wander_event)
+    return list(path)
+
+
+def arrive(host: "HeadlessHost") -> (float, Vector2):
+    """
+    Run until the pet stops moving, returns the simulated seconds it took
+    and where it stood when it arrived (the jump it celebrates with moves it)
+    """
+    pet = host.pets[0]
+    machine = pet.statemachine
+    move = machine.graph.state("move")
+    start = host.virtual()
+    # let the wander event through
+    host.frame()
+    while machine.get_current_index() == move:
+        assert host.virtual() - start < TIMEOUT, "the pet never arrived"
+        position = Vector2(pet._pos.x, pet._rect.bottom - 1)
+        host.frame()
+    return host.virtual() - start, position
+
+
+# ---------------------------- #
+# checks
+
+
+def check(host: "HeadlessHost", x: int, y: int, kinds: set) -> str:
+    """Walk the pet to `x`, `y` along a path with `kinds` of steps"""
+    pet = host.pets[0]
+    settle(host)
+    path = walk_to(host, x, y)
+    seen = {step.kind for step in path}
+    assert kinds <= seen, f"expected {kinds} in the path, got {seen}"
+
+    seconds, position = arrive(host)
+    arrived = pet.statemachine.get_current_index()
+    assert arrived == pet.statemachine.graph.state("jumpstage1"), "lost on the way"
+    goal = path[-1]
+    assert abs(position.y - goal.y) <= 1, f"ended at y {position.y}, not {goal.y}"
+    assert abs(position.x - goal.x) < 2, f"ended at x {position.x}, not {goal.x}"
+    return f"{' '.join(s.kind for s in path):<24} -> {x}, {y} in {seconds:5.1f} s"
+
+
+if __name__ == "__main__":
+    host = HeadlessHost(StaticWindowSource(STAIRS, SCREEN), 1, seed=SEED)
+    floor = SCREEN[1] - 1
+
+    # the states print where they walk to
+    with contextlib.redirect_stdout(io.StringIO()):
+        # up the stairs: walk, jump, walk, jump, walk
+        up = check(host, 1500, 759, {navigation.JUMP})
+        # and back down to the floor on the other side: walk, fall, walk
+        down = check(host, 200, floor, {navigation.FALL})
+    for line in (up, down):
+        print(line)
+    print("multi-step paths land and reach their goal")
@@ -0,0 +1,73 @@
+"""
+Run the window poller against a synthetic window source, then park it.
+
+run from the repository root:
+    python -m tests.poller_check
+"""
+
+import time
+
+from source.poller import WindowPoller
+from source.windowtable import WindowTable
+
+
+class SyntheticSource:
+    """A single window that moves for `moving` polls and then stays put"""
+
+    def __init__(self, moving: int):
+        self.moving = moving
+        self.calls = 0
+
+    def __call__(self) -> "WindowTable":
+        self.calls += 1
+        x = min(self.calls, self.moving) * 10
+        return WindowTable.from_raw(
+            [
+                {
+                    "kCGWindowNumber": 1,
+                    "kCGWindowBounds": {"X": x, "Y": 100, "Width": 400, "Height": 300},
+                }
+            ]
+        )
+
+
+if __name__ == "__main__":
+    source = SyntheticSource(moving=20)
+    poller = WindowPoller(source, fast_interval=0.005, slow_interval=0.08)
+    poller.start()
+
+    # readers never block while the poller publishes
+    reads = 0
+    seen = set()
+    end = time.time() + 1.0
+    while time.time() < end:
+        snapshot = poller.latest()
+        seen.add(snapshot.sequence)
+        reads += 1
+    poller.stop()
+    poller.join()
+
+    print(f"polls: {poller.polls} | snapshots: {poller.changes} | reads: {reads}")
+    print(f"final interval: {poller.interval * 1000:.1f} ms")
+    assert poller.changes == 20, poller.changes
+    assert poller.interval == poller.slow_interval
+    assert poller.latest().windows.data["x"][0] == 200
+    print("ok")
+
+    # paused -- not even a wake makes it poll
+    poller = WindowPoller(SyntheticSource(moving=1000), 0.001, 0.001)
+    poller.start()
+    time.sleep(0.05)
+    poller.pause()
+    time.sleep(0.01)
+    polls = poller.polls
+    for _ in range(20):
+        poller.wake()
+        time.sleep(0.01)
+    assert poller.polls == polls, poller.polls - polls
+    poller.resume()
+    time.sleep(0.05)
+    assert poller.polls > polls
+    poller.stop()
+    poller.join()
+    print(f"paused: 0 polls in 0.2 s, {poller.polls - polls} polls after resume")
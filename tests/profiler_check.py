@@ -0,0 +1,123 @@
+"""
+Check the profiler ring buffers, phase totals and state statistics, then
+measure what a phase costs with the profiler disabled and enabled -- a
+disabled phase must stay close to an empty loop.
+
+run from the repository root:
+    python -m tests.profiler_check
+"""
+
+import time
+
+import numpy as np
+
+from source.profiler import PROFILER, Profiler, RingBuffer
+from source.statemachine import StateGraph, StateMachineComponent, State
+
+
+# ---------------------------- #
+# constants
+
+CALLS = 200000
+RUNS = 3
+# what a disabled phase may add to an empty loop, two calls take ~80 ns
+MAX_DISABLED = 30e-9
+
+# ---------------------------- #
+# checks
+
+
+def check_ring_buffer():
+    buffer = RingBuffer(8)
+    assert len(buffer) == 0 and buffer.percentiles() == {50: 0.0, 90: 0.0, 99: 0.0}
+    for i in range(20):
+        buffer.push(i)
+    assert len(buffer) == 8 and buffer.last() == 19
+    assert buffer.values().tolist() == list(range(12, 20))
+    assert buffer.percentiles((50,))[50] == np.percentile(np.arange(12, 20), 50)
+
+
+def check_phases():
+    profiler = Profiler(enabled=True, size=4)
+    for frame in range(6):
+        for _ in range(3):
+            started = profiler.start()
+            time.sleep(0.001)
+            profiler.stop("work", started)
+        if frame % 2:
+            profiler.stop("sometimes", profiler.start())
+        profiler.frame()
+
+    # 3 x 1 ms per frame, the phase seen every other frame is 0 in between
+    work = profiler.phases["work"].values()
+    assert len(work) == 4 and (work >= 0.003).all()
+    assert (profiler.phases["sometimes"].values()[::2] == 0.0).all()
+    assert len(profiler.frames) == 4
+    assert set(profiler.summary()) == {"frame", "work", "sometimes"}
+
+    disabled = Profiler()
+    disabled.stop("work", disabled.start())
+    disabled.frame()
+    assert not disabled.phases and not len(disabled.frames)
+
+
+def check_states():
+    graph = StateGraph(
+        {
+            "initial": "a",
+            "states": ["a", "b"],
+            "transitions": [
+                {"from": "a", "to": "b", "when": "always"},
+                {"from": "b", "to": "a", "when": "always"},
+            ],
+        },
+        {"always": lambda context: True},
+    )
+    machine = StateMachineComponent(graph, None)
+    machine.add_state(State("a"))
+    machine.add_state(State("b"))
+    machine.start()
+
+    PROFILER.enabled = True
+    try:
+        for _ in range(10):
+            machine.update()
+    finally:
+        PROFILER.enabled = False
+    stats = PROFILER.graph(graph)
+    assert stats.updates.tolist() == [5, 5]
+    assert stats.transitions.tolist() == [[0, 5], [4, 0]]
+    assert stats.dwell.sum() > 0.0
+    assert "in state" in PROFILER.report()
+
+
+def overhead(profiler: "Profiler") -> float:
+    """Seconds per phase, timed the way the call sites do it"""
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        started = profiler.enabled and profiler.start()
+        if started:
+            profiler.stop("phase", started)
+    return (time.perf_counter() - start) / CALLS
+
+
+def empty_loop() -> float:
+    start = time.perf_counter()
+    for _ in range(CALLS):
+        pass
+    return (time.perf_counter() - start) / CALLS
+
+
+if __name__ == "__main__":
+    check_ring_buffer()
+    check_phases()
+    check_states()
+    print("ring buffers, phases and state statistics add up")
+
+    # best of a few runs, so a busy machine doesn't fail the check
+    empty = min(empty_loop() for _ in range(RUNS))
+    disabled = min(overhead(Profiler()) for _ in range(RUNS))
+    print(f"empty loop: {empty * 1e9:6.1f} ns")
+    print(f"disabled:   {disabled * 1e9:6.1f} ns per phase")
+    print(f"enabled:    {overhead(Profiler(enabled=True)) * 1e9:6.1f} ns per phase")
+    assert disabled - empty < MAX_DISABLED, "a disabled phase should cost no calls"
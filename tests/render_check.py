@@ -0,0 +1,68 @@
+"""
+Run the render pipeline against recording widgets.
+
+run from the repository root:
+    python -m tests.render_check
+"""
+
+from source.render import RenderPipeline
+
+
+class RecordingWidget:
+    """Records the qt calls the pipeline makes"""
+
+    def __init__(self):
+        self.calls = []
+
+    def move(self, x: int, y: int):
+        self.calls.append(("move", x, y))
+
+    def setGeometry(self, x: int, y: int, w: int, h: int):
+        self.calls.append(("setGeometry", x, y, w, h))
+
+    def update(self):
+        self.calls.append(("update",))
+
+
+if __name__ == "__main__":
+    render = RenderPipeline()
+    window = RecordingWidget()
+    pet = RecordingWidget()
+
+    # first frame applies everything
+    render.move(window, 10, 20)
+    render.repaint(pet, ("idle", 0, False))
+    assert render.flush()
+    assert window.calls == [("move", 10, 20)] and pet.calls == [("update",)]
+
+    # an idle pet costs nothing
+    window.calls.clear()
+    pet.calls.clear()
+    for _ in range(100):
+        render.move(window, 10, 20)
+        render.set_geometry(pet, 0, 0, 100, 100)
+        render.repaint(pet, ("idle", 0, False))
+        render.flush()
+    assert window.calls == [] and pet.calls == [("setGeometry", 0, 0, 100, 100)]
+    assert render.idle_frames == 99, render.idle_frames
+
+    # several submissions in a frame coalesce into one call per widget
+    pet.calls.clear()
+    render.set_geometry(window, 10, 20, 120, 80)
+    render.move(window, 11, 21)
+    render.move(window, 12, 22)
+    render.repaint(pet, ("idle", 1, False))
+    render.repaint(pet, ("idle", 2, True))
+    render.flush()
+    assert window.calls == [("setGeometry", 12, 22, 120, 80)], window.calls
+    assert pet.calls == [("update",)]
+
+    # the same content after invalidating is applied again
+    pet.calls.clear()
+    render.invalidate(pet)
+    render.repaint(pet, ("idle", 2, True))
+    render.flush()
+    assert pet.calls == [("update",)]
+
+    print(render)
+    print("ok")
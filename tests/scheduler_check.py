@@ -0,0 +1,147 @@
+"""
+Run the timer scheduler on a hand driven clock: firing order, repeats,
+stopping, suspension through the statemachine, and wakeups per second for
+a growing number of pets.
+
+run from the repository root:
+    python -m tests.scheduler_check
+"""
+
+from source.scheduler import Scheduler
+from source.statemachine import StateGraph, StateMachineComponent, State
+
+
+# ---------------------------- #
+# constants
+
+FPS = 16
+PET_COUNTS = [1, 10, 100, 1000]
+
+# ---------------------------- #
+# setup
+
+
+class ManualClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TickingState(State):
+    """Counts the ticks of a repeating timer owned by the state"""
+
+    def __init__(self, name: str, ms: int):
+        super().__init__(name)
+        self.ms = ms
+        self.ticks = 0
+
+    def __post_init__(self, statemachine: "StateMachineComponent"):
+        super().__post_init__(statemachine)
+        self.timer = statemachine.scheduler.timer(self._tick, owner=self)
+
+    def _tick(self):
+        self.ticks += 1
+
+    def on_enter(self):
+        if not self.timer.isActive():
+            self.timer.start(self.ms)
+
+
+def check_order():
+    clock = ManualClock()
+    scheduler = Scheduler(clock)
+    fired = []
+    scheduler.call_later(300, lambda: fired.append("c"))
+    scheduler.call_later(100, lambda: fired.append("a"))
+    scheduler.call_later(100, lambda: fired.append("b"))
+    stopped = scheduler.call_later(200, lambda: fired.append("x"))
+    stopped.stop()
+
+    clock.now = 0.25
+    assert scheduler.run() == 2 and fired == ["a", "b"]
+    clock.now = 1.0
+    assert scheduler.run() == 1 and fired == ["a", "b", "c"]
+    assert len(scheduler) == 0
+
+    # repeating -- a late timer fires once and keeps its period after
+    repeat = scheduler.timer(lambda: fired.append("r"))
+    repeat.start(100)
+    clock.now = 1.35
+    assert scheduler.run() == 1
+    assert abs(repeat.deadline - 1.45) < 1e-9
+    clock.now = 1.46
+    assert scheduler.run() == 1 and abs(repeat.deadline - 1.55) < 1e-9
+
+    # a zero interval timer fires once per run, it can't starve the loop
+    busy = scheduler.timer(lambda: fired.append("z"))
+    busy.start(0)
+    repeat.stop()
+    assert scheduler.run() == 1 and scheduler.run() == 1
+
+
+def check_suspend():
+    clock = ManualClock()
+    graph = StateGraph(
+        {
+            "initial": "idle",
+            "states": ["idle", "move"],
+            "transitions": [
+                {"from": "idle", "to": "move", "event": "go"},
+                {"from": "move", "to": "idle", "event": "stop"},
+            ],
+        },
+        {},
+    )
+    machine = StateMachineComponent(graph, None, Scheduler(clock))
+    idle = TickingState("idle", 1000)
+    move = TickingState("move", 125)
+    machine.add_state(idle)
+    machine.add_state(move)
+    machine.start()
+    idle.on_enter()
+
+    # 0.5 s idle, then 1 s moving: the idle timer is paused, 0.5 s left
+    clock.now = 0.5
+    machine.scheduler.run()
+    machine.fire(graph.event("go"))
+    machine.update()
+    for _ in range(8):
+        clock.now += 0.125
+        machine.scheduler.run()
+    assert idle.ticks == 0 and move.ticks == 8
+
+    machine.fire(graph.event("stop"))
+    machine.update()
+    clock.now += 0.375
+    machine.scheduler.run()
+    assert idle.ticks == 0
+    clock.now += 0.125
+    machine.scheduler.run()
+    assert idle.ticks == 1 and move.ticks == 8
+
+
+def wakeups(pets: int, seconds: int = 10) -> float:
+    """Scheduler wakeups per second with three timers per pet"""
+    clock = ManualClock()
+    scheduler = Scheduler(clock)
+    for i in range(pets):
+        scheduler.timer(lambda: None).start(3000 + i % 7)
+        scheduler.timer(lambda: None).start(8000 + i % 11)
+        scheduler.timer(lambda: None).start(200)
+
+    for _ in range(seconds * FPS):
+        clock.now += 1.0 / FPS
+        scheduler.run()
+    return scheduler.wakeups / seconds, scheduler.fired / seconds
+
+
+if __name__ == "__main__":
+    check_order()
+    check_suspend()
+    print("timers fire in order, states suspend and resume their timers")
+
+    for count in PET_COUNTS:
+        rate, fired = wakeups(count)
+        print(f"{count:5} pets | wakeups: {rate:6.1f} /s | callbacks: {fired:8.1f} /s")
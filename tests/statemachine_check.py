@@ -0,0 +1,151 @@
+"""
+Compile the pet behavior from the behaviors file and run many machines
+sharing it: guarded and event transitions, bad definitions, and the cost
+of a tick.
+
+run from the repository root:
+    python -m tests.statemachine_check
+"""
+
+import time
+
+from source import settings
+from source.statemachine import (
+    NONE,
+    StateGraph,
+    StateMachineComponent,
+    State,
+    load_graph,
+)
+
+
+# ---------------------------- #
+# constants
+
+MACHINES = 1000
+TICKS = 100
+
+# ---------------------------- #
+# setup
+
+
+class Body:
+    """What the pet guards look at"""
+
+    def __init__(self):
+        self.grounded = True
+        self.frame = 0
+
+
+GUARDS = {
+    "airborne": lambda body: not body.grounded,
+    "grounded": lambda body: body.grounded,
+    "jump_done": lambda body: body.frame > 24,
+}
+
+
+class RecordingState(State):
+    def __init__(self, name: str, log: list):
+        super().__init__(name)
+        self.log = log
+
+    def on_enter(self):
+        self.log.append(f"+{self._name}")
+
+    def on_exit(self):
+        self.log.append(f"-{self._name}")
+
+
+def machine(graph: "StateGraph", body: "Body", log: list) -> "StateMachineComponent":
+    result = StateMachineComponent(graph, body)
+    for name in graph.names:
+        result.add_state(RecordingState(name, log))
+    result.start()
+    return result
+
+
+def check_transitions():
+    graph = load_graph(settings.BEHAVIORS_FILE, "pet", GUARDS)
+    assert load_graph(settings.BEHAVIORS_FILE, "pet", GUARDS) is graph
+
+    body = Body()
+    log = []
+    pet = machine(graph, body, log)
+    idle = graph.state("idle")
+    assert pet.get_current_index() == idle
+
+    # guards -- taken on the tick after they hold
+    body.grounded = False
+    pet.update()
+    pet.update()
+    assert pet.get_current_index() == graph.state("fall")
+    body.grounded = True
+    pet.update()
+    pet.update()
+    assert pet.get_current_index() == idle
+
+    # events -- the first one asked for in a tick wins, unknown ones are ignored
+    pet.fire(graph.event("wander"))
+    pet.fire(graph.event("custom"))
+    pet.update()
+    assert pet.get_current_index() == graph.state("move")
+    pet.fire(graph.event("wander"))
+    assert pet._next_state == NONE
+    pet.fire(graph.event("arrived"))
+    pet.update()
+    assert pet.get_current_index() == graph.state("jumpstage1")
+    body.frame = 25
+    pet.update()
+    pet.update()
+    assert pet.get_current_index() == idle
+    assert log == [
+        "-idle",
+        "+fall",
+        "-fall",
+        "+idle",
+        "-idle",
+        "+move",
+        "-move",
+        "+jumpstage1",
+        "-jumpstage1",
+        "+idle",
+    ], log
+
+
+def check_errors():
+    definition = {
+        "initial": "idle",
+        "states": ["idle"],
+        "transitions": [{"from": "idle", "to": "idle", "when": "never"}],
+    }
+    for broken in (
+        definition,
+        dict(definition, initial="nowhere"),
+        dict(definition, transitions=[{"from": "idle", "to": "x", "event": "e"}]),
+    ):
+        try:
+            StateGraph(broken, GUARDS)
+        except ValueError:
+            continue
+        raise AssertionError(broken)
+
+
+def bench() -> float:
+    """Seconds per machine tick with every machine switching states"""
+    graph = load_graph(settings.BEHAVIORS_FILE, "pet", GUARDS)
+    bodies = [Body() for _ in range(MACHINES)]
+    machines = [machine(graph, body, []) for body in bodies]
+    start = time.perf_counter()
+    for tick in range(TICKS):
+        for body in bodies:
+            body.grounded = tick % 2 == 0
+        for m in machines:
+            m.update()
+    return (time.perf_counter() - start) / (TICKS * MACHINES)
+
+
+if __name__ == "__main__":
+    check_transitions()
+    check_errors()
+    print("behaviors compile, transitions follow the tables")
+    print(f"{MACHINES} machines | {bench() * 1e6:6.3f} us per tick")
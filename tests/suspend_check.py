@@ -0,0 +1,123 @@
+"""
+Hide a swarm of pets through the main loop and check that nothing runs
+while it is suspended -- no window list polls, no frame decodes, no state
+updates -- and that showing it again carries on from the exact same state.
+
+run from the repository root:
+    python -m tests.suspend_check
+"""
+
+import os
+import time
+
+# no windows are shown
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt5.QtCore import QRect
+from PyQt5.QtWidgets import QApplication
+
+from source import settings, signal
+from source.mainloop import MainLoop
+from source.overlay import PetSwarm
+from source.windowsource import StaticWindowSource
+from tests.desktops import few_windows
+
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+PETS = 20
+SECONDS = 1.0
+
+# ---------------------------- #
+# setup
+
+
+class Counted:
+    """Wrap a function and count its calls"""
+
+    def __init__(self, function: "function"):
+        self.function = function
+        self.calls = 0
+
+    def __call__(self, *args):
+        self.calls += 1
+        return self.function(*args)
+
+
+def state(swarm: "PetSwarm") -> tuple:
+    """Everything a resumed swarm has to carry on from"""
+    bodies = swarm.world.bodies
+    return (
+        [getattr(bodies, c)[: len(swarm.pets)].tobytes() for c in bodies.COLUMNS],
+        [p.statemachine.get_current_index() for p in swarm.pets],
+        [p.frame_key() for p in swarm.pets],
+        sorted(deadline for deadline, *_ in swarm.scheduler._heap),
+        swarm.world.clock.accumulator,
+    )
+
+
+def run(loop: "MainLoop", seconds: float) -> int:
+    """Run the loop like `callLater` would for `seconds`, returns the frames"""
+    frames = 0
+    end = time.monotonic() + seconds
+    while time.monotonic() < end:
+        # the window list changes all the time -- poll as fast as possible
+        loop.host.world.poller.wake()
+        time.sleep(min(loop.frame(), 0.05))
+        frames += 1
+    return frames
+
+
+if __name__ == "__main__":
+    app = QApplication([])
+
+    # evict all but one animation, so playing keeps decoding frames
+    settings.ANIMATION_CACHE_MB = 0
+    source = StaticWindowSource(few_windows(), SCREEN)
+    swarm = PetSwarm(source, PETS, screens=[QRect(0, 0, *SCREEN)])
+    swarm.cache.loader = decodes = Counted(swarm.cache.loader)
+    poller = swarm.world.poller
+    loop = MainLoop(swarm, app)
+
+    run(loop, SECONDS)
+    polls, decoded = poller.polls, decodes.calls
+    frames = loop.frames
+    run(loop, SECONDS)
+    print(
+        f"running:   {poller.polls - polls:4} polls, "
+        f"{decodes.calls - decoded:4} decodes, {loop.frames - frames:4} frames"
+    )
+
+    # hide -- the loop handles the signal and parks
+    signal.BUS.post(signal.HIDE)
+    loop.frame()
+    assert swarm.lifecycle.suspended and poller.paused
+    time.sleep(0.1)
+    before = state(swarm)
+    polls, decoded, frames, parked = (
+        poller.polls,
+        decodes.calls,
+        loop.frames,
+        loop.parked,
+    )
+    run(loop, SECONDS)
+    print(
+        f"suspended: {poller.polls - polls:4} polls, "
+        f"{decodes.calls - decoded:4} decodes, {loop.frames - frames:4} frames, "
+        f"{loop.parked - parked} wakeups"
+    )
+    assert poller.polls == polls and decodes.calls == decoded
+    assert loop.frames == frames
+    assert loop.parked - parked <= SECONDS / settings.SUSPENDED_DELTA + 1
+
+    # show -- exactly where it stopped, the clock skipped the hidden time
+    signal.BUS.post(signal.SHOW)
+    hidden_at = swarm.time()
+    assert loop.frame() == 0.0 and not swarm.lifecycle.suspended
+    assert state(swarm) == before
+    assert swarm.time() - hidden_at < 0.01
+    run(loop, SECONDS)
+    assert poller.polls > polls and loop.frames > frames
+    print("resumed from the exact state, polling and playing again")
@@ -0,0 +1,93 @@
+"""
+Record window traces and replay them: recording twice to the same file
+keeps only the last trace, and broken or foreign traces are refused.
+
+run from the repository root:
+    python -m tests.trace_check
+"""
+
+import os
+import json
+import tempfile
+
+from source.windowsource import (
+    StaticWindowSource,
+    TraceRecorder,
+    ReplaySource,
+    TRACE_KEYS,
+    TRACE_VERSION,
+)
+
+# ---------------------------- #
+# constants
+
+SCREEN = (1920, 1080)
+POLLS = 20
+
+# ---------------------------- #
+# setup
+
+
+def window(wid: int, x: int) -> dict:
+    return {
+        "kCGWindowNumber": wid,
+        "kCGWindowLayer": 0,
+        "kCGWindowOwnerName": "check",
+        "kCGWindowIsOnscreen": True,
+        "kCGWindowBounds": {"X": x, "Y": 300, "Width": 400, "Height": 300},
+    }
+
+
+def record(filename: str, windows: [dict], polls: int):
+    recorder = TraceRecorder(StaticWindowSource(windows, SCREEN), filename)
+    for _ in range(polls):
+        recorder.get_windows()
+    recorder.close()
+
+
+def refused(filename: str, lines: [str]) -> str:
+    """The error replaying a trace made of `lines`"""
+    with open(filename, "w") as file:
+        file.write("\n".join(lines) + "\n")
+    try:
+        ReplaySource(filename)
+    except ValueError as error:
+        return str(error)
+    raise AssertionError(f"replayed a broken trace: {lines}")
+
+
+# ---------------------------- #
+# checks
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as folder:
+        trace = os.path.join(folder, "trace.jsonl")
+
+        # a second recording replaces the first
+        record(trace, [window(1, 100)], POLLS)
+        record(trace, [window(2, 500), window(3, 900)], POLLS // 2)
+        replay = ReplaySource(trace, speed=None)
+        assert len(replay) == POLLS // 2, len(replay)
+        assert [w["kCGWindowNumber"] for w in replay.get_windows()] == [2, 3]
+        print(f"recorded twice -> {len(replay)} records of the last trace")
+
+        header = json.dumps(
+            {"version": TRACE_VERSION, "screen": list(SCREEN), "keys": TRACE_KEYS}
+        )
+        future = json.dumps(
+            {"version": TRACE_VERSION + 1, "screen": list(SCREEN), "keys": TRACE_KEYS}
+        )
+        broken = {
+            "empty": [""],
+            "not json": ["{not json"],
+            "no version": [json.dumps({"screen": list(SCREEN)})],
+            "newer version": [future, '{"t":0.0,"w":[]}'],
+            "other keys": [
+                json.dumps({"version": TRACE_VERSION, "screen": [1, 1], "keys": []})
+            ],
+            "header mid-file": [header, '{"t":0.0,"w":[]}', header, '{"t":0.1}'],
+            "list record": [header, "[1, 2]"],
+        }
+        for name, lines in broken.items():
+            print(f"{name:>16} -> {refused(trace, lines)}")
+    print("replays refuse broken traces")